@@ -0,0 +1 @@
+"""Benchmark suite for gglisten (see benchmarks/run.py)"""
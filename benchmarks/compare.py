@@ -0,0 +1,57 @@
+"""Compare two benchmark result files (see run.py)
+
+    python -m benchmarks.compare before.json after.json --threshold 10
+
+Prints the change for every measurement present in both files and exits
+non-zero if any got worse by more than the threshold (percent). Times (ms)
+and memory (MB) are worse when higher; rates are worse when lower.
+"""
+
+import argparse
+import json
+import sys
+
+
+def _key(result: dict) -> tuple:
+    return result["suite"], result["name"], tuple(sorted(result["params"].items()))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base", help="Results from the baseline commit")
+    parser.add_argument("new", help="Results from the commit under test")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = {_key(r): r for r in json.load(f)["results"]}
+    with open(args.new) as f:
+        new = json.load(f)["results"]
+
+    regressions = 0
+    for result in new:
+        before = base.get(_key(result))
+        if before is None or not before["value"]:
+            continue
+        change = (result["value"] - before["value"]) / before["value"] * 100
+        worse = change if result["unit"] in ("ms", "MB") else -change
+        flag = ""
+        if worse > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif worse < -args.threshold:
+            flag = "  improved"
+        params = " ".join(f"{k}={v}" for k, v in result["params"].items())
+        print(
+            f"{result['suite']:<11} {result['name']:<26} {params:<14} "
+            f"{before['value']:>12.3f} -> {result['value']:>12.3f} {result['unit']:<7} {change:+7.1f}%{flag}"
+        )
+
+    if regressions:
+        print(f"\n{regressions} regression(s) over {args.threshold:.0f}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Local stand-in for the Anthropic messages API
+
+Answers every POST with a well-formed response that echoes the user message,
+as a tool call when the request offers tools (as instructor's do), so the AI
+processor can be exercised end to end without a key or network:
+
+    python -m benchmarks.mock_llm --port 8765 --delay 0.5
+    gglisten config ai_api_base http://127.0.0.1:8765
+    gglisten reprocess -n 50
+
+Run in-process with serve_in_background(), which returns the base URL.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _response(request: dict) -> dict:
+    user = [m for m in request.get("messages", []) if m.get("role") == "user"]
+    content = user[-1]["content"] if user else ""
+    if isinstance(content, list):
+        content = "".join(part.get("text", "") for part in content if isinstance(part, dict))
+
+    tools = request.get("tools") or []
+    if tools:
+        block = {"type": "tool_use", "id": "toolu_mock", "name": tools[0]["name"], "input": {"text": content}}
+        stop_reason = "tool_use"
+    else:
+        block = {"type": "text", "text": content}
+        stop_reason = "end_turn"
+
+    return {
+        "id": "msg_mock",
+        "type": "message",
+        "role": "assistant",
+        "model": request.get("model", "mock"),
+        "content": [block],
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {"input_tokens": len(content.split()), "output_tokens": len(content.split())},
+    }
+
+
+def make_server(port: int = 0, delay: float = 0.0) -> ThreadingHTTPServer:
+    """Create a server on 127.0.0.1 (port 0 picks a free one)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        requests_served = 0
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                self.send_error(400, "Invalid JSON")
+                return
+            if delay:
+                time.sleep(delay)
+            body = json.dumps(_response(request)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            Handler.requests_served += 1
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    server.handler = Handler
+    return server
+
+
+def serve_in_background(delay: float = 0.0) -> tuple[ThreadingHTTPServer, str]:
+    """Start a server on a free port in a daemon thread; returns (server, base_url)"""
+    server = make_server(delay=delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Anthropic messages API for testing")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before each response")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.delay)
+    print(f"Mock LLM listening on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
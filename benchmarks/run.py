@@ -0,0 +1,396 @@
+"""End-to-end benchmark runner
+
+Drives the real code paths against a throwaway home directory, database and
+temp dir, with the fake backend in place of a model and a mocked LLM client,
+so it runs on any Linux or macOS box without a GPU, microphone or network:
+
+    recorder    start/stop state transitions through a standby capture
+                process reading a generated tone, streaming to disk and
+                buffered in memory (capture_backend "native")
+    transcribe  VAD, header parsing, transcriber.transcribe (cache miss
+                and hit) and peak memory over the synthetic corpus, 1 s to 30 min
+    storage     save, get_recent and search at 10k, 100k and 1M rows
+    ai          ai.processor.clean_text (cache miss and hit) and batch
+                processing with a mocked LLM client
+
+Results are written as JSON for comparing commits (see compare.py):
+
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --quick --suite storage transcribe
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SUITES = ["recorder", "transcribe", "storage", "ai"]
+STORAGE_SIZES = [10_000, 100_000, 1_000_000]
+
+_VOCABULARY = (
+    "meeting project deadline review latency model audio notes customer budget "
+    "design release quarter feedback schedule priority roadmap launch metrics "
+    "hiring travel invoice contract proposal summary follow agenda decision"
+).split()
+
+_results: list[dict] = []
+
+
+def _log(message: str):
+    print(message, file=sys.stderr, flush=True)
+
+
+def _timing(suite: str, name: str, samples: list[float], **params):
+    """Record timings (seconds) as a result in milliseconds"""
+    from gglisten import tracing
+
+    ms = [s * 1000 for s in samples]
+    result = {
+        "suite": suite,
+        "name": name,
+        "params": params,
+        "unit": "ms",
+        "value": round(statistics.median(ms), 3),
+        "p95": round(tracing.percentile(ms, 95), 3),
+        "min": round(min(ms), 3),
+        "max": round(max(ms), 3),
+        "n": len(ms),
+    }
+    _results.append(result)
+    label = " ".join(f"{k}={v}" for k, v in params.items())
+    _log(f"  {name:<28} {label:<12} median {result['value']:10.3f} ms   p95 {result['p95']:10.3f} ms")
+
+
+def _rate(suite: str, name: str, value: float, unit: str, **params):
+    _results.append({"suite": suite, "name": name, "params": params, "unit": unit, "value": round(value, 1)})
+    label = " ".join(f"{k}={v}" for k, v in params.items())
+    _log(f"  {name:<28} {label:<12} {value:12.0f} {unit}")
+
+
+def _time(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_recorder(workdir: Path, runs: int):
+    """
+    Start/stop cycles through a standby capture process with a sine source,
+    writing the WAV as it records (standby) or at stop (native)
+    """
+    from gglisten import capture, recorder
+    from gglisten.config import get_config
+
+    config = get_config()
+    config.standby_capture = True
+    config.show_level_meter = False
+
+    # The capture process reads capture_backend from the config file
+    config_file = Path(os.environ["HOME"]) / ".config/gglisten/config.json"
+    config_file.parent.mkdir(parents=True, exist_ok=True)
+    env = dict(os.environ, GGLISTEN_TEMP_DIR=str(config.temp_dir))
+
+    for source, backend in (("standby", "ffmpeg"), ("native", "native")):
+        config.capture_backend = backend
+        config_file.write_text(json.dumps({"capture_backend": backend}))
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "gglisten.cli", "capture", "--source", "sine"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            deadline = time.monotonic() + 10
+            while not capture.is_running():
+                if time.monotonic() > deadline or proc.poll() is not None:
+                    _log(f"  recorder: capture process did not start; {source} skipped")
+                    break
+                time.sleep(0.05)
+            else:
+                starts, stops, checks = [], [], []
+                for _ in range(runs):
+                    t0 = time.perf_counter()
+                    assert recorder.start_recording()
+                    t1 = time.perf_counter()
+                    assert recorder.is_recording()
+                    checks.append(time.perf_counter() - t1)
+                    time.sleep(0.2)
+                    t2 = time.perf_counter()
+                    ok, _ = recorder.stop_recording()
+                    t3 = time.perf_counter()
+                    assert ok and recorder._read_state().state == recorder.RecorderState.TRANSCRIBING
+                    recorder.cleanup()
+                    assert recorder._read_state().state == recorder.RecorderState.IDLE
+                    starts.append(t1 - t0)
+                    stops.append(t3 - t2)
+
+                _timing("recorder", "start_recording", starts, source=source)
+                if source == "standby":
+                    _timing("recorder", "is_recording", checks)
+                _timing("recorder", "stop_recording", stops, source=source)
+        finally:
+            capture.shutdown()
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    config_file.unlink(missing_ok=True)
+
+def bench_transcribe(workdir: Path, runs: int, corpus_dir: Path, quick: bool):
+    """Per-length cost of everything around the model, using the fake backend"""
+    from gglisten import audioinfo, storage, transcriber, vad
+    from gglisten.config import get_config
+    from . import corpus
+
+    config = get_config()
+    config.transcription_backend = "fake"
+    config.fake_load_seconds = 0.0
+    config.fake_realtime_factor = 0.0  # Measure our overhead, not a simulated model
+
+    names = ["1s", "10s", "1m"] if quick else list(corpus.LENGTHS)
+    _log(f"  building corpus in {corpus_dir} ...")
+    clips = corpus.build(corpus_dir, names)
+
+    for name, path in clips.items():
+        seconds = corpus.LENGTHS[name]
+        repeat = max(1, min(runs, int(120 / seconds)))
+
+        _timing("transcribe", "audioinfo", _time(lambda: audioinfo.read_info(path), repeat), audio=name)
+
+        def trim():
+            with vad.speech_only(path):
+                pass
+        _timing("transcribe", "vad", _time(trim, repeat), audio=name)
+
+        def miss():
+            storage._get_connection().execute("DELETE FROM transcription_cache")
+            storage._get_connection().commit()
+            transcriber.transcribe(path)
+        _timing("transcribe", "transcribe_miss", _time(miss, repeat), audio=name)
+        _timing("transcribe", "transcribe_hit", _time(lambda: transcriber.transcribe(path), repeat), audio=name)
+
+        # Should stay flat with length once recordings go through longform.py
+        rss = _peak_rss(path, config.longform_threshold)
+        if rss is not None:
+            _rate("transcribe", "peak_rss", rss, "MB", audio=name)
+
+
+_PEAK_RSS_SCRIPT = """
+import resource, sys
+from pathlib import Path
+from gglisten import transcriber
+from gglisten.config import get_config
+
+config = get_config()
+config.transcription_backend = "fake"
+config.fake_load_seconds = 0.0
+config.fake_realtime_factor = 0.0
+config.cache_transcriptions = False
+config.longform_threshold = float(sys.argv[2])
+transcriber.transcribe_segments(Path(sys.argv[1]))
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(rss / 1024 if sys.platform != "darwin" else rss / 1024 / 1024)
+"""
+
+
+def _peak_rss(path: Path, longform_threshold: float) -> float | None:
+    """Peak RSS (MB) of a fresh process transcribing path"""
+    result = subprocess.run(
+        [sys.executable, "-c", _PEAK_RSS_SCRIPT, str(path), str(longform_threshold)],
+        capture_output=True, text=True, cwd=Path(__file__).parent.parent,
+    )
+    if result.returncode != 0:
+        _log(f"  peak_rss: {result.stderr.strip().splitlines()[-1:]}")
+        return None
+    return float(result.stdout.strip())
+
+
+def _random_text(rng: random.Random) -> str:
+    return " ".join(rng.choice(_VOCABULARY) for _ in range(rng.randint(5, 60)))
+
+
+def bench_storage(workdir: Path, runs: int, quick: bool):
+    """Write and query latency as the history grows"""
+    from gglisten import storage
+    from gglisten.storage import Transcription
+
+    rng = random.Random(0)
+    sizes = STORAGE_SIZES[:1] if quick else STORAGE_SIZES
+    rows = 0
+    for size in sizes:
+        label = f"{size // 1000}k" if size < 1_000_000 else f"{size // 1_000_000}M"
+        filled_from = rows
+        start = time.perf_counter()
+        while rows < size:
+            batch = min(10_000, size - rows)
+            storage.save_many([
+                Transcription(
+                    id=None,
+                    timestamp=1.7e9 + rows + i,
+                    duration=rng.uniform(1, 60),
+                    text=_random_text(rng),
+                    model="fake",
+                    metadata={"timings": {"transcribe": 100.0}},
+                )
+                for i in range(batch)
+            ])
+            rows += batch
+        _rate("storage", "save_many", (rows - filled_from) / (time.perf_counter() - start), "rows/s", rows=label)
+
+        repeat = runs * 10
+        text = _random_text(rng)
+        _timing("storage", "save", _time(lambda: storage.save(text=text, duration=4.2, model="fake"), repeat), rows=label)
+        _timing("storage", "get_recent", _time(lambda: storage.get_recent(limit=10), repeat), rows=label)
+        # Common words match a large share of rows here, so these are slow; fewer runs
+        for query in ("budget", "proj", "customer feedback", "nonexistentword"):
+            _timing(
+                "storage", f"search '{query}'",
+                _time(lambda: storage.search(query, limit=20), max(3, runs)),
+                rows=label,
+            )
+        rows += repeat  # The saves above
+
+
+class _MockCompletions:
+    """Stands in for instructor's client: echoes the input after a fixed delay"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def create(self, response_model, messages, **kwargs):
+        time.sleep(self.delay)
+        return response_model(text=messages[-1]["content"])
+
+
+class _AsyncMockCompletions(_MockCompletions):
+    async def create(self, response_model, messages, **kwargs):
+        import asyncio
+
+        await asyncio.sleep(self.delay)
+        return response_model(text=messages[-1]["content"])
+
+
+class _MockClient:
+    def __init__(self, completions):
+        self.chat = type("Chat", (), {"completions": completions})()
+
+
+def bench_ai(workdir: Path, runs: int):
+    """Overhead of the AI processor around a mocked LLM"""
+    from gglisten import storage
+    from gglisten.config import get_config
+
+    try:
+        from gglisten.ai import processor
+    except ImportError as e:
+        _log(f"  ai: {e}; skipped")
+        return
+
+    config = get_config()
+    config.anthropic_key_file = workdir / "anthropic_key"
+    config.anthropic_key_file.write_text("sk-bench")
+    processor.get_client = lambda: _MockClient(_MockCompletions(delay=0.0))
+
+    def clear_cache():
+        storage._get_connection().execute("DELETE FROM ai_cache")
+        storage._get_connection().commit()
+
+    rng = random.Random(1)
+    for words in (10, 100, 1000):
+        text = " ".join(rng.choice(_VOCABULARY) for _ in range(words))
+
+        def miss():
+            clear_cache()
+            processor.clean_text(text)
+        _timing("ai", "clean_text_miss", _time(miss, runs * 10), words=words)
+        _timing("ai", "clean_text_hit", _time(lambda: processor.clean_text(text), runs * 10), words=words)
+
+    # 50 records, a quarter of them duplicates, against a 50 ms LLM
+    processor.get_async_client = lambda: _MockClient(_AsyncMockCompletions(delay=0.05))
+    texts = [_random_text(rng) for _ in range(38)]
+    ids = [storage.save(text=t, duration=1.0, model="fake") for t in texts + texts[:12]]
+    records = [storage.get_by_id(i) for i in ids]
+    for concurrency in (1, 8):
+        def batch():
+            clear_cache()
+            processor.process_batch(records, concurrency=concurrency)
+        _timing("ai", "process_batch", _time(batch, max(1, runs // 2)), records=len(records), concurrency=concurrency)
+
+
+def _environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True, text=True, cwd=Path(__file__).parent,
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the gglisten benchmark suite")
+    parser.add_argument("--suite", nargs="+", choices=SUITES, default=SUITES, help="Suites to run")
+    parser.add_argument("--quick", action="store_true", help="Skip the 5/30 min clips and the 100k/1M row databases")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="Repetitions per measurement (scaled per suite)")
+    parser.add_argument("-o", "--output", help="Write JSON results here (default: stdout)")
+    parser.add_argument("--corpus-dir", default=str(Path(__file__).parent / ".corpus"),
+                        help="Where to cache the generated audio")
+    args = parser.parse_args()
+
+    # Isolate from the user's config, history and running processes. Must
+    # happen before gglisten reads its config.
+    workdir = Path(tempfile.mkdtemp(prefix="gglisten-benchmarks-"))
+    os.environ["HOME"] = str(workdir / "home")
+    os.environ["GGLISTEN_TEMP_DIR"] = str(workdir / "tmp")
+
+    from gglisten.config import get_config
+
+    config = get_config()
+    config.archive_audio = False
+    config.db_path = workdir / "bench.db"
+
+    try:
+        for suite in args.suite:
+            _log(f"{suite}:")
+            if suite == "recorder":
+                bench_recorder(workdir, args.runs)
+            elif suite == "transcribe":
+                bench_transcribe(workdir, args.runs, Path(args.corpus_dir), args.quick)
+            elif suite == "storage":
+                config.db_path = workdir / "storage.db"
+                bench_storage(workdir, args.runs, args.quick)
+            elif suite == "ai":
+                bench_ai(workdir, args.runs)
+    finally:
+        import shutil
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = json.dumps({"environment": _environment(), "results": _results}, indent=2)
+    if args.output:
+        Path(args.output).write_text(report + "\n")
+        _log(f"Results written to {args.output}")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
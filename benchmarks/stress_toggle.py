@@ -0,0 +1,156 @@
+"""Concurrency stress test for the recorder state machine
+
+Fires hundreds of `gglisten` toggles in bursts of simultaneous processes, as
+a mashed (or doubly bound) hotkey would, against a standby capture process
+reading a generated tone, with queued transcription and the fake backend.
+Every toggle must either start or stop a recording, exactly once:
+
+    python -m benchmarks.stress_toggle
+    python -m benchmarks.stress_toggle --toggles 500 --concurrency 50
+
+Exits 1 if any toggle failed, if starts and stops don't alternate, or if the
+queued recordings don't match the stops one for one.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def _log(message: str):
+    print(message, file=sys.stderr, flush=True)
+
+
+def _toggle_burst(n: int, env: dict) -> list[tuple[int, str]]:
+    """Start n toggles at once and wait for all of them: [(returncode, output)]"""
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-m", "gglisten.cli"],
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        for _ in range(n)
+    ]
+    return [(proc.wait(), proc.stdout.read()) for proc in procs]
+
+
+def _classify(returncode: int, output: str) -> str:
+    if returncode == 0 and output.startswith("Recording..."):
+        return "start"
+    if returncode == 0 and "Queued" in output:
+        return "stop"
+    return "failed"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fire concurrent toggles and check each starts or stops exactly once")
+    parser.add_argument("--toggles", type=int, default=300, help="Total toggles to fire")
+    parser.add_argument("--concurrency", type=int, default=30, help="Toggles started at the same instant")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds to wait for queued jobs to finish")
+    args = parser.parse_args()
+
+    # Isolate from the user's config, history and running processes. Must
+    # happen before gglisten reads its config.
+    workdir = Path(tempfile.mkdtemp(prefix="gglisten-stress-"))
+    home = workdir / "home"
+    (home / ".config/gglisten").mkdir(parents=True)
+    (home / ".config/gglisten/config.json").write_text(json.dumps({
+        "standby_capture": True,
+        "capture_source": "sine",
+        "queue_transcriptions": True,
+        "transcription_backend": "fake",
+        "fake_load_seconds": 0,
+        "use_daemon": False,
+        "show_level_meter": False,
+        "archive_audio": False,
+    }))
+    os.environ["HOME"] = str(home)
+    os.environ["GGLISTEN_TEMP_DIR"] = str(workdir / "tmp")
+    env = dict(os.environ)
+
+    from gglisten import capture, recorder, storage
+
+    capture_proc = subprocess.Popen(
+        [sys.executable, "-m", "gglisten.cli", "capture"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    failures: list[str] = []
+    counts = {"start": 0, "stop": 0, "failed": 0}
+    try:
+        deadline = time.monotonic() + 10
+        while not capture.is_running():
+            if time.monotonic() > deadline or capture_proc.poll() is not None:
+                _log("Capture process did not start")
+                return 1
+            time.sleep(0.05)
+
+        _log(f"Firing {args.toggles} toggles, {args.concurrency} at a time...")
+        started = time.perf_counter()
+        remaining = args.toggles
+        while remaining > 0:
+            burst = min(args.concurrency, remaining)
+            remaining -= burst
+            for returncode, output in _toggle_burst(burst, env):
+                outcome = _classify(returncode, output)
+                counts[outcome] += 1
+                if outcome == "failed":
+                    failures.append(output.strip() or f"exit {returncode}")
+
+            # Presses are serialized, so starts and stops interleave: never
+            # two starts (or stops) in a row, whatever the burst size
+            if not 0 <= counts["start"] - counts["stop"] <= 1:
+                failures.append(f"{counts['start']} starts but {counts['stop']} stops")
+                break
+        elapsed = time.perf_counter() - started
+
+        if recorder.is_recording():
+            outcome = _classify(*_toggle_burst(1, env)[0])
+            counts[outcome] += 1
+        _log(
+            f"  {counts['start']} starts, {counts['stop']} stops, {counts['failed']} failed "
+            f"in {elapsed:.1f}s ({elapsed / args.toggles * 1000:.1f} ms/toggle)"
+        )
+
+        # Every stop queued exactly one recording, and each is intact
+        deadline = time.monotonic() + args.timeout
+        while storage.get_jobs(statuses=("queued", "running"), limit=1):
+            if time.monotonic() > deadline:
+                failures.append("Queued jobs did not finish in time")
+                break
+            time.sleep(0.2)
+        jobs = storage.get_jobs(statuses=("queued", "running", "done", "failed"), limit=args.toggles)
+        if len(jobs) != counts["stop"]:
+            failures.append(f"{counts['stop']} stops but {len(jobs)} queued recordings")
+        if len({job.audio_path for job in jobs}) != len(jobs):
+            failures.append("Two stops queued the same recording")
+        failures += [f"Job {job.id}: {job.error}" for job in jobs if job.status == "failed"]
+        _log(f"  {len(jobs)} recordings queued and transcribed")
+    finally:
+        capture.shutdown()
+        try:
+            capture_proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            capture_proc.kill()
+        import shutil
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for failure in failures[:20]:
+        _log(f"FAIL: {failure}")
+    if failures:
+        return 1
+    _log("OK: every toggle started or stopped exactly once")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,64 @@
-"""AI text processing using Claude via litellm"""
+"""AI text processing using Claude via litellm
+
+process() runs text through any template in templates.py. Responses are
+cached in the database by (template, model, hash of the text), so identical
+inputs are never sent twice, and the instructor clients are created once per
+process. process_batch() handles many records concurrently on an asyncio
+loop, limiting requests in flight and coalescing identical ones.
+"""
+
+import asyncio
+import hashlib
 
 import instructor
 import litellm
 from pydantic import BaseModel, Field
 
+from .. import storage, tracing
 from ..config import get_config
+from .templates import get_template, list_templates
+
+# instructor clients, created on first use and reused
+_client = None
+_async_client = None
 
 
-class CleanedText(BaseModel):
-    """Cleaned up text output"""
+class ProcessedText(BaseModel):
+    """Processed text output"""
 
     text: str = Field(
-        description="The cleaned up text with filler words removed and grammar fixed"
+        description="The transcription rewritten as the instructions describe"
     )
 
 
 def get_client():
     """Get instructor client for structured outputs"""
-    return instructor.from_litellm(litellm.completion)
+    global _client
+    if _client is None:
+        _client = instructor.from_litellm(litellm.completion)
+    return _client
 
 
-def clean_text(text: str, model: str | None = None) -> str:
-    """
-    Clean up transcribed text using AI.
+def get_async_client():
+    """Get async instructor client for structured outputs"""
+    global _async_client
+    if _async_client is None:
+        _async_client = instructor.from_litellm(litellm.acompletion)
+    return _async_client
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _request(template: str, text: str, model: str | None) -> tuple[str, dict]:
+    """Resolve the model and build the completion arguments for a template"""
+    prompt = get_template(template)
+    if prompt is None:
+        raise ValueError(
+            f"Unknown template: {template} (available: {', '.join(list_templates())})"
+        )
 
-    Removes filler words, fixes grammar, improves clarity
-    while preserving the original meaning and voice.
-    """
     config = get_config()
     api_key = config.get_anthropic_key()
 
@@ -38,79 +70,119 @@ def clean_text(text: str, model: str | None = None) -> str:
     if model is None:
         model = config.default_model
 
-    client = get_client()
-
-    result = client.chat.completions.create(
-        model=model,
-        api_key=api_key,
-        response_model=CleanedText,
-        messages=[
-            {
-                "role": "system",
-                "content": """You are a text cleanup assistant. Your job is to take voice transcriptions
-and clean them up while preserving the original meaning and voice.
-
-Clean up the text by:
-- Removing filler words (um, uh, like, you know, so, basically)
-- Fixing grammar and punctuation
-- Improving sentence structure for clarity
-- Removing false starts and repetitions
-
-Keep:
-- The original meaning and intent
-- The speaker's voice and style
-- All important details and information
-- First person perspective if present
-
-Return ONLY the cleaned text, nothing else.""",
-            },
-            {
-                "role": "user",
-                "content": text,
-            },
+    kwargs = {
+        "model": model,
+        "api_key": api_key,
+        "response_model": ProcessedText,
+        "messages": [
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": text},
         ],
-        max_tokens=4096,
-    )
+        "max_tokens": 4096,
+    }
+    if config.ai_api_base:
+        kwargs["api_base"] = config.ai_api_base
+    return model, kwargs
+
+
+@tracing.traced("ai.process")
+def process(text: str, template: str = "clean", model: str | None = None) -> str:
+    """Run text through a template, returning a cached response if there is one"""
+    model, kwargs = _request(template, text, model)
+    text_hash = _text_hash(text)
 
+    cached = storage.ai_cache_get(template, model, text_hash)
+    if cached is not None:
+        return cached
+
+    result = get_client().chat.completions.create(**kwargs)
+    storage.ai_cache_put(template, model, text_hash, result.text)
     return result.text
 
 
-def process_for_email(text: str, model: str | None = None) -> str:
-    """Format transcribed text as a professional email"""
-    config = get_config()
-    api_key = config.get_anthropic_key()
+class AsyncProcessor:
+    """
+    Processes many texts concurrently on one event loop.
 
-    if not api_key:
-        raise ValueError(f"Anthropic API key not found")
+    At most `concurrency` requests are in flight. A request identical to one
+    already in flight waits for that one instead of being sent again.
+    """
 
-    if model is None:
-        model = config.default_model
+    def __init__(self, concurrency: int = 4):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._in_flight: dict[tuple[str, str, str], asyncio.Future] = {}
+
+    async def process(self, text: str, template: str = "clean", model: str | None = None) -> str:
+        model, kwargs = _request(template, text, model)
+        key = (template, model, _text_hash(text))
+
+        cached = storage.ai_cache_get(*key)
+        if cached is not None:
+            return cached
+
+        if key in self._in_flight:
+            return await asyncio.shield(self._in_flight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            async with self._semaphore:
+                result = await get_async_client().chat.completions.create(**kwargs)
+            storage.ai_cache_put(*key, result.text)
+            future.set_result(result.text)
+            return result.text
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved; coalesced waiters still get it
+            raise
+        finally:
+            del self._in_flight[key]
+
+
+def process_batch(
+    records: list[storage.Transcription],
+    template: str = "clean",
+    concurrency: int = 4,
+    on_result=None,
+) -> dict[int, str | Exception]:
+    """
+    Process many history records concurrently, storing each result in
+    processed_text as it arrives. on_result(record, text, error) is called
+    for each record. Returns record id -> processed text or the exception.
+    """
+    async def run():
+        processor = AsyncProcessor(concurrency)
+        results: dict[int, str | Exception] = {}
 
-    client = get_client()
-
-    result = client.chat.completions.create(
-        model=model,
-        api_key=api_key,
-        response_model=CleanedText,
-        messages=[
-            {
-                "role": "system",
-                "content": """Convert this voice transcription into a professional email.
-
-- Use appropriate greeting and sign-off
-- Organize content clearly with paragraphs
-- Maintain a professional but friendly tone
-- Keep the key points and requests
-- Fix any grammar or clarity issues
-
-Return ONLY the email text, ready to send.""",
-            },
-            {
-                "role": "user",
-                "content": text,
-            },
-        ],
-        max_tokens=4096,
-    )
+        async def one(record: storage.Transcription):
+            try:
+                text = await processor.process(record.text, template)
+            except Exception as e:
+                results[record.id] = e
+                if on_result:
+                    on_result(record, None, e)
+                return
+            storage.update_processed_text(record.id, text)
+            results[record.id] = text
+            if on_result:
+                on_result(record, text, None)
 
-    return result.text
+        await asyncio.gather(*(one(r) for r in records))
+        return results
+
+    return asyncio.run(run())
+
+
+def clean_text(text: str, model: str | None = None) -> str:
+    """
+    Clean up transcribed text using AI.
+
+    Removes filler words, fixes grammar, improves clarity
+    while preserving the original meaning and voice.
+    """
+    return process(text, "clean", model)
+
+
+def process_for_email(text: str, model: str | None = None) -> str:
+    """Format transcribed text as a professional email"""
+    return process(text, "email", model)
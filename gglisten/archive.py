@@ -0,0 +1,154 @@
+"""Compressed, content-addressed archive of recordings
+
+Each recording is stored once, compressed (FLAC or Opus) and named by the
+SHA-256 of its PCM samples, so identical audio is deduplicated. Old files are
+evicted by age (archive_retention_days) and total size (archive_max_mb).
+Archived audio is only decoded back to WAV when something needs to read it.
+"""
+
+import hashlib
+import os
+import subprocess
+import tempfile
+import time
+import wave
+from contextlib import contextmanager
+from pathlib import Path
+
+from . import tracing
+from .config import get_config
+
+# ffmpeg codec arguments and file extension per archive format
+_FORMATS = {
+    "flac": (["-c:a", "flac", "-compression_level", "8"], ".flac"),
+    "opus": (["-c:a", "libopus", "-b:a", "24k", "-application", "voip"], ".ogg"),
+}
+
+
+def pcm_hash(wav_path: Path) -> str:
+    """SHA-256 of the PCM samples (ignores header differences)"""
+    digest = hashlib.sha256()
+    with wave.open(str(wav_path), "rb") as wav:
+        while True:
+            frames = wav.readframes(65536)
+            if not frames:
+                break
+            digest.update(frames)
+    return digest.hexdigest()
+
+
+def _archive_path(content_hash: str) -> Path:
+    config = get_config()
+    _, ext = _FORMATS[config.archive_format]
+    return config.archive_dir / content_hash[:2] / f"{content_hash}{ext}"
+
+
+def store(wav_path: Path) -> Path | None:
+    """
+    Archive a WAV recording. Returns the archived path, or None if archiving
+    is disabled or failed (the caller keeps the original path in that case).
+    """
+    config = get_config()
+    if not config.archive_audio:
+        return None
+
+    with tracing.span("archive.store"):
+        return _store(wav_path)
+
+
+def _store(wav_path: Path) -> Path | None:
+    config = get_config()
+    try:
+        dest = _archive_path(pcm_hash(wav_path))
+    except (OSError, wave.Error, EOFError):
+        return None
+
+    if dest.exists():
+        dest.touch()  # Deduplicated; refresh its age for retention
+        return dest
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    codec_args, _ = _FORMATS[config.archive_format]
+    tmp = dest.with_name(f".{dest.name}.tmp")
+    try:
+        result = subprocess.run(
+            [
+                str(config.ffmpeg_bin), "-v", "error", "-y",
+                "-i", str(wav_path),
+                *codec_args,
+                "-f", "flac" if dest.suffix == ".flac" else "ogg",
+                str(tmp),
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return None
+    if result.returncode != 0:
+        tmp.unlink(missing_ok=True)
+        return None
+    tmp.rename(dest)  # Atomic: readers never see a half-written file
+
+    evict()
+    return dest
+
+
+def evict():
+    """Delete archived audio past the retention age, then oldest-first down to the size cap"""
+    config = get_config()
+    if not config.archive_dir.exists():
+        return
+
+    files = []
+    cutoff = time.time() - config.archive_retention_days * 86400
+    for path in config.archive_dir.glob("*/*"):
+        if path.name.startswith("."):
+            continue
+        st = path.stat()
+        if config.archive_retention_days and st.st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+        else:
+            files.append((st.st_mtime, st.st_size, path))
+
+    max_bytes = config.archive_max_mb * 1024 * 1024
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if not config.archive_max_mb or total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+@contextmanager
+def open_wav(audio_path: Path):
+    """
+    Yield a WAV path for a (possibly archived) recording, decoding on demand.
+    Decoded copies are temporary and removed on exit.
+    """
+    if audio_path.suffix.lower() == ".wav":
+        yield audio_path
+        return
+
+    config = get_config()
+    config.ensure_dirs()
+    fd, tmp_name = tempfile.mkstemp(suffix=".wav", dir=config.temp_dir)
+    os.close(fd)
+    tmp = Path(tmp_name)
+    try:
+        result = subprocess.run(
+            [
+                str(config.ffmpeg_bin), "-v", "error", "-y",
+                "-i", str(audio_path),
+                "-ar", str(config.sample_rate),
+                "-ac", str(config.channels),
+                str(tmp),
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Could not decode {audio_path}: {result.stderr.strip()}")
+        yield tmp
+    finally:
+        tmp.unlink(missing_ok=True)
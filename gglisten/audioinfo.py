@@ -0,0 +1,134 @@
+"""Audio metadata straight from file headers
+
+Reads sample rate, channel count and exact length from RIFF/WAV, FLAC and
+Ogg (Opus/Vorbis) files by mapping them and parsing the headers, so nothing
+has to be decoded and no ffprobe process is spawned.
+"""
+
+import mmap
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class AudioInfo:
+    sample_rate: int
+    channels: int
+    frames: int  # Samples per channel
+
+    @property
+    def duration_us(self) -> int:
+        return self.frames * 1_000_000 // self.sample_rate
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds"""
+        return self.frames / self.sample_rate
+
+
+def _riff_chunks(buf, limit: int):
+    """
+    Yield (chunk id, offset of its payload, payload size) for each chunk of
+    a RIFF/WAVE file, walking the chunk headers up to limit bytes in. Stops
+    after the data chunk, whose size may be a placeholder while recording.
+    """
+    if len(buf) < 12 or buf[:4] != b"RIFF" or buf[8:12] != b"WAVE":
+        return
+    pos = 12
+    while pos + 8 <= min(len(buf), limit):
+        chunk_id = bytes(buf[pos:pos + 4])
+        (size,) = struct.unpack_from("<I", buf, pos + 4)
+        yield chunk_id, pos + 8, size
+        if chunk_id == b"data":
+            return
+        pos += 8 + size + (size & 1)
+
+
+def wav_data_chunk(header: bytes) -> tuple[int, int] | None:
+    """Return (offset of data size field, data size) from a WAV header, if present"""
+    for chunk_id, offset, size in _riff_chunks(header, len(header)):
+        if chunk_id == b"data":
+            return offset - 4, size
+    return None
+
+
+def _wav_info(mm: mmap.mmap) -> AudioInfo:
+    fmt = data = None
+    for chunk_id, offset, size in _riff_chunks(mm, len(mm)):
+        if chunk_id == b"fmt " and size >= 16:
+            fmt = offset
+        elif chunk_id == b"data":
+            data = offset, size
+    if fmt is None or data is None:
+        raise ValueError("Malformed WAV header")
+    channels, sample_rate, _, block_align = struct.unpack_from("<HIIH", mm, fmt + 2)
+    if not channels or not sample_rate or not block_align:
+        raise ValueError("Malformed WAV format chunk")
+
+    # A recording still in progress (or killed) has a placeholder data size;
+    # count what's actually on disk instead
+    offset, data_size = data
+    available = len(mm) - offset
+    if data_size == 0 or data_size > available:
+        data_size = available
+    return AudioInfo(sample_rate=sample_rate, channels=channels, frames=data_size // block_align)
+
+
+def _flac_info(mm: mmap.mmap) -> AudioInfo:
+    # STREAMINFO is always the first metadata block: after the 4-byte block
+    # header and 10 bytes of block/frame sizes come 20 bits of sample rate,
+    # 3 bits of channels - 1, 5 bits of bits per sample - 1 and 36 bits of
+    # total samples
+    if mm[4] & 0x7F != 0:
+        raise ValueError("FLAC file does not start with STREAMINFO")
+    (packed,) = struct.unpack_from(">Q", mm, 18)
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    frames = packed & 0xFFFFFFFFF
+    if not frames:
+        raise ValueError("FLAC file does not record its length")
+    return AudioInfo(sample_rate=sample_rate, channels=channels, frames=frames)
+
+
+def _ogg_info(mm: mmap.mmap) -> AudioInfo:
+    # The first packet identifies the codec; the last page's granule position
+    # is the total sample count (at 48 kHz for Opus, less its pre-skip)
+    packet = 27 + mm[26]  # Page header plus segment table
+    last_page = mm.rfind(b"OggS")
+    (granule,) = struct.unpack_from("<q", mm, last_page + 6)
+
+    if mm[packet:packet + 8] == b"OpusHead":
+        channels = mm[packet + 9]
+        (pre_skip,) = struct.unpack_from("<H", mm, packet + 10)
+        return AudioInfo(sample_rate=48000, channels=channels, frames=max(granule - pre_skip, 0))
+    if mm[packet:packet + 7] == b"\x01vorbis":
+        channels = mm[packet + 11]
+        (sample_rate,) = struct.unpack_from("<I", mm, packet + 12)
+        return AudioInfo(sample_rate=sample_rate, channels=channels, frames=granule)
+    raise ValueError("Unsupported Ogg codec")
+
+
+def read_info(audio_path: Path) -> AudioInfo:
+    """
+    Read an audio file's format and length from its headers.
+    Raises ValueError for unsupported or malformed files, OSError if unreadable.
+    """
+    with open(audio_path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError(f"Empty audio file: {audio_path}") from None
+
+    with mm:
+        try:
+            magic = mm[:4]
+            if magic == b"RIFF":
+                return _wav_info(mm)
+            if magic == b"fLaC":
+                return _flac_info(mm)
+            if magic == b"OggS":
+                return _ogg_info(mm)
+        except (struct.error, IndexError):
+            raise ValueError(f"Truncated audio header: {audio_path}") from None
+    raise ValueError(f"Unsupported audio format: {audio_path}")
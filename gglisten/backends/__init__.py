@@ -0,0 +1,148 @@
+"""Pluggable transcription backends
+
+Backends are looked up by name (Config.transcription_backend) in a dict registry.
+Built-in backends are imported lazily so choosing one doesn't import the others.
+Third-party packages can add backends with the @register decorator or via a
+"gglisten.backends" entry point that resolves to a Backend subclass.
+"""
+
+import importlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from ..segments import Segment
+
+ENTRY_POINT_GROUP = "gglisten.backends"
+
+# Built-in backends: name -> "module:Class", imported on first use
+_BUILTIN = {
+    "whisper": "gglisten.backends.whisper:WhisperBackend",
+    "whisper-server": "gglisten.backends.whisper_server:WhisperServerBackend",
+    "parakeet": "gglisten.backends.parakeet:ParakeetBackend",
+    "fake": "gglisten.backends.fake:FakeBackend",
+}
+
+# Explicitly registered backend classes (see register())
+_registry: dict[str, type["Backend"]] = {}
+
+# Backend instances, kept so loaded models survive between calls in one process
+_instances: dict[str, "Backend"] = {}
+
+
+@dataclass(frozen=True)
+class Capabilities:
+    """What a backend can do beyond plain file-to-text transcription"""
+
+    # Can transcribe audio incrementally as it arrives
+    streaming: bool = False
+    # Several transcriptions can run at once (batch.run uses `-j` workers)
+    batching: bool = False
+    # Can report segment/word timings
+    timestamps: bool = False
+
+
+class Backend:
+    """Base class for transcription backends"""
+
+    name: str = ""
+    capabilities = Capabilities()
+
+    def __init__(self):
+        self.loaded = False
+
+    @property
+    def model_id(self) -> str:
+        """Identifier of the model in use (stored with each transcription)"""
+        return self.name
+
+    def load(self):
+        """Load the model. Called before the first transcription; may be called again."""
+        self.loaded = True
+
+    def unload(self):
+        """Release the model"""
+        self.loaded = False
+
+    def transcribe(self, audio_path: Path) -> str | None:
+        """Transcribe one audio file. Returns None if there was no speech."""
+        raise NotImplementedError
+
+    def transcribe_segments(self, audio_path: Path) -> list[Segment]:
+        """
+        Transcribe one audio file into timed segments (empty if there was no
+        speech). Backends with capabilities.timestamps override this; the
+        default is the whole text as one segment spanning the file.
+        """
+        text = self.transcribe(audio_path)
+        if not text:
+            return []
+        from ..audioinfo import read_info
+
+        try:
+            end = read_info(audio_path).duration
+        except (OSError, ValueError):
+            end = 0.0
+        return [Segment(start=0.0, end=end, text=text)]
+
+
+def register(name: str):
+    """Class decorator that registers a Backend subclass under name"""
+
+    def decorator(cls: type[Backend]) -> type[Backend]:
+        cls.name = name
+        _registry[name] = cls
+        return cls
+
+    return decorator
+
+
+def _load_entry_point(name: str) -> type[Backend] | None:
+    from importlib.metadata import entry_points
+
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        if ep.name == name:
+            cls = ep.load()
+            cls.name = name
+            _registry[name] = cls
+            return cls
+    return None
+
+
+def get_backend_class(name: str) -> type[Backend]:
+    """Resolve a backend name to its class"""
+    if name in _registry:
+        return _registry[name]
+
+    if name in _BUILTIN:
+        module_name, class_name = _BUILTIN[name].split(":")
+        cls = getattr(importlib.import_module(module_name), class_name)
+        cls.name = name
+        _registry[name] = cls
+        return cls
+
+    cls = _load_entry_point(name)
+    if cls is None:
+        raise ValueError(
+            f"Unknown transcription backend: {name} (available: {', '.join(available())})"
+        )
+    return cls
+
+
+def get_backend(name: str | None = None) -> Backend:
+    """Get the (cached) backend instance, defaulting to the configured one"""
+    if name is None:
+        from ..config import get_config
+        name = get_config().transcription_backend
+
+    if name not in _instances:
+        _instances[name] = get_backend_class(name)()
+    return _instances[name]
+
+
+def available() -> list[str]:
+    """Names of all known backends"""
+    from importlib.metadata import entry_points
+
+    names = set(_BUILTIN) | set(_registry)
+    names.update(ep.name for ep in entry_points(group=ENTRY_POINT_GROUP))
+    return sorted(names)
@@ -0,0 +1,84 @@
+"""Deterministic fake backend for benchmarking and CI (no model, no GPU, no network)"""
+
+import hashlib
+import random
+import time
+import wave
+from pathlib import Path
+
+from ..config import get_config
+from ..segments import Segment, Word, join_text
+from . import Backend, Capabilities
+
+_VOCABULARY = (
+    "the quick brown fox jumps over a lazy dog while we talk about meetings "
+    "project deadlines coffee code review latency models audio and notes"
+).split()
+
+# Roughly conversational speaking rate
+_WORDS_PER_SECOND = 2.5
+
+# Words per segment, about one short sentence
+_SEGMENT_WORDS = 12
+
+
+class FakeBackend(Backend):
+    """
+    Simulates a real backend's cost profile: a one-off model load
+    (Config.fake_load_seconds) plus compute proportional to audio length
+    (Config.fake_realtime_factor seconds per second of audio).
+
+    Output text is derived from a hash of the audio, so the same file always
+    gives the same text, spread evenly over its length as timed segments.
+    All-zero (digitally silent) audio returns None.
+    """
+
+    capabilities = Capabilities(streaming=True, batching=True, timestamps=True)
+
+    @property
+    def model_id(self) -> str:
+        return "fake"
+
+    def load(self):
+        if not self.loaded:
+            time.sleep(get_config().fake_load_seconds)
+            self.loaded = True
+
+    def transcribe(self, audio_path: Path) -> str | None:
+        return join_text(self.transcribe_segments(audio_path))
+
+    def transcribe_segments(self, audio_path: Path) -> list[Segment]:
+        self.load()
+
+        with wave.open(str(audio_path), "rb") as wav:
+            rate = wav.getframerate()
+            frame_count = wav.getnframes()
+            frames = wav.readframes(frame_count)
+        duration = frame_count / rate if rate else 0.0
+
+        time.sleep(duration * get_config().fake_realtime_factor)
+
+        if not frames.strip(b"\0"):
+            return []
+
+        seed = int.from_bytes(hashlib.sha256(frames).digest()[:8], "little")
+        rng = random.Random(seed)
+        word_count = max(1, round(duration * _WORDS_PER_SECOND))
+        texts = [rng.choice(_VOCABULARY) for _ in range(word_count)]
+        step = duration / word_count
+        words = [
+            Word(i * step, (i + 1) * step, text, round(rng.uniform(0.8, 1.0), 3))
+            for i, text in enumerate(texts)
+        ]
+
+        segments = []
+        for i in range(0, word_count, _SEGMENT_WORDS):
+            group = words[i:i + _SEGMENT_WORDS]
+            segments.append(Segment(
+                start=group[0].start,
+                end=group[-1].end,
+                text=" ".join(w.text for w in group),
+                confidence=round(sum(w.confidence for w in group) / len(group), 3),
+                words=group,
+            ))
+        return segments
@@ -0,0 +1,80 @@
+"""parakeet-mlx backend (Apple Silicon optimized)"""
+
+from pathlib import Path
+
+from ..config import get_config
+from ..segments import Segment, Word, join_text
+from . import Backend, Capabilities
+
+
+def _words(tokens) -> list[Word]:
+    """Merge parakeet's subword tokens into words (a leading space starts a new word)"""
+    words: list[Word] = []
+    for token in tokens:
+        end = token.start + token.duration
+        confidence = getattr(token, "confidence", None)  # Newer parakeet-mlx only
+        if not words or token.text.startswith(" "):
+            words.append(Word(token.start, end, token.text.strip(), confidence))
+        else:
+            words[-1].text += token.text
+            words[-1].end = end
+            if confidence is not None and words[-1].confidence is not None:
+                words[-1].confidence = min(words[-1].confidence, confidence)
+    return [w for w in words if w.text]
+
+
+class ParakeetBackend(Backend):
+    """Keeps the parakeet model in memory for fast subsequent transcriptions"""
+
+    capabilities = Capabilities(streaming=True, timestamps=True)
+
+    def __init__(self):
+        super().__init__()
+        self._model = None
+
+    @property
+    def model_id(self) -> str:
+        return get_config().parakeet_model
+
+    def load(self):
+        """Load the model on first use (stays in memory for speed)"""
+        if self._model is not None:
+            return
+
+        try:
+            from parakeet_mlx import from_pretrained
+        except ImportError:
+            raise ImportError(
+                "parakeet-mlx is not installed. Install it with: pip install parakeet-mlx"
+            )
+
+        config = get_config()
+        self._model = from_pretrained(config.parakeet_model)
+        self.loaded = True
+
+    def unload(self):
+        self._model = None
+        self.loaded = False
+
+    def transcribe(self, audio_path: Path) -> str | None:
+        return join_text(self.transcribe_segments(audio_path))
+
+    def transcribe_segments(self, audio_path: Path) -> list[Segment]:
+        self.load()
+        result = self._model.transcribe(str(audio_path))
+
+        segments = []
+        for sentence in result.sentences:
+            text = sentence.text.strip()
+            if not text:
+                continue
+            words = _words(sentence.tokens)
+            confidence = getattr(sentence, "confidence", None)
+            segments.append(Segment(
+                start=sentence.start,
+                end=sentence.end,
+                text=text,
+                confidence=round(confidence, 3) if confidence is not None else None,
+                words=words,
+            ))
+        return segments
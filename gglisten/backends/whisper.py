@@ -0,0 +1,113 @@
+"""whisper.cpp backend via the whisper-cli binary"""
+
+import json
+import subprocess
+import tempfile
+from pathlib import Path
+
+from ..config import get_config
+from ..segments import Segment, Word, join_text
+from . import Backend, Capabilities
+
+
+def _is_special(token: dict) -> bool:
+    """Timestamp and control tokens, e.g. [_BEG_] or [_TT_150]"""
+    return token.get("text", "").startswith("[_")
+
+
+def _words(tokens: list[dict]) -> list[Word]:
+    """Merge subword tokens into words (a leading space starts a new word)"""
+    words: list[Word] = []
+    probs: list[list[float]] = []
+    for token in tokens:
+        if _is_special(token):
+            continue
+        text = token.get("text", "")
+        start = token["offsets"]["from"] / 1000
+        end = token["offsets"]["to"] / 1000
+        if not words or text.startswith(" "):
+            words.append(Word(start, end, text.strip()))
+            probs.append([])
+        else:
+            words[-1].text += text
+            words[-1].end = end
+        if "p" in token:
+            probs[-1].append(token["p"])
+    for word, p in zip(words, probs):
+        if p:
+            word.confidence = round(sum(p) / len(p), 3)
+    return [w for w in words if w.text]
+
+
+def parse_json(data: dict) -> list[Segment]:
+    """Segments from whisper-cli's full JSON output (-ojf)"""
+    segments = []
+    for item in data.get("transcription", []):
+        text = " ".join(item.get("text", "").split())
+        if not text:
+            continue
+        words = _words(item.get("tokens", []))
+        probs = [t["p"] for t in item.get("tokens", []) if "p" in t and not _is_special(t)]
+        segments.append(Segment(
+            start=item["offsets"]["from"] / 1000,
+            end=item["offsets"]["to"] / 1000,
+            text=text,
+            confidence=round(sum(probs) / len(probs), 3) if probs else None,
+            words=words,
+        ))
+    return segments
+
+
+class WhisperBackend(Backend):
+    """Runs whisper-cli once per file (the model is loaded by each invocation)"""
+
+    # Each file is an independent whisper-cli process, so batches run in parallel
+    capabilities = Capabilities(batching=True, timestamps=True)
+
+    @property
+    def model_id(self) -> str:
+        return get_config().whisper_model.name
+
+    def load(self):
+        """Verify whisper-cli and model exist"""
+        config = get_config()
+        if not config.whisper_cli.exists():
+            raise FileNotFoundError(f"whisper-cli not found at {config.whisper_cli}")
+        if not config.whisper_model.exists():
+            raise FileNotFoundError(f"Whisper model not found at {config.whisper_model}")
+        self.loaded = True
+
+    def transcribe(self, audio_path: Path) -> str | None:
+        return join_text(self.transcribe_segments(audio_path))
+
+    def transcribe_segments(self, audio_path: Path) -> list[Segment]:
+        config = get_config()
+        config.ensure_dirs()
+
+        # Run whisper-cli, writing segment and token timings to a JSON file
+        with tempfile.TemporaryDirectory(dir=config.temp_dir) as out_dir:
+            out_base = Path(out_dir) / "out"
+            result = subprocess.run(
+                [
+                    str(config.whisper_cli),
+                    "-m", str(config.whisper_model),
+                    "-f", str(audio_path),
+                    "-l", config.language,
+                    "-ojf",
+                    "-of", str(out_base),
+                    "-np",
+                ],
+                capture_output=True,
+                text=True,
+            )
+
+            if result.returncode != 0:
+                error = result.stderr.strip() if result.stderr else "Unknown error"
+                raise RuntimeError(f"Whisper transcription failed: {error}")
+
+            try:
+                data = json.loads(out_base.with_suffix(".json").read_text())
+            except (OSError, json.JSONDecodeError) as e:
+                raise RuntimeError(f"Whisper transcription failed: unreadable output ({e})")
+
+        return parse_json(data)
@@ -0,0 +1,254 @@
+"""Long-lived whisper.cpp server that keeps the ggml model resident between requests"""
+
+import json
+import math
+import os
+import signal
+import socket
+import subprocess
+import time
+import urllib.error
+import urllib.request
+import uuid
+from pathlib import Path
+
+from .. import procinfo
+from ..config import get_config
+from ..segments import Segment, Word, join_text
+from . import Backend, Capabilities
+
+# Seconds to wait for the server to exit after SIGTERM before killing it, and
+# for its port to be released after that
+STOP_TIMEOUT = 5.0
+PORT_RELEASE_TIMEOUT = 2.0
+
+
+def _base_url() -> str:
+    config = get_config()
+    return f"http://127.0.0.1:{config.whisper_server_port}"
+
+
+def _read_pid_info() -> dict | None:
+    """Read the pid and launch parameters of the server we started, if any"""
+    config = get_config()
+    try:
+        return json.loads(config.whisper_server_pid_file.read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _launch_params() -> dict:
+    """Parameters that require a restart when they change"""
+    config = get_config()
+    return {
+        "model": str(config.whisper_model),
+        "port": config.whisper_server_port,
+        "language": config.language,
+    }
+
+
+def is_healthy(timeout: float = 1.0) -> bool:
+    """Check that the server is up and has finished loading the model"""
+    try:
+        with urllib.request.urlopen(f"{_base_url()}/health", timeout=timeout) as resp:
+            return resp.status == 200
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def _process_alive(info: dict) -> bool:
+    """Whether the server in the pid file is still running (and its pid not reused)"""
+    return procinfo.is_alive(info["pid"], info.get("pid_start"))
+
+
+def _port_in_use() -> bool:
+    try:
+        with socket.create_connection(("127.0.0.1", get_config().whisper_server_port), timeout=0.2):
+            return True
+    except OSError:
+        return False
+
+
+def stop():
+    """
+    Stop the server if we started one. Returns once it has exited (killing it
+    if SIGTERM isn't enough) and released its port, so it can be restarted.
+    """
+    config = get_config()
+    info = _read_pid_info()
+    if info and _process_alive(info):
+        pid = info["pid"]
+        try:
+            os.kill(pid, signal.SIGTERM)
+            if not procinfo.wait_for_exit(pid, STOP_TIMEOUT):
+                os.kill(pid, signal.SIGKILL)
+                procinfo.wait_for_exit(pid, 1.0)
+        except OSError:
+            pass  # Already gone
+        deadline = time.monotonic() + PORT_RELEASE_TIMEOUT
+        while _port_in_use() and time.monotonic() < deadline:
+            time.sleep(0.05)
+    config.whisper_server_pid_file.unlink(missing_ok=True)
+
+
+def _start():
+    """Launch the server detached, so it outlives the current gglisten process"""
+    config = get_config()
+
+    if not config.whisper_server.exists():
+        raise FileNotFoundError(f"whisper-server not found at {config.whisper_server}")
+    if not config.whisper_model.exists():
+        raise FileNotFoundError(f"Whisper model not found at {config.whisper_model}")
+    if _port_in_use():
+        raise RuntimeError(
+            f"Port {config.whisper_server_port} is in use by another process (set whisper_server_port)"
+        )
+
+    log = open(config.temp_dir / "whisper-server.log", "ab")
+    proc = subprocess.Popen(
+        [
+            str(config.whisper_server),
+            "-m", str(config.whisper_model),
+            "-l", config.language,
+            "--host", "127.0.0.1",
+            "--port", str(config.whisper_server_port),
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=log,
+        stderr=log,
+        start_new_session=True,
+    )
+    log.close()
+
+    config.whisper_server_pid_file.write_text(json.dumps({
+        "pid": proc.pid,
+        "pid_start": procinfo.start_time(proc.pid),
+        **_launch_params(),
+    }))
+
+    # Wait for the model to load
+    deadline = time.monotonic() + config.whisper_server_start_timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(
+                f"whisper-server exited during startup (see {config.temp_dir / 'whisper-server.log'})"
+            )
+        if is_healthy(timeout=0.5):
+            return
+        time.sleep(0.05)
+
+    stop()
+    raise RuntimeError("whisper-server did not become healthy in time")
+
+
+def ensure_running():
+    """
+    Make sure a healthy server with the current model is running.
+    Restarts it if it died, hung, or was started with different settings.
+    """
+    info = _read_pid_info()
+    if info and _process_alive(info):
+        same_params = {k: info.get(k) for k in _launch_params()} == _launch_params()
+        if same_params and is_healthy():
+            return
+        stop()
+    _start()
+
+
+def _encode_multipart(fields: dict[str, str], file_field: str, file_path: Path) -> tuple[bytes, str]:
+    """Build a multipart/form-data body. Returns (body, content_type)."""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; '
+        f'filename="{file_path.name}"\r\nContent-Type: audio/wav\r\n\r\n'.encode()
+    )
+    parts.append(file_path.read_bytes())
+    parts.append(f"\r\n--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def _inference(audio_path: Path) -> dict:
+    config = get_config()
+    body, content_type = _encode_multipart(
+        {"response_format": "verbose_json", "temperature": "0.0", "language": config.language},
+        "file",
+        audio_path,
+    )
+    req = urllib.request.Request(
+        f"{_base_url()}/inference",
+        data=body,
+        headers={"Content-Type": content_type},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=config.whisper_server_request_timeout) as resp:
+        return json.loads(resp.read())
+
+
+def _parse_segments(result: dict) -> list[Segment]:
+    """Segments from a verbose_json response (the whole text as one if it has none)"""
+    if "segments" not in result:
+        text = " ".join(result.get("text", "").split())
+        return [Segment(0.0, result.get("duration", 0.0), text)] if text else []
+
+    segments = []
+    for item in result["segments"]:
+        text = " ".join(item.get("text", "").split())
+        if not text:
+            continue
+        logprob = item.get("avg_logprob")
+        segments.append(Segment(
+            start=item["start"],
+            end=item["end"],
+            text=text,
+            confidence=round(math.exp(logprob), 3) if logprob is not None else None,
+            words=[
+                Word(w["start"], w["end"], w["word"].strip(), w.get("probability"))
+                for w in item.get("words", [])
+                if w.get("word", "").strip()
+            ],
+        ))
+    return segments
+
+
+class WhisperServerBackend(Backend):
+    """Sends each file to a resident whisper-server, (re)starting it if needed"""
+
+    capabilities = Capabilities(timestamps=True)
+
+    @property
+    def model_id(self) -> str:
+        return get_config().whisper_model.name
+
+    def load(self):
+        ensure_running()
+        self.loaded = True
+
+    def unload(self):
+        stop()
+        self.loaded = False
+
+    def transcribe(self, audio_path: Path) -> str | None:
+        return join_text(self.transcribe_segments(audio_path))
+
+    def transcribe_segments(self, audio_path: Path) -> list[Segment]:
+        ensure_running()
+
+        try:
+            result = _inference(audio_path)
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"Whisper server transcription failed: HTTP {e.code}")
+        except (urllib.error.URLError, ConnectionError):
+            # Server died between the health check and the request; retry once
+            stop()
+            ensure_running()
+            result = _inference(audio_path)
+
+        if "error" in result:
+            raise RuntimeError(f"Whisper server transcription failed: {result['error']}")
+
+        return _parse_segments(result)
@@ -0,0 +1,145 @@
+"""Batch transcription of archived recordings
+
+Each file goes through the same pipeline as a dictation (transcriber.transcribe_speech):
+silence trimming, the transcript cache, windowing of long recordings, and
+segment timings, which are saved with the transcription. Archived (FLAC or
+Opus) and other compressed files are decoded to a temporary WAV first.
+"""
+
+import glob
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from . import archive, backends, storage, transcriber
+from .segments import join_text
+from .storage import Transcription
+
+AUDIO_EXTENSIONS = {".wav", ".flac", ".mp3", ".ogg", ".m4a"}
+
+# Results are written to the database in transactions of this many records
+COMMIT_EVERY = 25
+
+
+def find_audio_files(pattern: str) -> list[Path]:
+    """Expand a directory (searched recursively) or glob pattern into audio files"""
+    path = Path(pattern).expanduser()
+    if path.is_dir():
+        candidates = path.rglob("*")
+    else:
+        candidates = (Path(p) for p in glob.glob(str(path), recursive=True))
+    return sorted(p.resolve() for p in candidates if p.is_file() and p.suffix.lower() in AUDIO_EXTENSIONS)
+
+
+def _transcribe_file(path: Path):
+    """Transcribe one file like a dictation, decoding it first unless it's a WAV"""
+    with archive.open_wav(path) as wav_path:
+        return transcriber.transcribe_speech(wav_path)
+
+
+def run(pattern: str, workers: int = 4, force: bool = False) -> int:
+    """
+    Transcribe every audio file matching pattern with the configured backend.
+
+    Files already stored for the same model are skipped unless force is set,
+    so an interrupted batch resumes where it left off. Backends that can run
+    several transcriptions at once (capabilities.batching) get `workers`
+    files in flight.
+    """
+    files = find_audio_files(pattern)
+    if not files:
+        print(f"No audio files found for {pattern}")
+        return 1
+
+    backend = backends.get_backend()
+    model = backend.model_id
+
+    if not force:
+        done = storage.get_transcribed_paths(model)
+        skipped = sum(1 for f in files if str(f) in done)
+        files = [f for f in files if str(f) not in done]
+        if skipped:
+            print(f"Skipping {skipped} file(s) already transcribed with {model}")
+    if not files:
+        print("Nothing to do")
+        return 0
+
+    # Backends that can't batch share one warm model in this process
+    if not backend.capabilities.batching:
+        workers = 1
+    print(f"Transcribing {len(files)} file(s) with {backend.name} ({model}), {workers} worker(s)")
+
+    try:
+        backend.load()
+    except (FileNotFoundError, ImportError) as e:
+        print(f"Setup error: {e}")
+        return 1
+
+    pending: list[Transcription] = []
+    pending_segments: list[list] = []
+    counts = {"done": 0, "empty": 0, "failed": 0}
+    start = time.perf_counter()
+
+    def flush():
+        storage.save_many(pending, pending_segments)
+        pending.clear()
+        pending_segments.clear()
+
+    def on_result(path: Path, segments: list, vad_result, error: Exception | None):
+        finished = sum(counts.values()) + 1
+        prefix = f"[{finished}/{len(files)}] {path.name}"
+        if error is not None:
+            counts["failed"] += 1
+            print(f"{prefix}: failed: {error}")
+            return
+        text = join_text(segments)
+        if not text:
+            counts["empty"] += 1
+            print(f"{prefix}: no speech detected")
+            return
+
+        counts["done"] += 1
+        preview = text[:50] + "..." if len(text) > 50 else text
+        print(f"{prefix}: {preview}")
+        metadata = {"batch": True}
+        if vad_result:
+            metadata["vad_trimmed_s"] = round(vad_result.trimmed, 3)
+        pending.append(Transcription(
+            id=None,
+            timestamp=time.time(),
+            duration=transcriber.get_audio_duration(path),
+            text=text,
+            audio_path=str(path),
+            model=model,
+            metadata=metadata,
+        ))
+        pending_segments.append(segments)
+        if len(pending) >= COMMIT_EVERY:
+            flush()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(_transcribe_file, path): path for path in files}
+            try:
+                for future in as_completed(futures):
+                    try:
+                        segments, vad_result = future.result()
+                    except Exception as e:
+                        on_result(futures[future], [], None, e)
+                    else:
+                        on_result(futures[future], segments, vad_result, None)
+            except KeyboardInterrupt:
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        # Keep whatever finished, even if interrupted
+        if pending:
+            flush()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Done in {elapsed:.1f}s: {counts['done']} transcribed, "
+        f"{counts['empty']} without speech, {counts['failed']} failed"
+    )
+    return 1 if counts["failed"] else 0
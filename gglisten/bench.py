@@ -0,0 +1,360 @@
+"""Benchmarks for gglisten's latency-critical paths"""
+
+import array
+import json
+import math
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from contextlib import contextmanager
+from pathlib import Path
+
+from .config import get_config
+
+# Each mode runs in a fresh interpreter, like a Raycast hotkey press does
+_COLD_SNIPPET = (
+    "import sys; from pathlib import Path; from gglisten import transcriber; "
+    "transcriber.transcribe(Path(sys.argv[1]))"
+)
+_WARM_SNIPPET = (
+    "import sys; from pathlib import Path; from gglisten import daemon; "
+    "daemon.transcribe(Path(sys.argv[1]))"
+)
+
+# Import-time budget (ms) for `gglisten toggle` starting a recording, beyond
+# what a bare interpreter imports anyway (see startup and tests/test_startup.py)
+START_BUDGET_MS = 45.0
+
+# Modules that must never be imported when toggle starts a recording: each
+# is only needed once the recording stops, and costs milliseconds to import
+START_FORBIDDEN = ("argparse", "dataclasses", "sqlite3", "numpy", "asyncio", "litellm", "instructor")
+
+# Recorders toggle_sandbox can start with: the default (ffmpeg) and standby
+# capture of a generated tone
+SANDBOX_RECORDERS = ("ffmpeg", "standby")
+
+# Config for toggle_sandbox: a stop that only queues, so no model or mic is
+# needed. The recorder's own settings are added per recorder.
+_SANDBOX_CONFIG = {
+    "queue_transcriptions": True,
+    "transcription_backend": "fake",
+    "fake_load_seconds": 0,
+    "fake_realtime_factor": 0,
+    "use_daemon": False,
+    "show_level_meter": False,
+    "archive_audio": False,
+    "worker_idle_timeout": 1,
+}
+
+# Stands in for ffmpeg in toggle_sandbox, taking the same command line: writes
+# silence to the output WAV until interrupted (or the WAV is removed), then
+# completes its header.
+# ffmpeg itself would need macOS (avfoundation) and a microphone.
+_FFMPEG_STAND_IN = """\
+import os, signal, sys, time, wave
+
+out = wave.open(sys.argv[-1], "wb")
+out.setnchannels(1)
+out.setsampwidth(2)
+out.setframerate(16000)
+stopped = []
+signal.signal(signal.SIGINT, lambda *_: stopped.append(True))
+while not stopped and os.path.exists(sys.argv[-1]):
+    out.writeframes(bytes(1600))
+    time.sleep(0.05)
+out.close()
+"""
+
+
+def _time_subprocess(snippet: str, audio_path: Path) -> float:
+    """Run a snippet in a fresh interpreter, returning wall-clock seconds"""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", snippet, str(audio_path)],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+def _report(label: str, samples: list[float]):
+    """Print summary statistics for a list of timings in seconds"""
+    print(
+        f"  {label:<10} median {statistics.median(samples) * 1000:8.1f} ms"
+        f"   min {min(samples) * 1000:8.1f} ms"
+        f"   max {max(samples) * 1000:8.1f} ms"
+    )
+
+
+def latency(audio_path: str | None = None, runs: int = 5) -> int:
+    """
+    Compare cold (in-process, model loaded per call) and warm (daemon)
+    stop-to-text latency for the same audio file.
+    """
+    from . import daemon
+
+    config = get_config()
+    path = Path(audio_path) if audio_path else config.audio_file
+    if not path.exists():
+        print(f"Audio file not found: {path}")
+        return 1
+
+    print(f"Backend: {config.transcription_backend}, file: {path}, runs: {runs}")
+
+    cold = [_time_subprocess(_COLD_SNIPPET, path) for _ in range(runs)]
+    _report("cold", cold)
+
+    if not daemon.is_running():
+        print("  warm       skipped (start one with `gglisten daemon`)")
+        return 0
+
+    # First daemon request may still be paying for lazy loading; don't count it
+    _time_subprocess(_WARM_SNIPPET, path)
+    warm = [_time_subprocess(_WARM_SNIPPET, path) for _ in range(runs)]
+    _report("warm", warm)
+
+    speedup = statistics.median(cold) / statistics.median(warm)
+    print(f"  warm is {speedup:.1f}x faster")
+    return 0
+
+
+def write_test_wav(path: Path, seconds: float, sample_rate: int = 16000):
+    """Write a deterministic mono 16-bit WAV: a warbling tone with short pauses"""
+    samples = array.array("h")
+    for i in range(int(seconds * sample_rate)):
+        t = i / sample_rate
+        # 0.25 s of silence every 2 s, so the audio has speech-like gaps
+        if t % 2.0 > 1.75:
+            samples.append(0)
+            continue
+        freq = 220 + 80 * math.sin(2 * math.pi * 0.5 * t)
+        samples.append(int(8000 * math.sin(2 * math.pi * freq * t)))
+
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+
+
+def pipeline(runs: int = 5, seconds: float = 10.0) -> int:
+    """
+    Time the stop -> transcribe -> store -> paste pipeline with the fake backend
+    and a throwaway database, so it runs on any machine.
+    """
+    from . import clipboard, storage, transcriber
+
+    config = get_config()
+    workdir = Path(tempfile.mkdtemp(prefix="gglisten-bench-"))
+    config.transcription_backend = "fake"
+    config.db_path = workdir / "bench.db"
+
+    audio = workdir / "bench.wav"
+    write_test_wav(audio, seconds, config.sample_rate)
+
+    can_paste = shutil.which("pbcopy") is not None
+    print(
+        f"Backend: fake (load {config.fake_load_seconds}s, "
+        f"{config.fake_realtime_factor}s per audio second), {seconds:.0f}s audio, runs: {runs}"
+    )
+
+    stages: dict[str, list[float]] = {"transcribe": [], "store": [], "paste": []}
+    try:
+        for run in range(runs + 1):
+            t0 = time.perf_counter()
+            text = transcriber.transcribe(audio)
+            t1 = time.perf_counter()
+            storage.save(text=text, duration=seconds, audio_path=audio, model=transcriber.model_id())
+            t2 = time.perf_counter()
+            if can_paste:
+                clipboard.copy(text)
+            t3 = time.perf_counter()
+
+            if run == 0:
+                # First run includes the simulated model load
+                _report("cold", [t1 - t0])
+                continue
+            stages["transcribe"].append(t1 - t0)
+            stages["store"].append(t2 - t1)
+            stages["paste"].append(t3 - t2)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for name, samples in stages.items():
+        if name == "paste" and not can_paste:
+            print(f"  {name:<10} skipped (pbcopy not available)")
+            continue
+        _report(name, samples)
+    return 0
+
+
+def storage_throughput(count: int = 2000) -> int:
+    """Measure save() and get_recent() throughput against a throwaway database"""
+    from . import storage
+
+    config = get_config()
+    workdir = Path(tempfile.mkdtemp(prefix="gglisten-bench-"))
+    config.db_path = workdir / "bench.db"
+
+    text = "the quick brown fox jumps over the lazy dog " * 5
+    try:
+        start = time.perf_counter()
+        for _ in range(count):
+            storage.save(text=text, duration=4.2, model="bench")
+        save_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(count):
+            storage.get_recent(limit=10)
+        recent_elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"Storage throughput ({count} ops each):")
+    print(f"  save        {count / save_elapsed:10.0f} ops/s   {save_elapsed / count * 1e6:8.1f} us/op")
+    print(f"  get_recent  {count / recent_elapsed:10.0f} ops/s   {recent_elapsed / count * 1e6:8.1f} us/op")
+    return 0
+
+
+@contextmanager
+def toggle_sandbox(recorder: str = "ffmpeg"):
+    """
+    Run `gglisten toggle` against a throwaway home, recording with recorder
+    (one of SANDBOX_RECORDERS): a stand-in for ffmpeg, or a standby capture
+    process.
+
+    Yields the environment to run toggles with. Nothing touches the user's
+    config, history or microphone.
+    """
+    from . import ipc
+
+    workdir = Path(tempfile.mkdtemp(prefix="gglisten-startup-"))
+    home = workdir / "home"
+    (home / ".config/gglisten").mkdir(parents=True)
+    config = dict(_SANDBOX_CONFIG)
+    if recorder == "standby":
+        config.update(standby_capture=True, capture_source="sine")
+    else:
+        ffmpeg = workdir / "ffmpeg"
+        ffmpeg.write_text(f"#!{sys.executable}\n{_FFMPEG_STAND_IN}")
+        ffmpeg.chmod(0o755)
+        config["ffmpeg_bin"] = str(ffmpeg)
+    (home / ".config/gglisten/config.json").write_text(json.dumps(config))
+    env = dict(os.environ, HOME=str(home), GGLISTEN_TEMP_DIR=str(workdir / "tmp"))
+
+    capture_proc = None
+    try:
+        if recorder == "standby":
+            capture_proc = subprocess.Popen(
+                [sys.executable, "-m", "gglisten.cli", "capture"],
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            sock = Path(env["GGLISTEN_TEMP_DIR"]) / "capture.sock"
+            deadline = time.monotonic() + 10
+            while not ipc.is_listening(sock):
+                if time.monotonic() > deadline or capture_proc.poll() is not None:
+                    raise RuntimeError("Capture process did not start")
+                time.sleep(0.05)
+        yield env
+    finally:
+        if capture_proc is not None:
+            capture_proc.terminate()
+            try:
+                capture_proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                capture_proc.kill()
+        # The queued recordings' worker exits once idle, and a stand-in ffmpeg
+        # once its output is gone; don't wait for either
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _importtime(argv: list[str], env: dict | None = None) -> list[tuple[int, int, str]]:
+    """Run `python -X importtime argv`; returns (self_us, cumulative_us, name) rows"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+        stdin=subprocess.DEVNULL,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Name is indented two spaces per nesting level after one separator space
+        rows.append((int(self_us), int(cumulative_us), name[1:].rstrip()))
+    return rows
+
+
+def baseline_imports() -> set[str]:
+    """Modules a bare interpreter imports before running anything"""
+    return {name.strip() for _, _, name in _importtime(["-c", "pass"])}
+
+
+def toggle_imports(env: dict, baseline: set[str]) -> tuple[float, list[tuple[int, int, str]]]:
+    """
+    Run one real `gglisten toggle` in env under -X importtime.
+
+    Returns the import time (ms) beyond the baseline and the rows for the
+    modules it imported.
+    """
+    rows = [r for r in _importtime(["-m", "gglisten.cli", "toggle"], env) if r[2].strip() not in baseline]
+    total_us = sum(cumulative for _, cumulative, name in rows if not name.startswith(" "))
+    return total_us / 1000, rows
+
+
+def startup(runs: int = 10, budget_ms: float | None = None, top: int = 12) -> int:
+    """
+    Report where `gglisten toggle` spends its start-up time on each path.
+
+    Toggles run in a sandbox (see toggle_sandbox) with each of
+    SANDBOX_RECORDERS, alternately starting and stopping a recording. Exits
+    non-zero if a start path imports a module in START_FORBIDDEN, or if its
+    import time (median over runs) goes over budget_ms (default
+    START_BUDGET_MS), so it can be used as a CI check.
+    """
+    budget_ms = START_BUDGET_MS if budget_ms is None else budget_ms
+    baseline = baseline_imports()
+    bare = statistics.median(_time_subprocess("pass", Path(".")) for _ in range(runs))
+
+    failed = False
+    for recorder in SANDBOX_RECORDERS:
+        samples: dict[str, list[tuple[float, list]]] = {"start": [], "stop": []}
+        with toggle_sandbox(recorder) as env:
+            for _ in range(runs):
+                for path in samples:
+                    samples[path].append(toggle_imports(env, baseline))
+
+        for path, path_samples in samples.items():
+            costs = [cost for cost, _ in path_samples]
+            cost = statistics.median(costs)
+            print(f"toggle {path} ({recorder}): imports {cost:.1f} ms (bare interpreter {bare * 1000:.1f} ms)")
+
+            # Breakdown from the median run, heaviest modules first (self time)
+            _, rows = path_samples[costs.index(cost)] if cost in costs else path_samples[0]
+            for self_us, cumulative_us, name in sorted(rows, reverse=True)[:top]:
+                print(f"  {self_us / 1000:7.2f} ms self  {cumulative_us / 1000:7.2f} ms cumulative  {name.strip()}")
+            print()
+
+        start_cost = statistics.median(cost for cost, _ in samples["start"])
+        imported = {name.strip() for _, rows in samples["start"] for _, _, name in rows}
+        forbidden = sorted(imported.intersection(START_FORBIDDEN))
+        if forbidden:
+            print(f"FAIL: toggle start ({recorder}) imports {', '.join(forbidden)}")
+            failed = True
+        elif start_cost > budget_ms:
+            print(f"FAIL: toggle start ({recorder}) imports take {start_cost:.1f} ms (budget {budget_ms:.1f} ms)")
+            failed = True
+        else:
+            print(f"OK: toggle start ({recorder}) imports take {start_cost:.1f} ms (budget {budget_ms:.1f} ms)")
+        print()
+    return 1 if failed else 0
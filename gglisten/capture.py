@@ -0,0 +1,451 @@
+"""Standby capture: keep the input open so recording starts instantly
+
+`gglisten capture` holds the input device open and keeps the last few seconds
+of audio in an in-memory ring buffer. Starting a recording then only marks a
+position in the stream (minus a configurable pre-roll, so the first words
+aren't clipped) and from there every block is appended to the WAV file.
+There's no ffmpeg start-up or device open on the hotkey path.
+
+Input sources (capture_source):
+    "ffmpeg"       the microphone via ffmpeg/avfoundation
+    "portaudio"    the microphone read in-process via sounddevice (optional
+                   dependency: pip install 'gglisten[portaudio]')
+    "sine"         a generated tone, for testing without a microphone
+    "file:<path>"  a WAV file, looped, for testing with real speech
+
+With capture_backend "native" the ring buffer is preallocated large enough to
+hold a whole recording (capture_buffer_seconds), and nothing touches the disk
+until stop, when the WAV is written in one go. A recording that outgrows the
+buffer continues on disk.
+
+The capture process also publishes input levels (see levels.py) while
+recording, so the level meter keeps working.
+"""
+
+import math
+import os
+import signal
+import subprocess
+import threading
+import time
+import wave
+from pathlib import Path
+
+from . import ipc
+from .config import get_config
+
+# Audio is read from the source in blocks of this length
+BLOCK_MS = 20
+
+
+class CaptureUnavailable(Exception):
+    """Raised when no standby capture process is running"""
+
+
+class _Source:
+    """A stream of 16-bit PCM blocks"""
+
+    def read(self, frames: int) -> bytes:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class _FfmpegSource(_Source):
+    """The default input device, via ffmpeg writing raw PCM to a pipe"""
+
+    def __init__(self, sample_rate: int, channels: int):
+        config = get_config()
+        self._frame_bytes = 2 * channels
+        self._proc = subprocess.Popen(
+            [
+                str(config.ffmpeg_bin),
+                "-f", "avfoundation",
+                "-i", ":default",
+                "-ar", str(sample_rate),
+                "-ac", str(channels),
+                "-f", "s16le",
+                "pipe:1",
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def read(self, frames: int) -> bytes:
+        return self._proc.stdout.read(frames * self._frame_bytes)
+
+    def close(self):
+        self._proc.terminate()
+        self._proc.wait()
+
+
+class _PacedSource(_Source):
+    """Base for generated sources: delivers blocks at real-time pace"""
+
+    def __init__(self, sample_rate: int):
+        self._sample_rate = sample_rate
+        self._frames_read = 0
+        self._t0 = time.monotonic()
+
+    def _generate(self, frames: int) -> bytes:
+        raise NotImplementedError
+
+    def read(self, frames: int) -> bytes:
+        self._frames_read += frames
+        delay = self._t0 + self._frames_read / self._sample_rate - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        return self._generate(frames)
+
+
+class _SineSource(_PacedSource):
+    """A 440 Hz tone at about -18 dBFS"""
+
+    def __init__(self, sample_rate: int, channels: int):
+        super().__init__(sample_rate)
+        self._channels = channels
+        self._phase = 0
+
+    def _generate(self, frames: int) -> bytes:
+        import numpy as np
+
+        t = (self._phase + np.arange(frames)) / self._sample_rate
+        self._phase += frames
+        tone = (8000 * np.sin(2 * math.pi * 440 * t)).astype("<i2")
+        return np.repeat(tone, self._channels).tobytes()
+
+
+class _FileSource(_PacedSource):
+    """A WAV file in the capture format, looped forever"""
+
+    def __init__(self, path: Path, sample_rate: int, channels: int):
+        super().__init__(sample_rate)
+        with wave.open(str(path), "rb") as wav:
+            if (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) != (sample_rate, channels, 2):
+                raise ValueError(f"{path} must be {sample_rate} Hz, {channels} channel(s), 16-bit")
+            self._data = wav.readframes(wav.getnframes())
+        if not self._data:
+            raise ValueError(f"{path} is empty")
+        self._frame_bytes = 2 * channels
+        self._pos = 0
+
+    def _generate(self, frames: int) -> bytes:
+        want = frames * self._frame_bytes
+        out = b""
+        while len(out) < want:
+            chunk = self._data[self._pos:self._pos + want - len(out)]
+            self._pos = (self._pos + len(chunk)) % len(self._data)
+            out += chunk
+        return out
+
+
+class _PortAudioSource(_Source):
+    """The default input device, read in-process through PortAudio"""
+
+    def __init__(self, sample_rate: int, channels: int):
+        try:
+            import sounddevice
+        except ImportError:
+            raise ImportError(
+                "sounddevice is not installed. Install it with: pip install 'gglisten[portaudio]'"
+            )
+        try:
+            self._stream = sounddevice.RawInputStream(samplerate=sample_rate, channels=channels, dtype="int16")
+            self._stream.start()
+        except sounddevice.PortAudioError as e:
+            raise OSError(f"PortAudio: {e}") from e
+
+    def read(self, frames: int) -> bytes:
+        # Blocks until the frames are there; an overflow means frames were
+        # dropped while we weren't reading, which the stream survives
+        data, _overflowed = self._stream.read(frames)
+        return bytes(data)
+
+    def close(self):
+        self._stream.stop()
+        self._stream.close()
+
+
+def open_source(spec: str, sample_rate: int, channels: int) -> _Source:
+    """Open a capture source from its capture_source name"""
+    if spec == "ffmpeg":
+        return _FfmpegSource(sample_rate, channels)
+    if spec == "portaudio":
+        return _PortAudioSource(sample_rate, channels)
+    if spec == "sine":
+        return _SineSource(sample_rate, channels)
+    if spec.startswith("file:"):
+        return _FileSource(Path(spec[len("file:"):]).expanduser(), sample_rate, channels)
+    raise ValueError(f"Unknown capture source: {spec}")
+
+
+class RingBuffer:
+    """The most recent frames of a PCM stream, addressed by absolute frame position"""
+
+    def __init__(self, frames: int, channels: int):
+        import numpy as np
+
+        self._buf = np.zeros((frames, channels), dtype="<i2")
+        self.total = 0  # Frames written since the start of the stream
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buf)
+
+    @property
+    def oldest(self) -> int:
+        """Absolute position of the oldest frame still held"""
+        return max(0, self.total - len(self._buf))
+
+    def write(self, block):
+        size = len(self._buf)
+        if len(block) > size:
+            self.total += len(block) - size  # Older frames would fall out anyway
+            block = block[-size:]
+        start = self.total % size
+        first = min(len(block), size - start)
+        self._buf[start:start + first] = block[:first]
+        self._buf[:len(block) - first] = block[first:]
+        self.total += len(block)
+
+    def since(self, position: int):
+        """Frames from position (clamped to the oldest held) up to now"""
+        import numpy as np
+
+        position = max(position, self.oldest)
+        size = len(self._buf)
+        start, end = position % size, self.total % size
+        if position == self.total:
+            return self._buf[:0]
+        if start < end:
+            return self._buf[start:end].copy()
+        return np.concatenate((self._buf[start:], self._buf[:end]))
+
+
+class StandbyCapture:
+    """
+    Reads the source continuously; writes to a WAV file while recording.
+
+    With buffer_seconds, recordings up to that long are held in the ring
+    buffer and the WAV is only written when they stop.
+    """
+
+    def __init__(
+        self,
+        source: _Source,
+        sample_rate: int,
+        channels: int,
+        preroll_ms: int,
+        buffer_seconds: float = 0,
+    ):
+        self.source = source
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.preroll = sample_rate * preroll_ms // 1000
+        self.buffered = buffer_seconds > 0
+        # Room for the pre-roll (and a buffered recording) plus a second of slack
+        self.ring = RingBuffer(self.preroll + int(buffer_seconds * sample_rate) + sample_rate, channels)
+        self._lock = threading.Lock()
+        self._path: Path | None = None  # Set while recording
+        self._wav: wave.Wave_write | None = None
+        self._start_position = 0
+        self._levels = None
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        import numpy as np
+        from . import levels
+
+        block_frames = self.sample_rate * BLOCK_MS // 1000
+        while self._running:
+            data = self.source.read(block_frames)
+            if not data:
+                break  # Source ended (e.g. ffmpeg lost the device)
+            block = np.frombuffer(data, dtype="<i2").reshape(-1, self.channels)
+            with self._lock:
+                if (
+                    self._path is not None and self._wav is None
+                    and self.ring.total + len(block) - self._start_position > self.ring.capacity
+                ):
+                    self._open_wav()  # Outgrowing the buffer; continue on disk
+                self.ring.write(block)
+                if self._wav is not None:
+                    self._wav.writeframesraw(data)  # Header sizes are fixed up on close
+                if self._path is not None and self._levels is not None:
+                    self._levels.publish(*levels.measure(data))
+        self._running = False
+
+    def _open_wav(self):
+        """Open the recording's WAV file and write what has been captured so far"""
+        self._wav = wave.open(str(self._path), "wb")
+        self._wav.setnchannels(self.channels)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(self.sample_rate)
+        self._wav.writeframesraw(self.ring.since(self._start_position).tobytes())
+
+    def _finish(self):
+        """Complete the recording's WAV file"""
+        if self._wav is None:
+            self._open_wav()
+        self._wav.close()
+        self._wav = None
+        self._path = None
+        if self._levels is not None:
+            self._levels.close()
+            self._levels = None
+
+    def start_thread(self):
+        self._thread.start()
+
+    def start(self, path: Path) -> dict:
+        """Start writing to path, beginning preroll frames back"""
+        from . import levels
+
+        with self._lock:
+            if self._path is not None:
+                self._finish()
+            self._start_position = max(self.ring.total - self.preroll, self.ring.oldest)
+            self._path = path
+            if not self.buffered:
+                self._open_wav()
+            try:
+                self._levels = levels.LevelWriter(get_config().levels_file)
+            except OSError:
+                self._levels = None
+            preroll = self.ring.total - self._start_position
+        return {"preroll_ms": preroll * 1000 // self.sample_rate}
+
+    def stop(self) -> dict:
+        """Finish the recording. The WAV file is complete when this returns."""
+        with self._lock:
+            if self._path is None:
+                raise RuntimeError("Not recording")
+            frames = self.ring.total - self._start_position
+            self._finish()
+        return {"frames": frames}
+
+    @property
+    def alive(self) -> bool:
+        return self._running
+
+    def close(self):
+        self._running = False
+        self._thread.join(timeout=1.0)
+        self.source.close()
+
+
+# ---- Client side (used by recorder) ----
+
+def _request(payload: dict) -> dict:
+    try:
+        resp = ipc.request(get_config().capture_socket, payload, timeout=5.0)
+    except (ipc.Unavailable, OSError) as e:
+        raise CaptureUnavailable(str(e)) from e
+    if not resp.get("ok"):
+        raise RuntimeError(resp.get("error", "Unknown capture error"))
+    return resp
+
+
+def is_running() -> bool:
+    """Check if a standby capture process is listening"""
+    return ipc.is_listening(get_config().capture_socket)
+
+
+def start(path: Path) -> dict:
+    """
+    Start recording to path in the standby capture process.
+    Returns {"pid", "preroll_ms"}; raises CaptureUnavailable if none is running.
+    """
+    return _request({"op": "start", "path": str(Path(path).resolve())})
+
+
+def stop() -> dict:
+    """Stop recording. Returns {"frames"} once the WAV file is complete."""
+    return _request({"op": "stop"})
+
+
+def shutdown() -> bool:
+    """Ask a running capture process to exit. Returns True if one was running."""
+    try:
+        _request({"op": "shutdown"})
+        return True
+    except CaptureUnavailable:
+        return False
+
+
+# ---- Server side ----
+
+# Set by the "shutdown" op; checked by the serve loop between requests
+_stop_requested = False
+
+
+def serve(source_spec: str | None = None) -> int:
+    """Run the standby capture process in the foreground until stopped"""
+    config = get_config()
+    config.ensure_dirs()
+    spec = source_spec or config.capture_source
+
+    try:
+        source = open_source(spec, config.sample_rate, config.channels)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"Could not open capture source: {e}")
+        return 1
+    buffer_seconds = config.capture_buffer_seconds if config.capture_backend == "native" else 0
+    capture = StandbyCapture(
+        source, config.sample_rate, config.channels, config.capture_preroll_ms, buffer_seconds
+    )
+
+    def handle(req: dict) -> dict:
+        global _stop_requested
+        op = req.get("op")
+        try:
+            if op == "start":
+                if not capture.alive:
+                    return {"ok": False, "error": "Capture source has stopped"}
+                return {"ok": True, "pid": os.getpid(), **capture.start(Path(req["path"]))}
+            elif op == "stop":
+                return {"ok": True, **capture.stop()}
+            elif op == "shutdown":
+                _stop_requested = True
+                return {"ok": True}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        return {"ok": False, "error": f"Unknown op: {op}"}
+
+    try:
+        server = ipc.serve(config.capture_socket, handle)
+    except RuntimeError as e:
+        print(e)
+        source.close()
+        return 1
+
+    def _shutdown(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    # Wake up between requests to notice a dead source
+    server.timeout = 1.0
+    capture.start_thread()
+    print(f"Capturing from {spec} ({config.capture_preroll_ms} ms pre-roll)")
+    if capture.buffered:
+        print(f"Recordings held in memory up to {buffer_seconds:g}s, written at stop")
+    print(f"Listening on {config.capture_socket}")
+    try:
+        while not _stop_requested and capture.alive:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source_ended = not capture.alive
+        server.server_close()
+        config.capture_socket.unlink(missing_ok=True)
+        capture.close()
+
+    if source_ended:
+        print("Capture source ended")
+    print("Capture stopped")
+    return 0
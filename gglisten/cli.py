@@ -1,20 +1,155 @@
 """Command-line interface for gglisten"""
 
-import argparse
 import sys
 import time
-from datetime import datetime
 
 from .config import get_config
 
 
+def _transcribe(audio_path, use_cache: bool = True):
+    """Transcribe into timed segments via the daemon if one is running, otherwise in-process"""
+    from . import daemon
+
+    try:
+        return daemon.transcribe_segments(audio_path, use_cache=use_cache)
+    except daemon.DaemonUnavailable:
+        from . import transcriber
+        return transcriber.transcribe_segments(audio_path, use_cache=use_cache) or []
+
+
+def _finish_stream(audio_path):
+    """
+    Collect the stitched segments of the stopped recording's streaming
+    session from the daemon. Falls back to transcribing the whole recording
+    if it had no session.
+    """
+    from . import daemon, recorder
+
+    session = recorder.get_stream()
+    if session is None:
+        return _transcribe(audio_path)
+    try:
+        return daemon.stream_finish(session)
+    except daemon.DaemonUnavailable:
+        return _transcribe(audio_path)
+
+
+def _deliver(audio_file, duration: float | None, stop_pressed: float) -> int:
+    """
+    Transcribe (or queue) a stopped recording and paste the result.
+    The caller releases the recorder state and the recording afterwards.
+    """
+    from . import clipboard, notify, recorder, storage, tracing
+
+    # Queue mode: hand the recording to a background worker and return,
+    # so the next recording can start right away
+    if get_config().queue_transcriptions and not get_config().streaming:
+        from . import jobs
+
+        metadata = dict(recorder.get_stop_timing() or {})
+        metadata.update(duration=duration, stop_pressed=time.time(), timings=tracing.collect())
+        jobs.enqueue_recording(audio_file, metadata)
+        jobs.ensure_worker()
+        ahead = len(storage.get_jobs()) - 1
+        print(f"Queued ({ahead} ahead)" if ahead > 0 else "Queued")
+        return 0
+
+    # Transcribe (streaming sessions only have the tail left to do).
+    # Otherwise trim silence first; all-silent audio never reaches a model
+    vad_result = None
+    try:
+        with tracing.span("transcribe"):
+            if get_config().streaming:
+                segments = _finish_stream(audio_file)
+            else:
+                from . import vad
+
+                with vad.speech_only(audio_file) as (speech_file, vad_result):
+                    segments = _transcribe(speech_file) if speech_file else []
+                if vad_result:
+                    segments = vad_result.restore_times(segments)
+    except FileNotFoundError as e:
+        print(f"Setup error: {e}")
+        notify.transcription_error()
+        return 1
+    except RuntimeError as e:
+        print(f"Transcription failed: {e}")
+        notify.transcription_error()
+        return 1
+    except Exception as e:
+        print(f"Error: {e}")
+        notify.transcription_error()
+        return 1
+
+    from .segments import join_text
+
+    text = join_text(segments)
+    if not text:
+        print("No speech detected")
+        notify.transcription_error("no_speech")
+        return 1
+
+    # Success - paste first so the user isn't waiting on bookkeeping
+    clipboard.copy_and_paste(text)
+    tracing.record("hotkey_to_paste", (time.perf_counter() - stop_pressed) * 1000)
+    notify.transcription_success()
+
+    # Then archive the audio (recording.wav is overwritten by the next
+    # recording) and save to history
+    from . import jobs
+
+    word_count = len(text.split())
+    record_id = jobs.save_transcription(
+        audio_file,
+        text,
+        segments,
+        metadata=recorder.get_stop_timing() or {},
+        duration=duration,
+        vad_result=vad_result,
+    )
+    # Separate write so the timings include the saves themselves
+    storage.update_metadata(record_id, {"timings": tracing.collect()})
+
+    # The raw text is already pasted; the processed version lands in history
+    if get_config().auto_template:
+        jobs.enqueue_processing(record_id, get_config().auto_template)
+        jobs.ensure_worker()
+
+    # Show preview with word count
+    preview = text[:60] + "..." if len(text) > 60 else text
+    print(f"{preview} ({word_count} words)")
+    return 0
+
+
 def toggle():
     """Toggle recording on/off. Main entry point for dictation."""
     from . import recorder  # Always needed
 
-    if recorder.is_recording():
+    # Decide between start and stop and make the transition under the state
+    # lock, so presses racing each other alternate rather than both starting
+    with recorder.state_lock():
+        if not recorder.is_recording():
+            # Lazy import - only need notify for start
+            from . import notify
+
+            # Start recording
+            print("Recording...")
+            sys.stdout.flush()
+
+            if recorder.start_recording():
+                notify.recording_started()
+                return 0
+            else:
+                print("Mic unavailable - check System Settings > Privacy")
+                notify.transcription_error()
+                return 1
+
         # Lazy imports - only needed when stopping
-        from . import transcriber, storage, clipboard, notify
+        from . import notify, tracing
+
+        # Per-stage timings of this dictation, saved with it (see `gglisten stats`)
+        tracing.reset()
+        stop_pressed = time.perf_counter()
 
         # Get duration before stopping
         state = recorder._read_state()
@@ -32,6 +167,7 @@ def toggle():
         if not success:
             print("Failed to stop recording")
             notify.transcription_error()
+            recorder.cleanup()
             return 1
 
         # Get the audio file
@@ -42,72 +178,32 @@ def toggle():
             recorder.cleanup()
             return 1
 
-        # Transcribe
-        try:
-            text = transcriber.transcribe(audio_file)
-        except FileNotFoundError as e:
-            print(f"Setup error: {e}")
-            notify.transcription_error()
-            recorder.cleanup()
-            return 1
-        except RuntimeError as e:
-            print(f"Transcription failed: {e}")
-            notify.transcription_error()
-            recorder.cleanup()
-            return 1
-        except Exception as e:
-            print(f"Error: {e}")
-            notify.transcription_error()
-            recorder.cleanup()
-            return 1
-
-        if not text:
-            print("No speech detected")
-            notify.transcription_error("no_speech")
-            recorder.cleanup()
-            return 1
-
-        # Success - save, copy, notify
-        word_count = len(text.split())
-        config = get_config()
-        storage.save(
-            text=text,
-            duration=duration,
-            audio_path=audio_file,
-            model=str(config.whisper_model.name),
-        )
-
-        clipboard.copy_and_paste(text)
-        notify.transcription_success()
+    # Whatever happens from here, a failed paste included, release the state
+    # and put the recording back where `gglisten transcribe` looks for it
+    try:
+        return _deliver(audio_file, duration, stop_pressed)
+    finally:
         recorder.cleanup()
 
-        # Show preview with word count
-        preview = text[:60] + "..." if len(text) > 60 else text
-        print(f"{preview} ({word_count} words)")
-        return 0
-    else:
-        # Lazy import - only need notify for start
-        from . import notify
 
-        # Start recording
-        print("Recording...")
-        sys.stdout.flush()
+def transcribe_cmd(
+    audio_path: str | None = None,
+    paste: bool = True,
+    record_id: int | None = None,
+    use_cache: bool = True,
+):
+    """Transcribe an audio file, a history entry's archived audio, or the last recording"""
+    from pathlib import Path
+    from . import archive, recorder, clipboard, notify, vad
 
-        if recorder.start_recording():
-            notify.recording_started()
-            return 0
-        else:
-            print("Mic unavailable - check System Settings > Privacy")
-            notify.transcription_error()
+    if record_id is not None:
+        from . import storage
+        record = storage.get_by_id(record_id)
+        if not record or not record.audio_path:
+            print(f"No audio stored for transcription {record_id}")
             return 1
-
-
-def transcribe_cmd(audio_path: str | None = None, paste: bool = True):
-    """Transcribe an audio file or the last recording"""
-    from . import recorder, transcriber, clipboard, notify
-
-    if audio_path:
-        from pathlib import Path
+        path = Path(record.audio_path)
+    elif audio_path:
         path = Path(audio_path)
     else:
         path = recorder.get_audio_file()
@@ -118,7 +214,11 @@ def transcribe_cmd(audio_path: str | None = None, paste: bool = True):
         return 1
 
     try:
-        text = transcriber.transcribe(path)
+        # Archived recordings are compressed; decode only now that we need them
+        from .segments import join_text
+
+        with archive.open_wav(path) as wav_path, vad.speech_only(wav_path) as (speech_path, _):
+            text = join_text(_transcribe(speech_path, use_cache=use_cache)) if speech_path else None
         if text:
             if paste:
                 clipboard.copy_and_paste(text)
@@ -137,12 +237,22 @@ def transcribe_cmd(audio_path: str | None = None, paste: bool = True):
         return 1
 
 
+def transcribe_batch_cmd(pattern: str, workers: int = 4, force: bool = False):
+    """Transcribe a directory or glob of audio files into history"""
+    from . import batch
+
+    return batch.run(pattern, workers=workers, force=force)
+
+
 def history_cmd(limit: int = 10, search_query: str | None = None):
     """Show transcription history"""
+    from datetime import datetime
     from . import storage
 
     if search_query:
-        records = storage.search(search_query, limit=limit)
+        # Bold matches in a terminal; plain markers for Raycast output
+        highlight = ("\033[1m", "\033[0m") if sys.stdout.isatty() else ("[", "]")
+        records = storage.search(search_query, limit=limit, highlight=highlight)
     else:
         records = storage.get_recent(limit=limit)
 
@@ -154,9 +264,9 @@ def history_cmd(limit: int = 10, search_query: str | None = None):
         dt = datetime.fromtimestamp(record.timestamp)
         date_str = dt.strftime("%Y-%m-%d %H:%M:%S")
 
-        # Truncate text for display
-        text = record.text
-        if len(text) > 80:
+        # Truncate text for display (search results show the matching snippet)
+        text = record.snippet or record.text
+        if not record.snippet and len(text) > 80:
             text = text[:77] + "..."
 
         duration_str = f" ({record.duration:.1f}s)" if record.duration else ""
@@ -165,35 +275,114 @@ def history_cmd(limit: int = 10, search_query: str | None = None):
     return 0
 
 
-def clean_cmd():
-    """Clean up clipboard text using AI"""
-    from . import clipboard
-    from .ai import processor  # Lazy import - only load when needed
+def segments_cmd(record_id: int, at: str | None = None, window: float = 30.0):
+    """Show the timed segments of a transcription, optionally only around a time"""
+    from . import storage
+    from .segments import format_time, parse_time
 
-    text = clipboard.get()
-    if not text.strip():
-        print("Clipboard is empty")
+    if at is not None:
+        try:
+            seconds = parse_time(at)
+        except ValueError:
+            print(f"Invalid time: {at} (use e.g. 12:30, 750 or 12m)")
+            return 1
+        found = storage.segments_at(record_id, seconds, window)
+    else:
+        found = storage.get_segments(record_id)
+
+    if not found:
+        print(f"No segments stored for transcription {record_id}")
         return 1
 
+    for s in found:
+        confidence = f" ({s.confidence:.0%})" if s.confidence is not None else ""
+        print(f"[{format_time(s.start)} - {format_time(s.end)}]{confidence} {s.text}")
+    return 0
+
+
+def export_cmd(record_id: int, fmt: str = "srt", output: str | None = None):
+    """Export a transcription's segments as SRT or WebVTT subtitles"""
+    from pathlib import Path
+    from . import segments, storage
+
+    found = storage.get_segments(record_id)
+    if not found:
+        print(f"No segments stored for transcription {record_id}")
+        return 1
+
+    rendered = segments.to_srt(found) if fmt == "srt" else segments.to_vtt(found)
+    if output:
+        Path(output).write_text(rendered)
+        print(f"Wrote {len(found)} segments to {output}")
+    else:
+        print(rendered, end="")
+    return 0
+
+
+def process_cmd(
+    template: str = "clean",
+    text: str | None = None,
+    record_id: int | None = None,
+    paste: bool = True,
+):
+    """
+    Run text through an AI template: the given text, a history entry (whose
+    processed_text is then updated) or, by default, the clipboard.
+    """
+    from . import clipboard, tracing
+    from .ai import processor  # Lazy import - only load when needed
+
+    if record_id is not None:
+        from . import storage
+        record = storage.get_by_id(record_id)
+        if not record:
+            print(f"No transcription with id {record_id}")
+            return 1
+        text = record.text
+    elif text is None:
+        text = clipboard.get()
+        if not text.strip():
+            print("Clipboard is empty")
+            return 1
+
+    tracing.reset()
     try:
-        cleaned = processor.clean_text(text)
-        clipboard.copy_and_paste(cleaned)
-        print(cleaned)
-        return 0
+        processed = processor.process(text, template)
     except Exception as e:
         print(f"AI processing failed: {e}")
         return 1
 
+    if record_id is not None:
+        storage.update_processed_text(record_id, processed)
+        storage.add_timings(record_id, tracing.collect())
+    if paste:
+        clipboard.copy_and_paste(processed)
+    print(processed)
+    return 0
+
 
 def status_cmd():
     """Show current recording status"""
-    from . import recorder, storage
+    from datetime import datetime
+    from . import daemon, recorder, storage
 
     if recorder.is_recording():
         print("Recording in progress...")
+        from . import levels
+
+        current = levels.read_levels(get_config().levels_file)
+        if current and current.active:
+            print(f"Level: RMS {current.rms_db:.1f} dBFS, peak {current.peak_db:.1f} dBFS")
     else:
         print("Idle")
 
+    print(f"Daemon: {'running' if daemon.is_running() else 'not running'}")
+    if get_config().standby_capture or get_config().capture_backend == "native":
+        from . import capture
+        print(f"Standby capture: {'running' if capture.is_running() else 'not running'}")
+    for audio_path, done, total in storage.get_unfinished_jobs():
+        print(f"Interrupted: {audio_path} ({done}/{total} windows; re-run transcribe to resume)")
+
     # Show recent transcription
     latest = storage.get_latest()
     if latest:
@@ -205,6 +394,135 @@ def status_cmd():
     return 0
 
 
+def daemon_cmd(stop: bool = False):
+    """Run the transcription daemon in the foreground, or stop a running one"""
+    from . import daemon
+
+    if stop:
+        if daemon.stop():
+            print("Daemon stopped")
+            return 0
+        print("Daemon not running")
+        return 1
+
+    return daemon.serve()
+
+
+def reprocess_cmd(limit: int = 20, template: str = "clean", jobs: int | None = None, force: bool = False):
+    """Run recent history through an AI template, storing the results as processed text"""
+    from . import storage
+    from .ai import processor
+
+    records = storage.get_recent(limit=limit)
+    if not force:
+        records = [r for r in records if not r.processed_text]
+    if not records:
+        print("Nothing to reprocess")
+        return 0
+
+    def on_result(record, text, error):
+        if error is not None:
+            print(f"[{record.id}] failed: {error}")
+            return
+        preview = text[:60] + "..." if len(text) > 60 else text
+        print(f"[{record.id}] {preview}")
+
+    print(f"Processing {len(records)} transcription(s) with the {template} template")
+    results = processor.process_batch(
+        records,
+        template=template,
+        concurrency=jobs or get_config().ai_concurrency,
+        on_result=on_result,
+    )
+    failed = sum(1 for r in results.values() if isinstance(r, Exception))
+    return 1 if failed else 0
+
+
+def worker_cmd(idle_timeout: float | None = None):
+    """Run queued jobs in the foreground until idle (see jobs.py)"""
+    from . import jobs
+
+    return jobs.serve_worker(idle_timeout=idle_timeout)
+
+
+def queue_cmd(limit: int = 20):
+    """Show pending and recently failed jobs"""
+    from datetime import datetime
+    from pathlib import Path
+    from . import daemon, jobs, storage
+
+    pending = storage.get_jobs(limit=limit)
+    failed = storage.get_jobs(statuses=("failed",), limit=limit)
+    if daemon.is_running():
+        print("Worker: daemon")
+    else:
+        print(f"Worker: {'running' if jobs.worker_running() else 'not running'}")
+
+    if not pending and not failed:
+        print("Queue is empty")
+        return 0
+    for job in pending + failed:
+        created = datetime.fromtimestamp(job.created).strftime("%H:%M:%S")
+        what = Path(job.audio_path).name if job.kind == jobs.TRANSCRIBE else f"{job.template} #{job.record_id}"
+        error = f": {job.error}" if job.error else ""
+        print(f"[{job.id}] {created} {job.kind} {what} {job.status}{error}")
+    return 0
+
+
+def stats_cmd(limit: int = 200):
+    """Show per-stage latency percentiles over recent dictations"""
+    from . import storage, tracing
+
+    samples: dict[str, list[float]] = {}
+    for record in storage.get_recent(limit=limit):
+        for stage, ms in ((record.metadata or {}).get("timings") or {}).items():
+            samples.setdefault(stage, []).append(ms)
+
+    if not samples:
+        print("No timings recorded yet")
+        return 0
+
+    count = max(len(values) for values in samples.values())
+    print(f"Stage timings over the last {count} dictation(s), in ms:")
+    print(f"  {'stage':<24} {'n':>5} {'p50':>9} {'p95':>9} {'p99':>9}")
+    # Slowest stages first
+    for stage, values in sorted(samples.items(), key=lambda item: -tracing.percentile(item[1], 50)):
+        p50, p95, p99 = (tracing.percentile(values, p) for p in (50, 95, 99))
+        print(f"  {stage:<24} {len(values):>5} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f}")
+    return 0
+
+
+def capture_cmd(source: str | None = None, stop: bool = False):
+    """Run the standby capture process in the foreground, or stop a running one"""
+    from . import capture
+
+    if stop:
+        if capture.shutdown():
+            print("Capture stopped")
+            return 0
+        print("Capture not running")
+        return 1
+
+    return capture.serve(source)
+
+
+def bench_cmd(target: str, audio_path: str | None = None, runs: int = 5, budget_ms: float | None = None):
+    """Run a benchmark"""
+    from . import bench
+
+    if target == "latency":
+        return bench.latency(audio_path, runs=runs)
+    elif target == "pipeline":
+        return bench.pipeline(runs=runs)
+    elif target == "storage":
+        return bench.storage_throughput()
+    elif target == "startup":
+        return bench.startup(runs=runs, budget_ms=budget_ms)
+
+    print(f"Unknown benchmark: {target}")
+    return 1
+
+
 def config_cmd(key: str | None = None, value: str | None = None):
     """Get or set configuration values"""
     import json
@@ -268,6 +586,13 @@ def config_cmd(key: str | None = None, value: str | None = None):
 
 def main():
     """Main CLI entry point"""
+    # Fast path for the hotkey: a bare toggle needs no argument parsing, so
+    # skip importing argparse (and building every subparser) entirely
+    if sys.argv[1:] in ([], ["toggle"]):
+        sys.exit(toggle())
+
+    import argparse
+
     parser = argparse.ArgumentParser(
         prog="gglisten",
         description="Local speech-to-text using whisper.cpp",
@@ -281,18 +606,82 @@ def main():
     # transcribe command
     transcribe_parser = subparsers.add_parser("transcribe", help="Transcribe audio file")
     transcribe_parser.add_argument("file", nargs="?", help="Audio file path")
+    transcribe_parser.add_argument("--id", type=int, dest="record_id", help="Re-transcribe a history entry's archived audio")
+    transcribe_parser.add_argument("--no-cache", action="store_true", help="Run the model even if this audio was transcribed before")
+
+    # transcribe-batch command
+    batch_parser = subparsers.add_parser("transcribe-batch", help="Transcribe a directory or glob of audio files")
+    batch_parser.add_argument("pattern", help="Directory (searched recursively) or glob, e.g. '~/audio/*.wav'")
+    batch_parser.add_argument("-j", "--jobs", type=int, default=4, help="Parallel workers (whisper only)")
+    batch_parser.add_argument("--force", action="store_true", help="Re-transcribe files already stored for this model")
 
     # history command
     history_parser = subparsers.add_parser("history", help="Show transcription history")
     history_parser.add_argument("-n", "--limit", type=int, default=10, help="Number of records")
     history_parser.add_argument("-s", "--search", help="Search query")
 
+    # segments command
+    segments_parser = subparsers.add_parser("segments", help="Show timed segments of a transcription")
+    segments_parser.add_argument("id", type=int, help="Transcription id (see history)")
+    segments_parser.add_argument("--at", help="Only segments around this time (e.g. 12:30, 750, 12m)")
+    segments_parser.add_argument("-w", "--window", type=float, default=30.0, help="Seconds either side of --at")
+
+    # export command
+    export_parser = subparsers.add_parser("export", help="Export a transcription as subtitles")
+    export_parser.add_argument("id", type=int, help="Transcription id (see history)")
+    export_parser.add_argument("-f", "--format", default="srt", choices=["srt", "vtt"], help="Subtitle format")
+    export_parser.add_argument("-o", "--output", help="Write to a file instead of stdout")
+
     # clean command
     subparsers.add_parser("clean", help="Clean up clipboard text using AI")
 
+    # process command
+    from .ai.templates import list_templates
+
+    process_parser = subparsers.add_parser("process", help="Run text through an AI template")
+    process_parser.add_argument("text", nargs="*", help="Text to process (default: clipboard)")
+    process_parser.add_argument("-t", "--template", default="clean", choices=list_templates(), help="Processing template")
+    process_parser.add_argument("--id", type=int, dest="record_id", help="Process a history entry and save the result")
+    process_parser.add_argument("--no-paste", action="store_true", help="Don't copy/paste the result")
+
     # status command
     subparsers.add_parser("status", help="Show current status")
 
+    # daemon command
+    daemon_parser = subparsers.add_parser("daemon", help="Run the transcription daemon (keeps model loaded)")
+    daemon_parser.add_argument("--stop", action="store_true", help="Stop a running daemon")
+
+    # reprocess command
+    reprocess_parser = subparsers.add_parser("reprocess", help="Run recent history through AI post-processing")
+    reprocess_parser.add_argument("-n", "--limit", type=int, default=20, help="Number of recent transcriptions")
+    reprocess_parser.add_argument("-t", "--template", default="clean", choices=list_templates(), help="Processing template")
+    reprocess_parser.add_argument("-j", "--jobs", type=int, help="Requests in flight (default: ai_concurrency)")
+    reprocess_parser.add_argument("--force", action="store_true", help="Also redo records that already have processed text")
+
+    # worker command
+    worker_parser = subparsers.add_parser("worker", help="Run queued transcription/AI jobs (started automatically)")
+    worker_parser.add_argument("--idle", type=float, help="Exit after this many idle seconds (default: worker_idle_timeout)")
+
+    # queue command
+    queue_parser = subparsers.add_parser("queue", help="Show queued and failed jobs")
+    queue_parser.add_argument("-n", "--limit", type=int, default=20, help="Number of jobs to show")
+
+    # stats command
+    stats_parser = subparsers.add_parser("stats", help="Show per-stage latency percentiles")
+    stats_parser.add_argument("-n", "--limit", type=int, default=200, help="Number of recent transcriptions")
+
+    # capture command
+    capture_parser = subparsers.add_parser("capture", help="Run the standby capture process (keeps the input open)")
+    capture_parser.add_argument("--source", help="ffmpeg, portaudio, sine or file:<path> (default: capture_source)")
+    capture_parser.add_argument("--stop", action="store_true", help="Stop a running capture process")
+
+    # bench command
+    bench_parser = subparsers.add_parser("bench", help="Run a benchmark")
+    bench_parser.add_argument("target", choices=["latency", "pipeline", "storage", "startup"], help="Benchmark to run")
+    bench_parser.add_argument("file", nargs="?", help="Audio file (default: last recording)")
+    bench_parser.add_argument("-n", "--runs", type=int, default=5, help="Runs per mode")
+    bench_parser.add_argument("--budget-ms", type=float, help="startup: fail if toggle-start imports exceed this")
+
     # config command
     config_parser = subparsers.add_parser("config", help="Get or set configuration")
     config_parser.add_argument("key", nargs="?", help="Config key (e.g., backend, model)")
@@ -304,13 +693,40 @@ def main():
         # Default to toggle if no command given
         sys.exit(toggle())
     elif args.command == "transcribe":
-        sys.exit(transcribe_cmd(args.file))
+        sys.exit(transcribe_cmd(args.file, record_id=args.record_id, use_cache=not args.no_cache))
+    elif args.command == "transcribe-batch":
+        sys.exit(transcribe_batch_cmd(args.pattern, workers=args.jobs, force=args.force))
     elif args.command == "history":
         sys.exit(history_cmd(limit=args.limit, search_query=args.search))
+    elif args.command == "segments":
+        sys.exit(segments_cmd(args.id, at=args.at, window=args.window))
+    elif args.command == "export":
+        sys.exit(export_cmd(args.id, fmt=args.format, output=args.output))
     elif args.command == "clean":
-        sys.exit(clean_cmd())
+        sys.exit(process_cmd("clean"))
+    elif args.command == "process":
+        sys.exit(process_cmd(
+            template=args.template,
+            text=" ".join(args.text) or None,
+            record_id=args.record_id,
+            paste=not args.no_paste,
+        ))
     elif args.command == "status":
         sys.exit(status_cmd())
+    elif args.command == "daemon":
+        sys.exit(daemon_cmd(stop=args.stop))
+    elif args.command == "reprocess":
+        sys.exit(reprocess_cmd(limit=args.limit, template=args.template, jobs=args.jobs, force=args.force))
+    elif args.command == "worker":
+        sys.exit(worker_cmd(idle_timeout=args.idle))
+    elif args.command == "queue":
+        sys.exit(queue_cmd(limit=args.limit))
+    elif args.command == "stats":
+        sys.exit(stats_cmd(limit=args.limit))
+    elif args.command == "capture":
+        sys.exit(capture_cmd(source=args.source, stop=args.stop))
+    elif args.command == "bench":
+        sys.exit(bench_cmd(args.target, args.file, runs=args.runs, budget_ms=args.budget_ms))
     elif args.command == "config":
         sys.exit(config_cmd(args.key, args.value))
     else:
@@ -2,14 +2,17 @@
 
 import subprocess
 
+from . import tracing
+
 
 def copy(text: str):
     """Copy text to clipboard using pbcopy"""
-    subprocess.run(
-        ["pbcopy"],
-        input=text.encode("utf-8"),
-        check=True,
-    )
+    with tracing.span("clipboard.copy"):
+        subprocess.run(
+            ["pbcopy"],
+            input=text.encode("utf-8"),
+            check=True,
+        )
 
 
 def paste() -> bool:
@@ -22,10 +25,11 @@ def paste() -> bool:
         keystroke "v" using command down
     end tell
     '''
-    result = subprocess.run(
-        ["osascript", "-e", script],
-        capture_output=True,
-    )
+    with tracing.span("clipboard.paste"):
+        result = subprocess.run(
+            ["osascript", "-e", script],
+            capture_output=True,
+        )
     return result.returncode == 0
 
 
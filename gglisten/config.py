@@ -1,93 +1,182 @@
-"""Configuration management for gglisten"""
+"""Configuration management for gglisten
+
+Every hotkey press starts a fresh interpreter, so this module is kept cheap to
+import: config.json is only read when the first Config is created, and Config
+is a plain class because importing dataclasses (which pulls in inspect) was
+the largest single cost of `gglisten toggle`.
+"""
 
 import json
 import os
-from dataclasses import dataclass, field
 from pathlib import Path
 
+# Parsed ~/.config/gglisten/config.json, loaded on first use
+_user_config: dict | None = None
+
 
 def _load_user_config() -> dict:
     """Load user config from ~/.config/gglisten/config.json if it exists"""
-    config_file = Path.home() / ".config/gglisten/config.json"
-    if config_file.exists():
-        try:
-            return json.loads(config_file.read_text())
-        except (json.JSONDecodeError, OSError):
-            pass
-    return {}
-
+    global _user_config
+    if _user_config is None:
+        _user_config = {}
+        config_file = Path.home() / ".config/gglisten/config.json"
+        if config_file.exists():
+            try:
+                _user_config = json.loads(config_file.read_text())
+            except (json.JSONDecodeError, OSError):
+                pass
+    return _user_config
 
-_user_config = _load_user_config()
 
-
-def _get_path(key: str, default: str | Path) -> Path:
+def _get_path(user: dict, key: str, default: str | Path) -> Path:
     """Get path from user config, env var, or default"""
-    if key in _user_config:
-        return Path(_user_config[key]).expanduser()
+    if key in user:
+        return Path(user[key]).expanduser()
     env_key = f"GGLISTEN_{key.upper()}"
     if env_key in os.environ:
         return Path(os.environ[env_key]).expanduser()
     return Path(default).expanduser() if isinstance(default, str) else default
 
 
-@dataclass
 class Config:
     """Configuration for gglisten dictation system"""
 
-    # Transcription backend: "whisper" or "parakeet"
-    transcription_backend: str = field(default_factory=lambda: _user_config.get("transcription_backend", "whisper"))
+    def __init__(self, **overrides):
+        user = _load_user_config()
+
+        # Transcription backend: "whisper", "whisper-server", "parakeet", "fake",
+        # or a third-party backend registered via the "gglisten.backends" entry point
+        self.transcription_backend: str = user.get("transcription_backend", "whisper")
+
+        # Whisper model and CLI (used when backend="whisper")
+        self.whisper_model: Path = _get_path(
+            user, "whisper_model", "~/.local/share/gglisten/ggml-large-v3-turbo-q5_0.bin")
+        self.whisper_cli: Path = _get_path(user, "whisper_cli", "/opt/homebrew/bin/whisper-cli")
+
+        # Resident whisper.cpp server (used when backend="whisper-server"; shares whisper_model)
+        self.whisper_server: Path = _get_path(user, "whisper_server", "/opt/homebrew/bin/whisper-server")
+        self.whisper_server_port: int = int(user.get("whisper_server_port", 8178))
+        self.whisper_server_start_timeout: float = 60.0  # Model load on first start
+        self.whisper_server_request_timeout: float = 600.0
+
+        # Parakeet model (used when backend="parakeet")
+        self.parakeet_model: str = user.get("parakeet_model", "mlx-community/parakeet-tdt-0.6b-v3")
+
+        # Fake backend (used when backend="fake"): simulated model load and compute cost
+        self.fake_load_seconds: float = float(user.get("fake_load_seconds", 1.0))
+        self.fake_realtime_factor: float = float(user.get("fake_realtime_factor", 0.05))
 
-    # Whisper model and CLI (used when backend="whisper")
-    whisper_model: Path = field(default_factory=lambda: _get_path(
-        "whisper_model", "~/.local/share/gglisten/ggml-large-v3-turbo-q5_0.bin"))
-    whisper_cli: Path = field(default_factory=lambda: _get_path(
-        "whisper_cli", "/opt/homebrew/bin/whisper-cli"))
+        self.language: str = "en"
 
-    # Parakeet model (used when backend="parakeet")
-    parakeet_model: str = field(default_factory=lambda: _user_config.get(
-        "parakeet_model", "mlx-community/parakeet-tdt-0.6b-v3"))
+        # Transcription daemon: toggle/transcribe use it when running, else transcribe in-process
+        self.use_daemon: bool = user.get("use_daemon", True)
 
-    language: str = "en"
+        # Streaming: transcribe fixed-length chunks in the daemon while still recording
+        self.streaming: bool = user.get("streaming", False)
+        self.stream_chunk_seconds: int = user.get("stream_chunk_seconds", 10)
+        self.stream_overlap: float = float(user.get("stream_overlap", 1.0))  # Seconds shared with each neighbour
 
-    # Audio recording (ffmpeg for better macOS device support)
-    ffmpeg_bin: Path = field(default_factory=lambda: _get_path(
-        "ffmpeg_bin", "/opt/homebrew/bin/ffmpeg"))
-    sample_rate: int = 16000
-    channels: int = 1
+        # Long recordings: transcribed in overlapping windows with progress
+        # checkpointed to the database (see longform.py)
+        self.longform_threshold: float = float(user.get("longform_threshold", 300.0))  # Seconds; longer uses windows
+        self.longform_window: float = float(user.get("longform_window", 60.0))
+        self.longform_overlap: float = float(user.get("longform_overlap", 4.0))  # Each side of a window
 
-    # Storage
-    db_path: Path = field(default_factory=lambda: Path.home() / ".local/share/gglisten/transcriptions.db")
+        # Voice activity detection: trim silence before transcribing (see vad.py)
+        self.vad: bool = user.get("vad", True)
+        self.vad_threshold_db: float = float(user.get("vad_threshold_db", -45.0))  # Quieter frames are always silence
+        self.vad_noise_percentile: float = float(user.get("vad_noise_percentile", 10.0))  # Estimates the noise floor
+        self.vad_noise_margin_db: float = float(user.get("vad_noise_margin_db", 10.0))  # Speech is this far above it
+        self.vad_padding_ms: int = int(user.get("vad_padding_ms", 200))  # Kept around speech
+        self.vad_max_pause: float = float(user.get("vad_max_pause", 1.0))  # Longer pauses shortened (0 = keep)
 
-    # Temp files
-    temp_dir: Path = field(default_factory=lambda: Path("/tmp/gglisten"))
+        # Audio recording (ffmpeg for better macOS device support)
+        self.ffmpeg_bin: Path = _get_path(user, "ffmpeg_bin", "/opt/homebrew/bin/ffmpeg")
+        self.sample_rate: int = 16000
+        self.channels: int = 1
+        self.stop_timeout: float = 2.0  # Max seconds to wait for ffmpeg to finalize the WAV
 
-    # AI processing
-    anthropic_key_file: Path = field(default_factory=lambda: Path.home() / ".config/gglisten_anthropic_key")
-    default_model: str = "anthropic/claude-sonnet-4-5-20250929"
+        # Capture backend: "ffmpeg" runs ffmpeg for each recording (unless standby
+        # capture is on); "native" always records through the capture process
+        # (started on demand), reading the input in-process and keeping each
+        # recording in memory until stop
+        self.capture_backend: str = user.get("capture_backend", "ffmpeg")
+        self.capture_buffer_seconds: float = float(user.get("capture_buffer_seconds", 600.0))  # Longer spills to disk
 
-    # Audio feedback
-    enable_sounds: bool = True
-    start_sound: str = "Ping"      # Recording started
-    stop_sound: str = "Tink"       # Recording stopped
-    done_sound: str = "Glass"      # Transcription success
-    error_sound: str = "Basso"     # Hard error
-    warning_sound: str = "Sosumi"  # Soft warning (no speech detected)
+        # Standby capture: record through a running `gglisten capture` process,
+        # which keeps the input open and includes audio from just before the press
+        self.standby_capture: bool = user.get("standby_capture", False)
+        self.capture_source: str = user.get(
+            "capture_source", "portaudio" if self.capture_backend == "native" else "ffmpeg"
+        )  # or "sine", "file:<path>"
+        self.capture_preroll_ms: int = int(user.get("capture_preroll_ms", 300))
 
-    # Level meter UI
-    show_level_meter: bool = True
-    level_meter_app: Path = field(default_factory=lambda: _get_path(
-        "level_meter_app", "~/.local/share/gglisten/AudioLevelMeter.app/Contents/MacOS/AudioLevelMeter"))
+        # Job queue: toggle hands finished recordings to a background worker (the
+        # daemon, or a `gglisten worker` it starts) so the next recording can
+        # start at once; results are still pasted in the order recorded
+        self.queue_transcriptions: bool = user.get("queue_transcriptions", False)
+        self.worker_idle_timeout: float = float(user.get("worker_idle_timeout", 60.0))  # Seconds before exiting
 
-    def __post_init__(self):
+        # Storage
+        self.db_path: Path = Path.home() / ".local/share/gglisten/transcriptions.db"
+
+        # Transcript cache: re-transcribing identical audio with the same backend,
+        # model and language returns the stored text instead of running the model
+        self.cache_transcriptions: bool = user.get("cache_transcriptions", True)
+        self.cache_max_entries: int = int(user.get("cache_max_entries", 1000))
+
+        # Audio archive: compressed copies of recordings, named by content hash
+        self.archive_audio: bool = user.get("archive_audio", True)
+        self.archive_dir: Path = _get_path(user, "archive_dir", "~/.local/share/gglisten/audio")
+        self.archive_format: str = user.get("archive_format", "flac")  # or "opus"
+        self.archive_retention_days: int = int(user.get("archive_retention_days", 90))
+        self.archive_max_mb: int = int(user.get("archive_max_mb", 2048))
+
+        # Temp files
+        self.temp_dir: Path = _get_path(user, "temp_dir", "/tmp/gglisten")
+
+        # AI processing
+        self.anthropic_key_file: Path = Path.home() / ".config/gglisten_anthropic_key"
+        self.default_model: str = "anthropic/claude-sonnet-4-5-20250929"
+        self.ai_api_base: str | None = user.get("ai_api_base")  # e.g. a local mock server for testing
+        self.ai_concurrency: int = int(user.get("ai_concurrency", 4))  # Requests in flight when reprocessing
+        # Template to run each dictation through after pasting, e.g. "clean"
+        # (None disables). Runs in the background and fills in processed_text
+        self.auto_template: str | None = user.get("auto_template")
+
+        # Audio feedback
+        self.enable_sounds: bool = True
+        self.start_sound: str = "Ping"      # Recording started
+        self.stop_sound: str = "Tink"       # Recording stopped
+        self.done_sound: str = "Glass"      # Transcription success
+        self.error_sound: str = "Basso"     # Hard error
+        self.warning_sound: str = "Sosumi"  # Soft warning (no speech detected)
+
+        # Level meter UI
+        self.show_level_meter: bool = user.get("show_level_meter", True)
+        self.level_meter_app: Path = _get_path(
+            user, "level_meter_app", "~/.local/share/gglisten/AudioLevelMeter.app/Contents/MacOS/AudioLevelMeter")
+
+        for key, value in overrides.items():
+            if not hasattr(self, key):
+                raise TypeError(f"Unknown config option: {key}")
+            setattr(self, key, value)
+        self._normalize_paths()
+
+    def _normalize_paths(self):
         """Ensure paths are Path objects"""
         if isinstance(self.whisper_model, str):
             self.whisper_model = Path(self.whisper_model).expanduser()
         if isinstance(self.whisper_cli, str):
             self.whisper_cli = Path(self.whisper_cli)
+        if isinstance(self.whisper_server, str):
+            self.whisper_server = Path(self.whisper_server)
         if isinstance(self.ffmpeg_bin, str):
             self.ffmpeg_bin = Path(self.ffmpeg_bin)
         if isinstance(self.db_path, str):
             self.db_path = Path(self.db_path).expanduser()
+        if isinstance(self.archive_dir, str):
+            self.archive_dir = Path(self.archive_dir).expanduser()
         if isinstance(self.temp_dir, str):
             self.temp_dir = Path(self.temp_dir)
         if isinstance(self.anthropic_key_file, str):
@@ -105,11 +194,56 @@ class Config:
         """Path to the state file"""
         return self.temp_dir / "state.json"
 
+    @property
+    def state_lock_file(self) -> Path:
+        """Held while the recorder state is checked and changed (see recorder.state_lock)"""
+        return self.temp_dir / "state.lock"
+
     @property
     def pid_file(self) -> Path:
         """Path to the recording PID file"""
         return self.temp_dir / "rec.pid"
 
+    @property
+    def whisper_server_pid_file(self) -> Path:
+        """Path to the resident whisper-server's pid/launch-parameters file"""
+        return self.temp_dir / "whisper-server.json"
+
+    @property
+    def chunk_dir(self) -> Path:
+        """Directory holding a subdirectory of chunks per streaming session"""
+        return self.temp_dir / "chunks"
+
+    @property
+    def levels_file(self) -> Path:
+        """Audio levels published by the recorder (see levels.py)"""
+        return self.temp_dir / "levels.bin"
+
+    @property
+    def capture_socket(self) -> Path:
+        """Path to the standby capture process's Unix socket"""
+        return self.temp_dir / "capture.sock"
+
+    @property
+    def queue_dir(self) -> Path:
+        """Recordings waiting in the job queue, one uniquely named file each"""
+        return self.temp_dir / "queue"
+
+    @property
+    def worker_lock_file(self) -> Path:
+        """Held by the running `gglisten worker`, so only one is started"""
+        return self.temp_dir / "worker.lock"
+
+    @property
+    def deliver_lock_file(self) -> Path:
+        """Serializes pasting of queued results, so they arrive in order"""
+        return self.temp_dir / "deliver.lock"
+
+    @property
+    def daemon_socket(self) -> Path:
+        """Path to the transcription daemon's Unix socket"""
+        return self.temp_dir / "daemon.sock"
+
     def ensure_dirs(self):
         """Create necessary directories"""
         self.temp_dir.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,263 @@
+"""Long-lived transcription daemon that keeps the model loaded between toggles"""
+
+import signal
+import threading
+from functools import partial
+from pathlib import Path
+
+from . import ipc, segments, tracing
+from .config import get_config
+from .segments import Segment, join_text
+
+# Exceptions that are re-raised with the same type on the client side
+_ERROR_TYPES = {
+    "FileNotFoundError": FileNotFoundError,
+    "ImportError": ImportError,
+    "RuntimeError": RuntimeError,
+}
+
+
+# Set by the "shutdown" op; checked by the serve loop between requests
+_stop_requested = False
+
+# Requests are handled on threads of their own, so that ping, wake and
+# stream_start are answered while a transcription runs. Backends aren't
+# thread-safe, so only one transcription uses the model at a time
+_model_lock = threading.Lock()
+
+# Streaming sessions (streaming.ChunkTranscriber) by session id, oldest first.
+# One recording's session may still be finishing when the next one starts
+_streams: dict = {}
+_stream_lock = threading.Lock()
+
+# How long recording start waits for stream_start before going without streaming
+STREAM_START_TIMEOUT = 0.5
+
+# Set by the "wake" op when a job has been queued (see jobs.py)
+_jobs_wake = threading.Event()
+
+
+class DaemonUnavailable(Exception):
+    """Raised when no daemon is running (callers fall back to in-process)"""
+
+
+def is_running() -> bool:
+    """Check if a daemon is listening on the configured socket"""
+    return ipc.is_listening(get_config().daemon_socket)
+
+
+def _request(payload: dict, timeout: float | None = None) -> dict:
+    """Send a request to the daemon, translating connection failures"""
+    config = get_config()
+    if not config.use_daemon:
+        raise DaemonUnavailable("Daemon disabled in config")
+    try:
+        return ipc.request(config.daemon_socket, payload, timeout=timeout)
+    except (ipc.Unavailable, OSError) as e:
+        raise DaemonUnavailable(str(e)) from e
+
+
+def _raise_error(resp: dict):
+    """Re-raise an error reported by the daemon"""
+    exc_type = _ERROR_TYPES.get(resp.get("error_type"), RuntimeError)
+    raise exc_type(resp.get("error", "Unknown daemon error"))
+
+
+def _segments_from(resp: dict) -> list[Segment]:
+    """Segments of a transcription response"""
+    if "segments" in resp:
+        return segments.from_dicts(resp["segments"])
+    # A daemon started before segments were returned still sends the text
+    return [Segment(start=0.0, end=0.0, text=resp["text"])] if resp.get("text") else []
+
+
+def transcribe_segments(audio_path: Path, use_cache: bool = True) -> list[Segment]:
+    """
+    Transcribe audio via the running daemon into timed segments.
+
+    Raises DaemonUnavailable if no daemon is running, so callers can
+    fall back to transcriber.transcribe_segments() in-process.
+    """
+    resp = _request({"op": "transcribe", "path": str(Path(audio_path).resolve()), "cache": use_cache})
+    if not resp.get("ok"):
+        _raise_error(resp)
+    tracing.merge(resp.get("timings", {}))
+    return _segments_from(resp)
+
+
+def transcribe(audio_path: Path, use_cache: bool = True) -> str | None:
+    """Transcribe audio via the running daemon (see transcribe_segments)"""
+    return join_text(transcribe_segments(audio_path, use_cache=use_cache))
+
+
+def stream_start(chunk_dir: Path, session: str) -> bool:
+    """
+    Ask the daemon to transcribe chunks from chunk_dir as they are written,
+    as streaming session `session`. Returns False if no daemon answers within
+    STREAM_START_TIMEOUT, so recording can start without streaming instead.
+    """
+    try:
+        resp = _request(
+            {"op": "stream_start", "dir": str(Path(chunk_dir).resolve()), "session": session},
+            timeout=STREAM_START_TIMEOUT,
+        )
+    except DaemonUnavailable:
+        return False
+    return resp.get("ok", False)
+
+
+def stream_finish(session: str) -> list[Segment]:
+    """
+    Transcribe the remaining chunks of a streaming session and return the
+    segments of the whole recording.
+
+    Raises DaemonUnavailable if no daemon (or no such session) can provide it.
+    """
+    resp = _request({"op": "stream_finish", "session": session})
+    if not resp.get("ok"):
+        if resp.get("error_type") == "NoStream":
+            raise DaemonUnavailable(resp.get("error"))
+        _raise_error(resp)
+    tracing.merge(resp.get("timings", {}))
+    return _segments_from(resp)
+
+
+def wake_worker() -> bool:
+    """Tell the daemon's job worker a job is waiting. Returns False if no daemon can run it."""
+    try:
+        return _request({"op": "wake"}, timeout=5.0).get("ok", False)
+    except DaemonUnavailable:
+        return False
+
+
+def stop() -> bool:
+    """Ask a running daemon to shut down. Returns True if one was running."""
+    try:
+        _request({"op": "shutdown"}, timeout=5.0)
+        return True
+    except DaemonUnavailable:
+        return False
+
+
+def _locked_transcribe(audio_path: Path, use_cache: bool = True) -> list[Segment] | None:
+    """Transcribe in-process, serialized with any streaming worker"""
+    from . import transcriber
+
+    with _model_lock:
+        return transcriber.transcribe_segments(audio_path, use_cache=use_cache)
+
+
+def _transcript(result: list[Segment] | None) -> dict:
+    """Success response carrying a transcript and this request's timings"""
+    result = result or []
+    return {
+        "ok": True,
+        "text": join_text(result),
+        "segments": segments.to_dicts(result),
+        "timings": tracing.collect(),
+    }
+
+
+def _handle(req: dict) -> dict:
+    """Dispatch a single daemon request"""
+    global _stop_requested
+    from .streaming import ChunkTranscriber
+
+    op = req.get("op")
+    if op == "transcribe":
+        tracing.reset()
+        try:
+            return _transcript(_locked_transcribe(Path(req["path"]), use_cache=req.get("cache", True)))
+        except Exception as e:
+            return {"ok": False, "error": str(e), "error_type": type(e).__name__}
+    elif op == "stream_start":
+        # Chunks are never repeated; don't fill the cache with them
+        stream = ChunkTranscriber(Path(req["dir"]), partial(_locked_transcribe, use_cache=False))
+        with _stream_lock:
+            # Sessions of recordings that never stopped. Keep the latest:
+            # its recording may have just stopped, with stream_finish to come
+            abandoned = [_streams.pop(session) for session in list(_streams)[:-1]]
+            _streams[req.get("session", "")] = stream
+        for old in abandoned:
+            old.cancel(wait=False)  # Don't wait on the chunk it is transcribing
+        stream.start()
+        return {"ok": True}
+    elif op == "stream_finish":
+        with _stream_lock:
+            stream = _streams.pop(req.get("session", ""), None)
+        if stream is None:
+            return {"ok": False, "error": "No such stream", "error_type": "NoStream"}
+        # Timings of the whole session, including the chunks transcribed in the background
+        with tracing.use(stream.timings):
+            try:
+                return _transcript(stream.finish())
+            except Exception as e:
+                return {"ok": False, "error": str(e), "error_type": type(e).__name__}
+    elif op == "wake":
+        _jobs_wake.set()
+        return {"ok": True}
+    elif op == "shutdown":
+        _stop_requested = True
+        return {"ok": True}
+    return {"ok": False, "error": f"Unknown op: {op}"}
+
+
+def serve() -> int:
+    """Run the daemon in the foreground until stopped"""
+    from . import jobs, transcriber
+
+    config = get_config()
+    config.ensure_dirs()
+
+    try:
+        server = ipc.serve(config.daemon_socket, _handle, threaded=True)
+    except RuntimeError as e:
+        print(e)
+        return 1
+
+    def _shutdown(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    def _preload():
+        with _model_lock:
+            try:
+                transcriber.preload()
+            except Exception as e:
+                # Keep serving; per-request errors will surface the problem to the client
+                print(f"Model preload failed: {e}")
+
+    # Load in the background so pings are answered straight away; the first
+    # transcription waits for the model
+    print(f"Loading {config.transcription_backend} model...")
+    threading.Thread(target=_preload, daemon=True).start()
+
+    # Queued jobs run on a worker thread, sharing the loaded model
+    jobs_stop = threading.Event()
+    worker = threading.Thread(
+        target=jobs.work,
+        args=(jobs_stop, _jobs_wake, _locked_transcribe),
+        daemon=True,
+    )
+    worker.start()
+
+    # Wake up between requests to notice a shutdown handled on another thread
+    server.timeout = 1.0
+    print(f"Listening on {config.daemon_socket}")
+    try:
+        while not _stop_requested:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for stream in _streams.values():
+            stream.cancel(wait=False)
+        jobs_stop.set()
+        _jobs_wake.set()
+        worker.join(timeout=5.0)  # Finish the current job if it's quick; it's requeued otherwise
+        server.server_close()
+        config.daemon_socket.unlink(missing_ok=True)
+
+    print("Daemon stopped")
+    return 0
@@ -0,0 +1,96 @@
+"""Minimal JSON-over-Unix-socket request/response helpers"""
+
+import json
+import os
+import socket
+import socketserver
+from pathlib import Path
+from typing import Callable
+
+
+class Unavailable(ConnectionError):
+    """Raised when nothing is listening on the socket"""
+
+
+def request(sock_path: Path, payload: dict, timeout: float | None = None) -> dict:
+    """
+    Send one JSON request and wait for the JSON response.
+
+    Raises Unavailable if no server is listening on sock_path.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.settimeout(0.5)  # Connecting is local and should be instant
+            sock.connect(str(sock_path))
+        except (FileNotFoundError, ConnectionRefusedError, socket.timeout) as e:
+            raise Unavailable(f"No server listening on {sock_path}") from e
+
+        sock.settimeout(timeout)
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+
+        buf = b""
+        while not buf.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            buf += chunk
+    finally:
+        sock.close()
+
+    if not buf:
+        raise Unavailable(f"Server on {sock_path} closed the connection")
+    return json.loads(buf)
+
+
+def is_listening(sock_path: Path) -> bool:
+    """Check whether a server is accepting connections on sock_path"""
+    try:
+        return request(sock_path, {"op": "ping"}, timeout=1.0).get("ok", False)
+    except (Unavailable, OSError, ValueError):
+        return False
+
+
+def serve(
+    sock_path: Path,
+    handler: Callable[[dict], dict],
+    threaded: bool = False,
+) -> socketserver.UnixStreamServer:
+    """
+    Bind a server on sock_path.
+
+    By default requests are handled one at a time, so handlers never run
+    concurrently. With threaded, each connection is handled on its own
+    (daemon) thread, so a slow request doesn't hold up quick ones; handlers
+    must then do their own locking.
+    A stale socket left behind by a crashed server is removed first.
+    Call serve_forever() on the returned server to start handling requests.
+    """
+    if sock_path.exists():
+        if is_listening(sock_path):
+            raise RuntimeError(f"Another server is already listening on {sock_path}")
+        sock_path.unlink()
+
+    class _Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            line = self.rfile.readline()
+            if not line:
+                return
+            try:
+                req = json.loads(line)
+            except json.JSONDecodeError:
+                resp = {"ok": False, "error": "Malformed request"}
+            else:
+                if req.get("op") == "ping":
+                    resp = {"ok": True, "pid": os.getpid()}
+                else:
+                    resp = handler(req)
+            self.wfile.write(json.dumps(resp).encode("utf-8") + b"\n")
+
+    if threaded:
+        server = socketserver.ThreadingUnixStreamServer(str(sock_path), _Handler)
+        server.daemon_threads = True  # Don't wait for requests in flight on close
+    else:
+        server = socketserver.UnixStreamServer(str(sock_path), _Handler)
+    os.chmod(sock_path, 0o600)
+    return server
@@ -0,0 +1,276 @@
+"""Persistent background job queue for transcription and AI post-processing
+
+With queue_transcriptions on, toggle only stops the recorder: the recording
+is moved to a uniquely named file in queue_dir and a job is added to the
+database, so the next recording can start straight away. Workers claim jobs
+oldest first:
+
+- the daemon runs a worker thread (sharing its loaded model), woken by
+  toggle after each enqueue;
+- otherwise toggle starts a detached `gglisten worker`, which exits after
+  worker_idle_timeout seconds without work. A lock file keeps it to one.
+
+Results are pasted in the order they were recorded, whichever worker
+finishes first: after each job, deliver() pastes every finished result up to
+the oldest one still pending. AI processing of saved transcriptions (see
+Config.auto_template) goes through the same queue but isn't pasted.
+
+A job left running by a worker that died is queued again. Workers are
+identified by pid and process start time, so a reused pid isn't mistaken
+for the worker.
+"""
+
+import fcntl
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from . import procinfo, storage, tracing
+from .config import get_config
+
+TRANSCRIBE = "transcribe"
+PROCESS = "process"
+
+# How often an idle worker checks for new jobs when nothing wakes it
+POLL_INTERVAL = 1.0
+
+
+def save_transcription(
+    audio_file: Path,
+    text: str,
+    segments: list,
+    metadata: dict,
+    duration: float | None = None,
+    vad_result=None,
+) -> int:
+    """Archive a finished recording and save its transcription to history. Returns the id."""
+    from . import archive, audioinfo, transcriber
+
+    archived = archive.store(audio_file)
+    metadata = dict(metadata)
+
+    # Exact length from the WAV header; the wall-clock duration also
+    # counts ffmpeg start-up and the stop delay
+    try:
+        info = audioinfo.read_info(audio_file)
+        duration = info.duration
+        metadata.update(samples=info.frames, sample_rate=info.sample_rate, duration_us=info.duration_us)
+    except (OSError, ValueError):
+        pass
+    if vad_result:
+        metadata["vad_trimmed_s"] = round(vad_result.trimmed, 3)
+    record_id = storage.save(
+        text=text,
+        duration=duration,
+        audio_path=archived or audio_file,
+        model=transcriber.model_id(),
+        metadata=metadata,
+    )
+    storage.save_segments(record_id, segments)
+    return record_id
+
+
+def enqueue_recording(audio_file: Path, metadata: dict) -> int:
+    """Move a finished recording to its own file in the queue and add a job for it"""
+    config = get_config()
+    config.queue_dir.mkdir(parents=True, exist_ok=True)
+    queued = config.queue_dir / f"{time.time_ns()}-{os.getpid()}.wav"
+    os.replace(audio_file, queued)
+    return storage.job_add(TRANSCRIBE, audio_path=str(queued), metadata=metadata)
+
+
+def enqueue_processing(record_id: int, template: str) -> int:
+    """Queue AI processing of a saved transcription into its processed_text"""
+    return storage.job_add(PROCESS, record_id=record_id, template=template, delivered=True)
+
+
+@contextmanager
+def _lock(path: Path, blocking: bool = True):
+    """Hold an exclusive flock on path; yields False if non-blocking and already held"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def worker_running() -> bool:
+    """Whether a `gglisten worker` process holds the worker lock"""
+    with _lock(get_config().worker_lock_file, blocking=False) as acquired:
+        return not acquired
+
+
+def ensure_worker():
+    """Make sure something will pick up queued jobs: wake the daemon, else start a worker"""
+    from . import daemon
+
+    if daemon.wake_worker() or worker_running():
+        return
+    try:
+        subprocess.Popen(
+            [sys.executable, "-m", "gglisten.cli", "worker"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,  # Outlive the hotkey process
+        )
+    except OSError as e:
+        print(f"Could not start worker: {e}")
+
+
+def requeue_orphans():
+    """Queue again jobs left running by workers that have exited"""
+    for job in storage.get_jobs(statuses=("running",)):
+        if job.worker_pid and not procinfo.is_alive(job.worker_pid, job.worker_start):
+            storage.job_requeue(job.id)
+
+
+def _run_transcription(job: storage.Job, transcribe_fn) -> int | None:
+    """Transcribe and save a queued recording. Returns the record id (None if no speech)."""
+    from . import vad
+    from .segments import join_text
+
+    audio_file = Path(job.audio_path)
+    if not audio_file.exists():
+        raise FileNotFoundError(f"Queued recording is gone: {audio_file}")
+
+    metadata = dict(job.metadata or {})
+    timings = metadata.pop("timings", {})
+    duration = metadata.pop("duration", None)
+    metadata.pop("stop_pressed", None)  # Only needed at delivery
+
+    tracing.reset()
+    tracing.merge(timings)
+    tracing.record("queue_wait", (job.started - job.created) * 1000)
+    with tracing.span("transcribe"):
+        with vad.speech_only(audio_file) as (speech_file, vad_result):
+            segments = (transcribe_fn(speech_file) or []) if speech_file else []
+        if vad_result:
+            segments = vad_result.restore_times(segments)
+
+    record_id = None
+    text = join_text(segments)
+    if text:
+        record_id = save_transcription(audio_file, text, segments, metadata, duration, vad_result)
+        storage.update_metadata(record_id, {"timings": tracing.collect()})
+        if get_config().auto_template:
+            enqueue_processing(record_id, get_config().auto_template)
+    audio_file.unlink(missing_ok=True)  # Archived (or not wanted) by now
+    return record_id
+
+
+def _run_processing(job: storage.Job):
+    from .ai import processor
+
+    record = storage.get_by_id(job.record_id)
+    if record is None:
+        raise ValueError(f"No transcription with id {job.record_id}")
+    tracing.reset()
+    storage.update_processed_text(record.id, processor.process(record.text, job.template))
+    storage.add_timings(record.id, tracing.collect())
+
+
+def run_next(transcribe_fn=None) -> bool:
+    """Claim and run the oldest queued job, then deliver. Returns False if there was none."""
+    if transcribe_fn is None:
+        from . import transcriber
+        transcribe_fn = transcriber.transcribe_segments
+
+    pid = os.getpid()
+    job = storage.job_claim(pid, procinfo.start_time(pid))
+    if job is None:
+        return False
+
+    try:
+        if job.kind == TRANSCRIBE:
+            storage.job_finish(job.id, record_id=_run_transcription(job, transcribe_fn))
+        elif job.kind == PROCESS:
+            _run_processing(job)
+            storage.job_finish(job.id)
+        else:
+            storage.job_finish(job.id, error=f"Unknown job kind: {job.kind}")
+    except Exception as e:
+        storage.job_finish(job.id, error=str(e) or type(e).__name__)
+
+    deliver()
+    return True
+
+
+def deliver():
+    """Paste finished results in recording order, stopping at the first still pending"""
+    from . import clipboard, notify
+
+    with _lock(get_config().deliver_lock_file):
+        for job in storage.get_undelivered_jobs():
+            if job.status in ("queued", "running"):
+                break
+            record = storage.get_by_id(job.record_id) if job.record_id else None
+            if job.status == "failed":
+                notify.transcription_error()
+            elif record is None:
+                notify.transcription_error("no_speech")
+            else:
+                try:
+                    clipboard.copy_and_paste(record.text)
+                    notify.transcription_success()
+                except OSError:
+                    notify.transcription_error()  # Still in history; don't block later results
+                pressed = (job.metadata or {}).get("stop_pressed")
+                if pressed:
+                    storage.add_timings(record.id, {"hotkey_to_paste": round((time.time() - pressed) * 1000, 2)})
+            storage.job_mark_delivered(job.id)
+
+
+def work(stop: threading.Event, wake: threading.Event | None = None, transcribe_fn=None, idle_timeout: float | None = None):
+    """
+    Run jobs until stop is set, or until idle_timeout seconds pass with
+    nothing to do. Between jobs, waits for wake (or polls).
+    """
+    idle_since = time.monotonic()
+    while not stop.is_set():
+        # A worker may die at any time (the daemon's outlives any number of
+        # standalone ones); its job would otherwise hold up delivery forever
+        requeue_orphans()
+        if run_next(transcribe_fn):
+            idle_since = time.monotonic()
+            continue
+        if idle_timeout is not None and time.monotonic() - idle_since > idle_timeout:
+            return
+        if wake is not None:
+            wake.wait(POLL_INTERVAL)
+            wake.clear()
+        else:
+            stop.wait(POLL_INTERVAL)
+
+
+def serve_worker(idle_timeout: float | None = None) -> int:
+    """Run as the standalone worker process (`gglisten worker`)"""
+    config = get_config()
+    config.ensure_dirs()
+    if idle_timeout is None:
+        idle_timeout = config.worker_idle_timeout
+
+    stop = threading.Event()
+    while True:
+        with _lock(config.worker_lock_file, blocking=False) as acquired:
+            if not acquired:
+                print("A worker is already running")
+                return 0
+            try:
+                work(stop, idle_timeout=idle_timeout)
+            except KeyboardInterrupt:
+                return 0
+        # A job queued just as we went idle saw the lock still held and
+        # started no worker; pick it up rather than leave it waiting
+        if not storage.get_jobs(statuses=("queued",), limit=1):
+            return 0
@@ -37,7 +37,9 @@ class LevelMeter:
 
         try:
             self.process = subprocess.Popen(
-                [str(app_path)],
+                # The meter reads levels published by the recorder rather
+                # than capturing audio itself
+                [str(app_path), str(config.levels_file)],
                 stdin=subprocess.DEVNULL,
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL,
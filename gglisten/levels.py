@@ -0,0 +1,199 @@
+"""Audio levels published by the capture side through a small mmap'd file
+
+The recording is only captured once. The standby capture process measures
+the audio it already holds. ffmpeg can't, and the hotkey process that
+started it exits straight away, so while the level meter is up a tap
+process follows the WAV as ffmpeg writes it, computes RMS and peak for each
+block of PCM and publishes them here. The level meter, `gglisten status`
+and anything else can read levels without opening the microphone a second
+time.
+
+File layout (little-endian):
+
+    0   4s   magic b"GGLV"
+    4   u32  version
+    8   u64  sequence number (odd while an update is in progress)
+    16  f32  latest RMS (0..1 of full scale)
+    20  f32  latest peak (0..1 of full scale)
+    24  f64  time of latest update (unix seconds)
+    32  u32  ring capacity
+    36  u32  active (1 while the tap is running)
+    40  u64  total blocks written (ring head)
+    48  ring of (f32 rms, f32 peak) pairs
+"""
+
+import array
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+
+from . import procinfo
+
+MAGIC = b"GGLV"
+VERSION = 1
+RING_CAPACITY = 64
+_HEADER = struct.Struct("<4sIQffdIIQ")
+_ENTRY = struct.Struct("<ff")
+FILE_SIZE = _HEADER.size + RING_CAPACITY * _ENTRY.size
+
+# Seconds of audio per published level
+BLOCK_SECONDS = 0.05
+
+
+class Levels:
+    """A snapshot of the published levels"""
+
+    def __init__(self, rms: float, peak: float, updated_at: float, active: bool, history: list[tuple[float, float]]):
+        self.rms = rms
+        self.peak = peak
+        self.updated_at = updated_at
+        self.active = active
+        self.history = history  # Oldest first
+
+    @property
+    def rms_db(self) -> float:
+        return 20 * math.log10(self.rms) if self.rms > 0 else -math.inf
+
+    @property
+    def peak_db(self) -> float:
+        return 20 * math.log10(self.peak) if self.peak > 0 else -math.inf
+
+
+class LevelWriter:
+    """Publishes levels into the mmap'd file (single writer)"""
+
+    def __init__(self, path: Path):
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, FILE_SIZE)
+            self._mm = mmap.mmap(fd, FILE_SIZE)
+        finally:
+            os.close(fd)
+        self._seq = 0
+        self._head = 0
+        self._write(0.0, 0.0, active=True)
+
+    def _write(self, rms: float, peak: float, active: bool):
+        # Seqlock: readers retry if the sequence is odd or changed under them
+        self._seq += 1
+        struct.pack_into("<Q", self._mm, 8, self._seq)
+        _HEADER.pack_into(
+            self._mm, 0,
+            MAGIC, VERSION, self._seq, rms, peak, time.time(),
+            RING_CAPACITY, 1 if active else 0, self._head,
+        )
+        self._seq += 1
+        struct.pack_into("<Q", self._mm, 8, self._seq)
+
+    def publish(self, rms: float, peak: float):
+        _ENTRY.pack_into(self._mm, _HEADER.size + (self._head % RING_CAPACITY) * _ENTRY.size, rms, peak)
+        self._head += 1
+        self._write(rms, peak, active=True)
+
+    def close(self):
+        self._write(0.0, 0.0, active=False)
+        self._mm.close()
+
+
+def read_levels(path: Path) -> Levels | None:
+    """Read the latest levels, or None if nothing has been published"""
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    with mm:
+        if len(mm) < FILE_SIZE:
+            return None
+        for _ in range(100):
+            magic, version, seq, rms, peak, updated_at, capacity, active, head = _HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != VERSION:
+                return None
+            if seq % 2:
+                continue  # Writer mid-update
+            count = min(head, capacity)
+            history = [
+                _ENTRY.unpack_from(mm, _HEADER.size + ((head - count + i) % capacity) * _ENTRY.size)
+                for i in range(count)
+            ]
+            if struct.unpack_from("<Q", mm, 8)[0] == seq:
+                return Levels(rms, peak, updated_at, bool(active), history)
+    return None
+
+
+def measure(pcm: bytes) -> tuple[float, float]:
+    """RMS and peak of 16-bit PCM as fractions of full scale"""
+    samples = array.array("h", pcm)
+    if not samples:
+        return 0.0, 0.0
+    if sys.byteorder != "little":
+        samples.byteswap()
+    rms = math.sqrt(sum(s * s for s in samples) / len(samples)) / 32768
+    peak = max(max(samples), -min(samples)) / 32768
+    return rms, min(peak, 1.0)
+
+
+def _data_offset(f) -> int | None:
+    """Offset of the PCM data in a WAV file, once its header has been written"""
+    from .audioinfo import wav_data_chunk
+
+    found = wav_data_chunk(f.read(4096))
+    return found[0] + 4 if found else None
+
+
+def tap(wav_path: Path, levels_path: Path, capture_pid: int, capture_start: float | None, sample_rate: int = 16000):
+    """
+    Follow a WAV file as the capture process writes it and publish its levels.
+    Returns once the capture process has exited and all audio has been read.
+    capture_start is the capture process's procinfo.start_time(), so a pid
+    reused after ffmpeg exits doesn't keep the tap running.
+    """
+    block_bytes = int(sample_rate * BLOCK_SECONDS) * 2
+    writer = LevelWriter(levels_path)
+    try:
+        # Wait for the capture process to write the header
+        f = None
+        while f is None:
+            if not procinfo.is_alive(capture_pid, capture_start):
+                return
+            try:
+                f = open(wav_path, "rb")
+                offset = _data_offset(f)
+                if offset is None:
+                    f.close()
+                    f = None
+            except OSError:
+                f = None
+            if f is None:
+                time.sleep(0.01)
+
+        with f:
+            f.seek(offset)
+            pending = b""
+            while True:
+                chunk = f.read(block_bytes - len(pending))
+                if chunk:
+                    pending += chunk
+                    if len(pending) == block_bytes:
+                        writer.publish(*measure(pending))
+                        pending = b""
+                    continue
+                if not procinfo.is_alive(capture_pid, capture_start):
+                    return
+                time.sleep(0.01)
+    finally:
+        writer.close()
+
+
+if __name__ == "__main__":
+    # python -m gglisten.levels <wav> <levels file> <capture pid> <capture start|-> [sample rate]
+    tap(
+        Path(sys.argv[1]), Path(sys.argv[2]), int(sys.argv[3]),
+        None if sys.argv[4] == "-" else float(sys.argv[4]),
+        *map(int, sys.argv[5:6]),
+    )
@@ -0,0 +1,197 @@
+"""Chunked transcription of long recordings with bounded memory
+
+Recordings longer than longform_threshold are never handed to a backend
+whole. The WAV is memory-mapped and cut into windows of longform_window
+seconds, each extended by longform_overlap on both sides so words at a cut
+are heard in full. Each window is written to a small temporary WAV, trimmed
+by VAD (silent windows skip the model entirely) and transcribed. Pages of the
+mapping are released once passed, so peak memory is one window's worth
+whatever the length of the recording.
+
+Stitching keeps, from each window, only the words (or, for backends without
+word timings, segments) whose midpoint falls in that window's core; the
+overlap exists only to give the model context.
+
+Each finished window is checkpointed to the database, keyed by the audio
+content and transcription settings, so an interrupted job resumes from the
+first unfinished window. Checkpoints are removed once the job completes.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import wave
+from pathlib import Path
+
+from . import segments, storage, tracing
+from .config import get_config
+from .segments import Segment
+
+
+def is_long(audio_path: Path) -> bool:
+    """Whether a recording should go through the chunked engine"""
+    from . import audioinfo
+
+    if audio_path.suffix.lower() != ".wav":
+        return False
+    try:
+        return audioinfo.read_info(audio_path).duration > get_config().longform_threshold
+    except (OSError, ValueError):
+        return False
+
+
+def job_key(audio_key: str, window: float, overlap: float) -> str:
+    """Checkpoint key: the transcript cache key plus the window layout"""
+    return hashlib.sha256(f"{audio_key}\0{window}\0{overlap}".encode()).hexdigest()
+
+
+def windows(frames: int, rate: int, window: float, overlap: float) -> list[tuple[int, int, int, int]]:
+    """
+    Split a recording into windows as (core_start, core_end, start, end) frame
+    offsets: the core is what the window contributes, start/end the audio read.
+    """
+    size = max(1, int(window * rate))
+    pad = int(overlap * rate)
+    return [
+        (core, min(core + size, frames), max(0, core - pad), min(frames, core + size + pad))
+        for core in range(0, frames, size)
+    ]
+
+
+def _in_core(start: float, end: float, core_start: float, core_end: float, last: bool) -> bool:
+    mid = (start + end) / 2
+    return core_start <= mid and (mid < core_end or last)
+
+
+def stitch_window(
+    found: list[Segment], core_start: float, core_end: float, last: bool = False
+) -> list[Segment]:
+    """
+    The part of a window's segments (timed against the whole recording) that
+    belongs to its core: whole segments when all their words do, otherwise
+    rebuilt from the words that do.
+    """
+    kept = []
+    for s in found:
+        if not s.words:
+            if _in_core(s.start, s.end, core_start, core_end, last):
+                kept.append(s)
+            continue
+
+        words = [w for w in s.words if _in_core(w.start, w.end, core_start, core_end, last)]
+        if len(words) == len(s.words):
+            kept.append(s)
+        elif words:
+            confidences = [w.confidence for w in words]
+            kept.append(Segment(
+                start=words[0].start,
+                end=words[-1].end,
+                text=" ".join(w.text for w in words),
+                confidence=(
+                    round(sum(confidences) / len(confidences), 3)
+                    if None not in confidences else s.confidence
+                ),
+                words=words,
+            ))
+    return kept
+
+
+def _transcribe_window(backend, samples, params, offset: float) -> list[Segment]:
+    """Transcribe one window's samples; times are shifted by offset seconds"""
+    from . import vad
+
+    config = get_config()
+    result = None
+    if config.vad:
+        result = vad.find_speech(samples, params.framerate)
+        if not result.has_speech:
+            return []
+        import numpy as np
+
+        samples = np.concatenate([samples[start:end] for start, end in result.segments])
+
+    # Unique per call: batch.run transcribes several long files on threads
+    fd, name = tempfile.mkstemp(prefix="longform.", suffix=".wav", dir=config.temp_dir)
+    os.close(fd)
+    path = Path(name)
+    try:
+        with wave.open(str(path), "wb") as out:
+            out.setnchannels(params.nchannels)
+            out.setsampwidth(2)
+            out.setframerate(params.framerate)
+            out.writeframes(samples.tobytes())
+        found = backend.transcribe_segments(path)
+    finally:
+        path.unlink(missing_ok=True)
+
+    if result is not None:
+        found = result.restore_times(found)
+    return [s.shifted(offset) for s in found]
+
+
+def transcribe(audio_path: Path, backend, audio_key: str | None = None, on_progress=None) -> list[Segment]:
+    """
+    Transcribe a long WAV window by window with backend (already loaded).
+
+    audio_key identifies the audio and settings (see transcriber._cache_key);
+    without one, progress isn't checkpointed. on_progress(done, total) is
+    called after each window.
+    """
+    import numpy as np
+    from . import audioinfo
+
+    config = get_config()
+    config.ensure_dirs()
+
+    with wave.open(str(audio_path), "rb") as wav:
+        params = wav.getparams()
+    if params.sampwidth != 2:
+        raise ValueError(f"Unsupported sample width: {params.sampwidth * 8} bits")
+    frames = audioinfo.read_info(audio_path).frames
+    rate = params.framerate
+    frame_bytes = 2 * params.nchannels
+
+    plan = windows(frames, rate, config.longform_window, config.longform_overlap)
+    key = job_key(audio_key, config.longform_window, config.longform_overlap) if audio_key else None
+    done: dict[int, list[Segment]] = {}
+    if key:
+        for idx, saved in storage.checkpoint_load(key, str(audio_path), len(plan)).items():
+            done[idx] = segments.from_dicts(json.loads(saved))
+
+    can_release = hasattr(mmap, "MADV_DONTNEED")
+    released = 0
+    with open(audio_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size_offset, _ = audioinfo.wav_data_chunk(mm[:4096])
+        data_start = size_offset + 4
+
+        for idx, (core_start, core_end, start, end) in enumerate(plan):
+            if idx not in done:
+                with tracing.span("longform.window"):
+                    view = np.frombuffer(
+                        mm, dtype="<i2",
+                        count=(end - start) * params.nchannels,
+                        offset=data_start + start * frame_bytes,
+                    )
+                    samples = view.reshape(-1, params.nchannels).copy()
+                    del view  # The mapping can't close while a view is alive
+
+                    found = _transcribe_window(backend, samples, params, start / rate)
+                    done[idx] = stitch_window(found, core_start / rate, core_end / rate, idx == len(plan) - 1)
+                    if key:
+                        storage.checkpoint_save(key, idx, json.dumps(segments.to_dicts(done[idx])))
+
+            # Drop pages no later window reads, keeping resident memory flat
+            if can_release and idx + 1 < len(plan):
+                upto = (data_start + plan[idx + 1][2] * frame_bytes) // mmap.PAGESIZE * mmap.PAGESIZE
+                if upto > released:
+                    mm.madvise(mmap.MADV_DONTNEED, released, upto - released)
+                    released = upto
+
+            if on_progress:
+                on_progress(idx + 1, len(plan))
+
+    if key:
+        storage.checkpoint_clear(key)
+    return [s for idx in range(len(plan)) for s in done[idx]]
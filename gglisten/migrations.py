@@ -0,0 +1,206 @@
+"""Versioned schema migrations for the transcription database
+
+The schema version is stored in SQLite's PRAGMA user_version. Migration N
+(1-based position in MIGRATIONS) brings the schema from version N-1 to N and
+runs in its own transaction together with the version bump, so a failed
+migration leaves the database at the previous version.
+
+Add new migrations to the end of MIGRATIONS; never edit or reorder old ones.
+Databases created before versioning existed report version 0, so the early
+migrations use IF NOT EXISTS to upgrade them in place.
+"""
+
+import sqlite3
+
+
+def _initial_schema(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS transcription (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp REAL NOT NULL,
+            duration REAL,
+            text TEXT NOT NULL,
+            processed_text TEXT,
+            audio_path TEXT,
+            model TEXT,
+            metadata TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_timestamp ON transcription(timestamp DESC)")
+
+
+def _fts_index(conn: sqlite3.Connection):
+    """FTS5 index over text/processed_text, kept in sync by triggers and backfilled"""
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS transcription_fts USING fts5(
+                text, processed_text,
+                content='transcription', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5; search falls back to LIKE
+        return
+
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS transcription_fts_insert AFTER INSERT ON transcription BEGIN
+            INSERT INTO transcription_fts(rowid, text, processed_text)
+            VALUES (new.id, new.text, new.processed_text);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS transcription_fts_delete AFTER DELETE ON transcription BEGIN
+            INSERT INTO transcription_fts(transcription_fts, rowid, text, processed_text)
+            VALUES ('delete', old.id, old.text, old.processed_text);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS transcription_fts_update
+        AFTER UPDATE OF text, processed_text ON transcription BEGIN
+            INSERT INTO transcription_fts(transcription_fts, rowid, text, processed_text)
+            VALUES ('delete', old.id, old.text, old.processed_text);
+            INSERT INTO transcription_fts(rowid, text, processed_text)
+            VALUES (new.id, new.text, new.processed_text);
+        END
+    """)
+    # Backfill rows written before the index existed
+    conn.execute("INSERT INTO transcription_fts(transcription_fts) VALUES ('rebuild')")
+
+
+def _transcription_cache(conn: sqlite3.Connection):
+    """Cached transcripts keyed by audio content, backend, model and language"""
+    conn.execute("""
+        CREATE TABLE transcription_cache (
+            key TEXT PRIMARY KEY,
+            text TEXT NOT NULL,
+            created REAL NOT NULL,
+            last_used REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX idx_cache_last_used ON transcription_cache(last_used)")
+
+
+def _ai_cache(conn: sqlite3.Connection):
+    """Cached AI responses keyed by template, model and a hash of the input text"""
+    conn.execute("""
+        CREATE TABLE ai_cache (
+            template TEXT NOT NULL,
+            model TEXT NOT NULL,
+            text_hash TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created REAL NOT NULL,
+            PRIMARY KEY (template, model, text_hash)
+        )
+    """)
+
+
+def _segments(conn: sqlite3.Connection):
+    """Timed segments of each transcription, and segments in cached transcripts"""
+    conn.execute("""
+        CREATE TABLE segment (
+            transcription_id INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            start_ms INTEGER NOT NULL,
+            end_ms INTEGER NOT NULL,
+            confidence REAL,
+            text TEXT NOT NULL,
+            words TEXT,
+            PRIMARY KEY (transcription_id, seq)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("ALTER TABLE transcription_cache ADD COLUMN segments TEXT")
+
+
+def _longform_checkpoints(conn: sqlite3.Connection):
+    """Progress of chunked long-recording transcriptions, so they can resume"""
+    conn.execute("""
+        CREATE TABLE longform_job (
+            key TEXT PRIMARY KEY,
+            audio_path TEXT NOT NULL,
+            windows INTEGER NOT NULL,
+            created REAL NOT NULL,
+            updated REAL NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE longform_window (
+            job_key TEXT NOT NULL,
+            idx INTEGER NOT NULL,
+            segments TEXT NOT NULL,
+            PRIMARY KEY (job_key, idx)
+        ) WITHOUT ROWID
+    """)
+
+
+def _jobs(conn: sqlite3.Connection):
+    """Queue of background transcription and AI processing jobs"""
+    conn.execute("""
+        CREATE TABLE job (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            audio_path TEXT,
+            record_id INTEGER,
+            template TEXT,
+            metadata TEXT,
+            error TEXT,
+            worker_pid INTEGER,
+            delivered INTEGER NOT NULL DEFAULT 0,
+            created REAL NOT NULL,
+            started REAL,
+            finished REAL
+        )
+    """)
+    conn.execute("CREATE INDEX idx_job_status ON job(status, id)")
+    conn.execute("CREATE INDEX idx_job_undelivered ON job(delivered, id)")
+
+
+def _job_worker_start(conn: sqlite3.Connection):
+    """Start time of the worker running a job, so a reused pid isn't taken for it"""
+    conn.execute("ALTER TABLE job ADD COLUMN worker_start REAL")
+
+
+MIGRATIONS = [
+    _initial_schema,
+    _fts_index,
+    _transcription_cache,
+    _ai_cache,
+    _segments,
+    _longform_checkpoints,
+    _jobs,
+    _job_worker_start,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Bring the database up to SCHEMA_VERSION. Costs a single pragma read when
+    it is already current. Returns the number of migrations applied.
+    """
+    if get_version(conn) >= SCHEMA_VERSION:
+        return 0
+
+    applied = 0
+    while True:
+        # Take the write lock before re-reading the version, so two processes
+        # upgrading at once don't both apply the same migration
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = get_version(conn)
+            if version >= SCHEMA_VERSION:
+                conn.rollback()
+                return applied
+            MIGRATIONS[version](conn)
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        applied += 1
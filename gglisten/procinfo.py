@@ -0,0 +1,128 @@
+"""Process identity that survives pid reuse
+
+A pid alone can't tell whether a process is still the one we started: once
+it exits, the pid may be handed to something else, and os.kill(pid, 0)
+happily reports that as alive. Pairing the pid with the process's start time
+(recorded when we launched it) can't be fooled that way.
+
+Kept free of heavy imports: the toggle start path checks process identity.
+"""
+
+import os
+import select
+import struct
+import sys
+import time
+
+# struct proc_bsdinfo (<sys/proc_info.h>): 136 bytes, start time at 120
+_PROC_PIDTBSDINFO = 3
+_BSDINFO_SIZE = 136
+_BSDINFO_START = 120
+
+_libproc = None
+
+
+def _linux_start_time(pid: int) -> float | None:
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # The command name (field 2) may itself contain spaces and parentheses;
+    # starttime is field 22, counted in clock ticks since boot
+    try:
+        return float(stat[stat.rindex(b")") + 2:].split()[19])
+    except (ValueError, IndexError):
+        return None
+
+
+def _darwin_start_time(pid: int) -> float | None:
+    global _libproc
+    import ctypes
+
+    try:
+        if _libproc is None:
+            _libproc = ctypes.CDLL("/usr/lib/libproc.dylib")
+        buf = ctypes.create_string_buffer(_BSDINFO_SIZE)
+        size = _libproc.proc_pidinfo(pid, _PROC_PIDTBSDINFO, ctypes.c_uint64(0), buf, _BSDINFO_SIZE)
+    except (OSError, AttributeError):
+        return None
+    if size != _BSDINFO_SIZE:
+        return None
+    sec, usec = struct.unpack_from("=QQ", buf, _BSDINFO_START)
+    return sec + usec / 1_000_000
+
+
+def start_time(pid: int) -> float | None:
+    """
+    When process pid started, or None if it isn't running (or the platform
+    can't say). Only meaningful compared with another start_time() value.
+    """
+    if sys.platform.startswith("linux"):
+        return _linux_start_time(pid)
+    if sys.platform == "darwin":
+        return _darwin_start_time(pid)
+    return None
+
+
+def is_alive(pid: int, started: float | None = None) -> bool:
+    """
+    Whether pid is running and, if started is given, is still the process
+    that had that start time.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Exists, but belongs to someone else
+    if started is None:
+        return True
+    current = start_time(pid)
+    return current is None or current == started
+
+
+def wait_for_exit(pid: int, timeout: float) -> bool:
+    """
+    Block until the process exits, up to timeout seconds.
+    Returns True if it exited (or was already gone).
+
+    The process was usually spawned by an earlier gglisten process, so it
+    isn't our child and waitpid() can't be used; pidfd (Linux) and kqueue
+    (macOS) can wait on any process. Falls back to polling elsewhere.
+    """
+    if hasattr(os, "pidfd_open"):
+        try:
+            fd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            return True
+        try:
+            ready, _, _ = select.select([fd], [], [], timeout)
+            return bool(ready)
+        finally:
+            os.close(fd)
+
+    if hasattr(select, "kqueue"):
+        kq = select.kqueue()
+        try:
+            event = select.kevent(
+                pid,
+                filter=select.KQ_FILTER_PROC,
+                flags=select.KQ_EV_ADD | select.KQ_EV_ONESHOT,
+                fflags=select.KQ_NOTE_EXIT,
+            )
+            try:
+                return bool(kq.control([event], 1, timeout))
+            except ProcessLookupError:
+                return True
+        finally:
+            kq.close()
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            return True
+        time.sleep(0.005)
+    return False
@@ -1,20 +1,32 @@
 """Audio recording using sox/rec"""
 
+import fcntl
 import json
 import os
 import signal
+import struct
 import subprocess
+import sys
 import time
-from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 
+from . import procinfo, tracing
 from .config import get_config
 from .level_meter import LevelMeter
 
 # Global level meter instance
 _level_meter: LevelMeter | None = None
 
+# Timing of the last stop_recording() call (see get_stop_timing)
+_last_stop_timing: dict | None = None
+
+# This process's finished recording, moved aside by stop_recording()
+_claimed_audio: Path | None = None
+
+# Streaming session of the recording this process stopped (see get_stream)
+_claimed_stream: str | None = None
+
 
 class RecorderState(str, Enum):
     IDLE = "idle"
@@ -22,48 +34,116 @@ class RecorderState(str, Enum):
     TRANSCRIBING = "transcribing"
 
 
-@dataclass
 class StateInfo:
-    state: RecorderState
-    pid: int | None = None
-    start_time: float | None = None
+    # Plain class rather than a dataclass to keep toggle's imports cheap (see config.py)
+    def __init__(
+        self,
+        state: RecorderState,
+        pid: int | None = None,
+        start_time: float | None = None,
+        standby: bool = False,
+        pid_start: float | None = None,
+        stream: str | None = None,
+    ):
+        self.state = state
+        # RECORDING: ffmpeg, or the standby capture process.
+        # TRANSCRIBING: the gglisten process that stopped the recording.
+        self.pid = pid
+        self.start_time = start_time
+        self.standby = standby  # Recording through `gglisten capture` (see capture.py)
+        self.pid_start = pid_start  # procinfo.start_time(pid), so a reused pid isn't mistaken for it
+        self.stream = stream  # Streaming session in the daemon, if any (see _start_stream)
+
+    def owner_alive(self) -> bool:
+        return bool(self.pid) and procinfo.is_alive(self.pid, self.pid_start)
+
+
+class state_lock:
+    """
+    Hold the recorder state lock (an flock on state_lock_file).
+
+    Every check-and-change of the state happens under it, so two hotkey
+    presses a few milliseconds apart can't both see IDLE and both start.
+    Re-entrant within a process: start_recording() and stop_recording() take
+    it themselves, and toggle holds it around them to decide which to call.
+    """
+
+    _depth = 0
+    _file = None
+
+    def __enter__(self):
+        cls = type(self)
+        if cls._depth == 0:
+            config = get_config()
+            config.ensure_dirs()
+            f = open(config.state_lock_file, "a")
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            except BaseException:
+                f.close()
+                raise
+            cls._file = f
+        cls._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        cls = type(self)
+        cls._depth -= 1
+        if cls._depth == 0:
+            cls._file.close()  # Releases the flock
+            cls._file = None
+        return False
 
 
 def _read_state() -> StateInfo:
     """Read current state from file"""
     config = get_config()
-    if not config.state_file.exists():
-        return StateInfo(state=RecorderState.IDLE)
-
     try:
         data = json.loads(config.state_file.read_text())
         return StateInfo(
             state=RecorderState(data.get("state", "idle")),
             pid=data.get("pid"),
             start_time=data.get("start_time"),
+            standby=data.get("standby", False),
+            pid_start=data.get("pid_start"),
+            stream=data.get("stream"),
         )
+    except FileNotFoundError:
+        return StateInfo(state=RecorderState.IDLE)
     except (json.JSONDecodeError, ValueError):
         return StateInfo(state=RecorderState.IDLE)
 
 
+def _write_atomic(path: Path, text: str):
+    """Replace path's contents in one step: readers see the old file or the new, never half"""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
 def _write_state(info: StateInfo):
     """Write state to file"""
     config = get_config()
     data = {
         "state": info.state.value,
         "pid": info.pid,
+        "pid_start": info.pid_start,
         "start_time": info.start_time,
+        "standby": info.standby,
+        "stream": info.stream,
     }
-    config.state_file.write_text(json.dumps(data))
+    _write_atomic(config.state_file, json.dumps(data))
+    if info.state == RecorderState.RECORDING:
+        # Also save PID to separate file for robustness
+        _write_atomic(config.pid_file, str(info.pid))
 
 
 def _clear_state():
     """Clear state file"""
     config = get_config()
-    if config.state_file.exists():
-        config.state_file.unlink()
-    if config.pid_file.exists():
-        config.pid_file.unlink()
+    config.state_file.unlink(missing_ok=True)
+    config.pid_file.unlink(missing_ok=True)
 
 
 def is_recording() -> bool:
@@ -72,20 +152,131 @@ def is_recording() -> bool:
     if state.state != RecorderState.RECORDING:
         return False
 
-    # Verify process is actually running
-    if state.pid:
-        try:
-            os.kill(state.pid, 0)  # Signal 0 just checks if process exists
-            return True
-        except OSError:
-            # Process not running, clean up stale state
+    # Verify the recording process is actually running, and is still the
+    # one we started rather than something that inherited its pid
+    if state.owner_alive():
+        return True
+    with state_lock():
+        # Clean up stale state, unless another process replaced it meanwhile
+        current = _read_state()
+        if current.state == RecorderState.RECORDING and current.pid == state.pid and not current.owner_alive():
             _clear_state()
-            return False
+    return False
+
+
+def _start_stream() -> str | None:
+    """
+    Start a streaming session in the daemon, with a chunk directory of its
+    own. Returns the session id, or None if the daemon didn't take it.
+    """
+    import shutil
+    from . import daemon
+
+    # Each session has its own directory: the last recording's session may
+    # still be finishing (and reading its chunks) when the next one starts
+    session = str(time.time_ns())
+    chunk_dir = get_config().chunk_dir / session
+    chunk_dir.mkdir(parents=True)
+    if daemon.stream_start(chunk_dir, session):
+        return session
+    shutil.rmtree(chunk_dir, ignore_errors=True)
+    return None
+
+
+def _start_levels_tap(capture_pid: int, capture_start: float | None):
+    """
+    Publish levels of the audio being recorded (see levels.py), so the level
+    meter doesn't have to open the microphone a second time. Exits by itself
+    once ffmpeg does.
+    """
+    config = get_config()
+    try:
+        subprocess.Popen(
+            [
+                sys.executable, "-m", "gglisten.levels",
+                str(config.audio_file), str(config.levels_file),
+                str(capture_pid), "-" if capture_start is None else repr(capture_start),
+                str(config.sample_rate),
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        pass  # Levels are cosmetic; never fail the recording over them
+
+
+def _start_standby() -> bool:
+    """
+    Start recording through the standby capture process, if one is running.
+    The input is already open, so this only marks the start position.
+    """
+    from . import capture
+
+    config = get_config()
+    try:
+        resp = capture.start(config.audio_file)
+    except (capture.CaptureUnavailable, RuntimeError):
+        return False
+
+    _write_state(StateInfo(
+        state=RecorderState.RECORDING,
+        pid=resp["pid"],
+        start_time=time.time(),
+        standby=True,
+        pid_start=procinfo.start_time(resp["pid"]),
+    ))
+    return True
+
+
+def _launch_capture(timeout: float = 3.0) -> bool:
+    """Start a detached `gglisten capture` and wait for it to listen. Returns True once it does."""
+    from . import capture
+
+    try:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "gglisten.cli", "capture"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,  # Outlive the hotkey process
+        )
+    except OSError:
+        return False
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if capture.is_running():
+            return True
+        if proc.poll() is not None:
+            return False  # Couldn't open the source
+        time.sleep(0.02)
+    return False
+
+
+def _start_level_meter() -> bool:
+    """
+    Start level meter UI (wrapped in try/except to not break recording).
+    Returns True if the meter is up.
+    """
+    global _level_meter
+    try:
+        _level_meter = LevelMeter()
+        if _level_meter.start():
+            return True
+    except Exception:
+        pass
+    _level_meter = None
     return False
 
 
 def start_recording() -> bool:
     """Start audio recording. Returns True if started successfully."""
+    with state_lock():
+        return _start_recording()
+
+
+def _start_recording() -> bool:
     config = get_config()
     config.ensure_dirs()
 
@@ -96,22 +287,56 @@ def start_recording() -> bool:
     if config.audio_file.exists():
         config.audio_file.unlink()
 
+    # Native capture never runs ffmpeg: record through the capture process,
+    # starting one if none is running
+    if config.capture_backend == "native":
+        if config.streaming:
+            # Chunks are cut by ffmpeg's segment muxer; the whole recording is
+            # transcribed at stop instead
+            print("Streaming is disabled with capture_backend native", file=sys.stderr)
+        if not (_start_standby() or (_launch_capture() and _start_standby())):
+            return False
+        _start_level_meter()
+        return True
+
+    # Standby capture can't cut streaming chunks; those need ffmpeg
+    if config.standby_capture and not config.streaming and _start_standby():
+        _start_level_meter()
+        return True
+
     # Start recording with ffmpeg (better macOS device support than sox)
     # -f avfoundation: macOS audio/video framework
     # -i ":default": use default audio input device (respects System Settings)
     # -ar 16000: 16kHz sample rate (required by whisper)
     # -ac 1: mono channel
     # -y: overwrite output file
-    proc = subprocess.Popen(
-        [
-            str(config.ffmpeg_bin),
-            "-f", "avfoundation",
-            "-i", ":default",
+    # -flush_packets 1: write each packet out immediately, so the levels tap
+    #   (and anything else following the file) sees audio without delay
+    cmd = [
+        str(config.ffmpeg_bin),
+        "-f", "avfoundation",
+        "-i", ":default",
+        "-ar", str(config.sample_rate),
+        "-ac", str(config.channels),
+        "-flush_packets", "1",
+        "-y",
+        str(config.audio_file),
+    ]
+
+    # Streaming: also cut the input into fixed-length chunk files that the
+    # daemon transcribes while we're still recording
+    stream = _start_stream() if config.streaming else None
+    if stream:
+        cmd += [
+            "-f", "segment",
+            "-segment_time", str(config.stream_chunk_seconds),
             "-ar", str(config.sample_rate),
             "-ac", str(config.channels),
-            "-y",
-            str(config.audio_file),
-        ],
+            str(config.chunk_dir / stream / "chunk_%05d.wav"),
+        ]
+
+    proc = subprocess.Popen(
+        cmd,
         stdout=subprocess.DEVNULL,
         stderr=subprocess.DEVNULL,
     )
@@ -124,23 +349,19 @@ def start_recording() -> bool:
             break
 
     # Save state
+    pid_start = procinfo.start_time(proc.pid)
     _write_state(StateInfo(
         state=RecorderState.RECORDING,
         pid=proc.pid,
         start_time=time.time(),
+        pid_start=pid_start,
+        stream=stream,
     ))
 
-    # Also save PID to separate file for robustness
-    config.pid_file.write_text(str(proc.pid))
-
-    # Start level meter UI (wrapped in try/except to not break recording)
-    global _level_meter
-    try:
-        _level_meter = LevelMeter()
-        _level_meter.start()
-    except Exception:
-        _level_meter = None
-
+    # The tap costs an interpreter start per recording; only pay for it when
+    # the meter is there to show the levels
+    if _start_level_meter():
+        _start_levels_tap(proc.pid, pid_start)
     return True
 
 
@@ -148,7 +369,21 @@ def stop_recording() -> tuple[bool, float | None]:
     """
     Stop audio recording.
     Returns (success, duration_seconds).
+
+    The recording is then moved to a file of this process's own (see
+    get_audio_file), so the next recording can start while it is transcribed.
     """
+    global _claimed_stream
+    with state_lock():
+        stream = _read_state().stream
+        success, duration = _stop_recording()
+        if success:
+            _claim_audio()
+            _claimed_stream = stream
+        return success, duration
+
+
+def _stop_recording() -> tuple[bool, float | None]:
     global _level_meter
 
     # Stop level meter UI first (wrapped in try/except to not break recording)
@@ -171,23 +406,199 @@ def stop_recording() -> tuple[bool, float | None]:
     if state.start_time:
         duration = time.time() - state.start_time
 
-    # Send SIGINT to gracefully stop ffmpeg
+    if state.standby:
+        return _stop_standby(), duration
+
+    # Send SIGINT to gracefully stop ffmpeg, then wait for it to actually exit
+    # (it rewrites the WAV header sizes on the way out)
+    global _last_stop_timing
+    stop_start = time.perf_counter()
     try:
         os.kill(state.pid, signal.SIGINT)
-        # Wait a bit for the process to finish writing
-        time.sleep(0.3)
+        exited = procinfo.wait_for_exit(state.pid, config.stop_timeout)
     except OSError:
-        pass  # Process might have already exited
+        exited = True  # Process might have already exited
 
-    # Update state
-    _write_state(StateInfo(state=RecorderState.TRANSCRIBING))
+    if not exited:
+        try:
+            os.kill(state.pid, signal.SIGKILL)
+            procinfo.wait_for_exit(state.pid, 0.5)
+        except OSError:
+            pass
+
+    # A killed ffmpeg leaves placeholder sizes in the header; fix them up
+    # rather than handing a "truncated" file to the transcriber
+    finalized = _wav_is_finalized(config.audio_file)
+    if not finalized and config.audio_file.exists():
+        finalized = _repair_wav_header(config.audio_file)
+
+    _last_stop_timing = {
+        "stop_wait_ms": round((time.perf_counter() - stop_start) * 1000, 1),
+        "timed_out": not exited,
+        "wav_finalized": finalized,
+    }
+    tracing.record("recorder.stop", _last_stop_timing["stop_wait_ms"])
 
+    _mark_transcribing()
     return True, duration
 
 
+def _stop_standby() -> bool:
+    """Stop recording in the standby capture process, which completes the WAV"""
+    from . import capture
+
+    global _last_stop_timing
+    config = get_config()
+    stop_start = time.perf_counter()
+    try:
+        capture.stop()
+        finalized = True
+    except (capture.CaptureUnavailable, RuntimeError):
+        # Capture process died mid-recording; keep what it wrote
+        finalized = config.audio_file.exists() and _repair_wav_header(config.audio_file)
+
+    _last_stop_timing = {
+        "stop_wait_ms": round((time.perf_counter() - stop_start) * 1000, 1),
+        "timed_out": False,
+        "wav_finalized": finalized,
+        "standby": True,
+    }
+    tracing.record("recorder.stop", _last_stop_timing["stop_wait_ms"])
+    if finalized:
+        _mark_transcribing()
+    else:
+        _clear_state()  # Nothing to transcribe; let the next toggle start afresh
+    return finalized
+
+
+def _mark_transcribing():
+    """Record that this process has the finished recording"""
+    pid = os.getpid()
+    _write_state(StateInfo(
+        state=RecorderState.TRANSCRIBING,
+        pid=pid,
+        pid_start=procinfo.start_time(pid),
+    ))
+
+
+def _claim_audio():
+    """
+    Move the finished recording out of recording.wav: once the state lock is
+    released the next recording may start, and would overwrite it mid-transcription
+    """
+    global _claimed_audio
+    config = get_config()
+    claimed = config.temp_dir / f"recording.{os.getpid()}.wav"
+    try:
+        os.replace(config.audio_file, claimed)
+    except FileNotFoundError:
+        return
+    _claimed_audio = claimed
+
+    # Recordings claimed by processes that died before cleanup() are older
+    # than this one, which replaces them as the last recording
+    for orphan in _orphaned_audio():
+        orphan.unlink(missing_ok=True)
+
+
+def _orphaned_audio() -> list[Path]:
+    """Recordings claimed by processes that have exited without cleanup(), oldest first"""
+    orphans = []
+    for path in get_config().temp_dir.glob("recording.*.wav"):
+        pid = path.name[len("recording."):-len(".wav")]
+        # Skip other files in temp_dir such as vad.py's recording.<pid>.speech.<pid>.wav
+        if not pid.isdigit() or int(pid) == os.getpid() or procinfo.is_alive(int(pid)):
+            continue
+        try:
+            orphans.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            continue
+    return [path for _, path in sorted(orphans)]
+
+
+def _adopt_orphaned_audio():
+    """
+    Put the newest orphaned recording back in recording.wav, unless that
+    holds a later one, and remove the rest. Call with the state lock held
+    and no recording in progress.
+    """
+    config = get_config()
+    orphans = _orphaned_audio()
+    if not orphans:
+        return
+    newest = orphans.pop()
+    try:
+        if not config.audio_file.exists() or newest.stat().st_mtime > config.audio_file.stat().st_mtime:
+            os.replace(newest, config.audio_file)
+        else:
+            orphans.append(newest)
+    except FileNotFoundError:
+        pass
+    for orphan in orphans:
+        orphan.unlink(missing_ok=True)
+
+
+def get_stream() -> str | None:
+    """Streaming session of the recording this process stopped, if it had one"""
+    return _claimed_stream
+
+
+def get_stop_timing() -> dict | None:
+    """Timing details of the last stop_recording() in this process"""
+    return _last_stop_timing
+
+
+def _wav_is_finalized(audio_path: Path) -> bool:
+    """Check that the RIFF and data chunk sizes match the bytes on disk"""
+    from .audioinfo import wav_data_chunk
+
+    try:
+        file_size = audio_path.stat().st_size
+        with open(audio_path, "rb") as f:
+            header = f.read(4096)
+    except OSError:
+        return False
+
+    found = wav_data_chunk(header)
+    if not found:
+        return False
+    data_size_offset, data_size = found
+    (riff_size,) = struct.unpack("<I", header[4:8])
+    return riff_size == file_size - 8 and data_size == file_size - data_size_offset - 4
+
+
+def _repair_wav_header(audio_path: Path) -> bool:
+    """Rewrite RIFF/data sizes from the actual file size. Returns True on success."""
+    from .audioinfo import wav_data_chunk
+
+    try:
+        file_size = audio_path.stat().st_size
+        with open(audio_path, "r+b") as f:
+            found = wav_data_chunk(f.read(4096))
+            if not found:
+                return False
+            data_size_offset, _ = found
+            f.seek(4)
+            f.write(struct.pack("<I", file_size - 8))
+            f.seek(data_size_offset)
+            f.write(struct.pack("<I", file_size - data_size_offset - 4))
+        return True
+    except OSError:
+        return False
+
+
 def get_audio_file() -> Path | None:
-    """Get path to recorded audio file if it exists"""
+    """
+    Get path to recorded audio file if it exists: the recording this process
+    just stopped, else the last one left by cleanup() (or by a process that
+    died before getting that far)
+    """
+    if _claimed_audio and _claimed_audio.exists():
+        return _claimed_audio
     config = get_config()
+    with state_lock():
+        if not is_recording():
+            _adopt_orphaned_audio()
     if config.audio_file.exists():
         return config.audio_file
     return None
@@ -195,37 +606,45 @@ def get_audio_file() -> Path | None:
 
 def check_audio_has_content(audio_path: Path) -> bool:
     """Check if audio file has actual content (not silence)"""
+    from . import vad
+
     try:
-        result = subprocess.run(
-            [
-                "ffmpeg", "-i", str(audio_path),
-                "-af", "silencedetect=noise=-50dB:d=0.5",
-                "-f", "null", "-"
-            ],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        # If the entire file is silence, silencedetect will show silence
-        # covering the whole duration
-        stderr = result.stderr
-        # Count silence periods - if there's only one that covers most of the file, it's silent
-        silence_starts = stderr.count("silence_start:")
-        silence_ends = stderr.count("silence_end:")
-
-        # If we see silence_start but no silence_end, entire file is silent
-        if silence_starts > 0 and silence_ends == 0:
-            return False
-        # If no silence detected at all, there's audio
-        if silence_starts == 0:
-            return True
-        # Otherwise there's some audio
-        return True
+        return vad.analyze(audio_path).has_speech
     except Exception:
         # If check fails, assume there's content
         return True
 
 
 def cleanup():
-    """Clean up state and temp files"""
-    _clear_state()
+    """
+    Clean up state and temp files after a recording has been dealt with.
+
+    A new recording may have started meanwhile; its state and files are left
+    alone. Otherwise the recording stopped here goes back to recording.wav,
+    where `gglisten transcribe` finds the last recording, as does one left
+    claimed by a process that died.
+    """
+    import shutil
+
+    global _claimed_audio, _claimed_stream
+    config = get_config()
+    with state_lock():
+        state = _read_state()
+        recording = state.state == RecorderState.RECORDING and state.owner_alive()
+        if state.pid == os.getpid() or not state.owner_alive():
+            _clear_state()
+
+        if not recording:
+            _adopt_orphaned_audio()
+        if _claimed_audio:
+            try:
+                if recording:
+                    _claimed_audio.unlink(missing_ok=True)
+                else:
+                    os.replace(_claimed_audio, config.audio_file)
+            except FileNotFoundError:
+                pass  # Handed to the job queue
+            _claimed_audio = None
+        if _claimed_stream:
+            shutil.rmtree(config.chunk_dir / _claimed_stream, ignore_errors=True)
+            _claimed_stream = None
@@ -0,0 +1,116 @@
+"""Timed transcript segments and their subtitle formats
+
+Backends return a transcription as a list of Segments: a stretch of text with
+its start and end in seconds, an optional confidence (0-1) and, when the
+backend reports them, per-word timings. Segments are stored per transcription
+(see storage.save_segments) so a recording can be searched by time and
+exported as SRT or WebVTT.
+"""
+
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Word:
+    start: float
+    end: float
+    text: str
+    confidence: float | None = None
+
+
+@dataclass
+class Segment:
+    start: float  # Seconds from the start of the recording
+    end: float
+    text: str
+    confidence: float | None = None
+    words: list[Word] = field(default_factory=list)
+
+    def shifted(self, offset: float) -> "Segment":
+        """The segment moved later by offset seconds"""
+        return Segment(
+            start=self.start + offset,
+            end=self.end + offset,
+            text=self.text,
+            confidence=self.confidence,
+            words=[Word(w.start + offset, w.end + offset, w.text, w.confidence) for w in self.words],
+        )
+
+
+def join_text(segments: list[Segment]) -> str | None:
+    """The plain text of segments, whitespace-normalized; None if empty"""
+    text = " ".join(" ".join(s.text for s in segments).split())
+    return text if text else None
+
+
+def to_dicts(segments: list[Segment]) -> list[dict]:
+    """Plain lists/dicts for JSON (the daemon protocol and the transcript cache)"""
+    return [
+        {
+            "start": s.start,
+            "end": s.end,
+            "text": s.text,
+            "confidence": s.confidence,
+            "words": [[w.start, w.end, w.text, w.confidence] for w in s.words],
+        }
+        for s in segments
+    ]
+
+
+def from_dicts(items: list[dict]) -> list[Segment]:
+    """Inverse of to_dicts()"""
+    return [
+        Segment(
+            start=item["start"],
+            end=item["end"],
+            text=item["text"],
+            confidence=item.get("confidence"),
+            words=[Word(*w) for w in item.get("words", [])],
+        )
+        for item in items
+    ]
+
+
+def parse_time(value: str) -> float:
+    """Parse "90", "1:30", "1:02:03" or "12m"/"90s"/"1h" into seconds"""
+    value = value.strip()
+    units = {"s": 1, "m": 60, "h": 3600}
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    seconds = 0.0
+    for part in value.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def format_time(seconds: float) -> str:
+    """Short display form: 12:03.4 or 1:02:03.4"""
+    minutes, secs = divmod(max(seconds, 0.0), 60)
+    hours, minutes = divmod(int(minutes), 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:04.1f}"
+    return f"{minutes}:{secs:04.1f}"
+
+
+def _timestamp(seconds: float, separator: str) -> str:
+    ms = round(max(seconds, 0.0) * 1000)
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    secs, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{ms:03d}"
+
+
+def to_srt(segments: list[Segment]) -> str:
+    """Render segments as SubRip subtitles"""
+    blocks = []
+    for i, s in enumerate(segments, 1):
+        blocks.append(f"{i}\n{_timestamp(s.start, ',')} --> {_timestamp(s.end, ',')}\n{s.text.strip()}\n")
+    return "\n".join(blocks)
+
+
+def to_vtt(segments: list[Segment]) -> str:
+    """Render segments as WebVTT subtitles"""
+    blocks = ["WEBVTT\n"]
+    for s in segments:
+        blocks.append(f"{_timestamp(s.start, '.')} --> {_timestamp(s.end, '.')}\n{s.text.strip()}\n")
+    return "\n".join(blocks)
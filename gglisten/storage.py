@@ -1,12 +1,25 @@
 """SQLite storage for transcriptions"""
 
 import json
+import re
 import sqlite3
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
 
+from . import migrations, tracing
 from .config import get_config
+from .segments import Segment, Word
+
+# One connection per thread (sqlite3 connections can't be shared across threads)
+_local = threading.local()
+
+# Databases whose schema version has been checked by this process
+_schema_ready: set[str] = set()
+
+# Per database: whether the FTS index exists (search falls back to LIKE if not)
+_fts_available: dict[str, bool] = {}
 
 
 @dataclass
@@ -21,35 +34,102 @@ class Transcription:
     audio_path: str | None = None
     model: str | None = None
     metadata: dict | None = None
+    snippet: str | None = None  # Highlighted match context (search results only)
+
+
+@dataclass
+class Job:
+    """A queued transcription or AI processing job (see jobs.py)"""
+
+    id: int
+    kind: str  # "transcribe" or "process"
+    status: str  # "queued", "running", "done" or "failed"
+    audio_path: str | None = None
+    record_id: int | None = None  # The transcription saved, or to process
+    template: str | None = None
+    metadata: dict | None = None
+    error: str | None = None
+    worker_pid: int | None = None
+    worker_start: float | None = None  # The worker's process start time (see procinfo)
+    created: float | None = None
+    started: float | None = None
 
 
 def _get_connection() -> sqlite3.Connection:
-    """Get database connection, creating tables if needed"""
+    """
+    Get this thread's database connection, opening it on first use.
+
+    The connection is reused for the life of the thread, and the schema
+    version is only checked once per process (see migrations.py). WAL journaling lets the daemon, the CLI and
+    Raycast history lookups read while another process writes.
+    """
     config = get_config()
-    config.ensure_dirs()
+    db_path = str(config.db_path)
+
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        if _local.db_path == db_path:
+            return conn
+        conn.close()  # Config now points at a different database
 
-    conn = sqlite3.connect(str(config.db_path))
+    config.ensure_dirs()
+    conn = sqlite3.connect(db_path, timeout=5.0)
     conn.row_factory = sqlite3.Row
 
-    # Create tables if they don't exist
-    conn.executescript("""
-        CREATE TABLE IF NOT EXISTS transcription (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp REAL NOT NULL,
-            duration REAL,
-            text TEXT NOT NULL,
-            processed_text TEXT,
-            audio_path TEXT,
-            model TEXT,
-            metadata TEXT
-        );
-
-        CREATE INDEX IF NOT EXISTS idx_timestamp ON transcription(timestamp DESC);
-    """)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")  # Durable at checkpoints; safe with WAL
+    conn.execute("PRAGMA busy_timeout = 5000")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -8000")  # 8 MB
+
+    if db_path not in _schema_ready:
+        migrations.migrate(conn)
+        _schema_ready.add(db_path)
 
+    _local.conn = conn
+    _local.db_path = db_path
     return conn
 
 
+def close():
+    """Close this thread's connection, if open"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
+def _has_fts(conn: sqlite3.Connection, db_path: str) -> bool:
+    """Whether the FTS index exists (it won't if SQLite lacks FTS5)"""
+    if db_path not in _fts_available:
+        _fts_available[db_path] = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transcription_fts'"
+        ).fetchone() is not None
+    return _fts_available[db_path]
+
+
+def _row_to_transcription(row: sqlite3.Row) -> Transcription:
+    """Build a Transcription from a result row"""
+    metadata = None
+    if row["metadata"]:
+        try:
+            metadata = json.loads(row["metadata"])
+        except json.JSONDecodeError:
+            pass
+
+    return Transcription(
+        id=row["id"],
+        timestamp=row["timestamp"],
+        duration=row["duration"],
+        text=row["text"],
+        processed_text=row["processed_text"],
+        audio_path=row["audio_path"],
+        model=row["model"],
+        metadata=metadata,
+        snippet=row["snippet"] if "snippet" in row.keys() else None,
+    )
+
+
 def save(
     text: str,
     duration: float | None = None,
@@ -63,28 +143,68 @@ def save(
     Returns the ID of the saved record.
     """
     conn = _get_connection()
+
+    with tracing.span("storage.save"), conn:
+        cursor = conn.execute(
+            """
+            INSERT INTO transcription (timestamp, duration, text, audio_path, model, metadata)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                time.time(),
+                duration,
+                text,
+                str(audio_path) if audio_path else None,
+                model,
+                json.dumps(metadata) if metadata else None,
+            ),
+        )
+
+    return cursor.lastrowid
+
+
+def save_many(records: list[Transcription], segments: list[list[Segment]] | None = None) -> list[int]:
+    """
+    Save many transcriptions (and, if given, each one's segments) in a
+    single transaction. Returns the new ids.
+    """
+    conn = _get_connection()
+
+    ids = []
+    with conn:
+        for i, r in enumerate(records):
+            cursor = conn.execute(
+                """
+                INSERT INTO transcription (timestamp, duration, text, audio_path, model, metadata)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    r.timestamp,
+                    r.duration,
+                    r.text,
+                    r.audio_path,
+                    r.model,
+                    json.dumps(r.metadata) if r.metadata else None,
+                ),
+            )
+            ids.append(cursor.lastrowid)
+            if segments is not None:
+                _insert_segments(conn, cursor.lastrowid, segments[i])
+    return ids
+
+
+def get_transcribed_paths(model: str) -> set[str]:
+    """Get audio paths that already have a transcription from the given model"""
+    conn = _get_connection()
     cursor = conn.cursor()
 
     cursor.execute(
-        """
-        INSERT INTO transcription (timestamp, duration, text, audio_path, model, metadata)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (
-            time.time(),
-            duration,
-            text,
-            str(audio_path) if audio_path else None,
-            model,
-            json.dumps(metadata) if metadata else None,
-        ),
+        "SELECT DISTINCT audio_path FROM transcription WHERE model = ? AND audio_path IS NOT NULL",
+        (model,),
     )
+    paths = {row["audio_path"] for row in cursor.fetchall()}
 
-    conn.commit()
-    record_id = cursor.lastrowid
-    conn.close()
-
-    return record_id
+    return paths
 
 
 def get_recent(limit: int = 10) -> list[Transcription]:
@@ -102,28 +222,7 @@ def get_recent(limit: int = 10) -> list[Transcription]:
         (limit,),
     )
 
-    results = []
-    for row in cursor.fetchall():
-        metadata = None
-        if row["metadata"]:
-            try:
-                metadata = json.loads(row["metadata"])
-            except json.JSONDecodeError:
-                pass
-
-        results.append(Transcription(
-            id=row["id"],
-            timestamp=row["timestamp"],
-            duration=row["duration"],
-            text=row["text"],
-            processed_text=row["processed_text"],
-            audio_path=row["audio_path"],
-            model=row["model"],
-            metadata=metadata,
-        ))
-
-    conn.close()
-    return results
+    return [_row_to_transcription(row) for row in cursor.fetchall()]
 
 
 def get_by_id(record_id: int) -> Transcription | None:
@@ -141,37 +240,56 @@ def get_by_id(record_id: int) -> Transcription | None:
     )
 
     row = cursor.fetchone()
-    conn.close()
 
     if not row:
         return None
 
-    metadata = None
-    if row["metadata"]:
-        try:
-            metadata = json.loads(row["metadata"])
-        except json.JSONDecodeError:
-            pass
+    return _row_to_transcription(row)
 
-    return Transcription(
-        id=row["id"],
-        timestamp=row["timestamp"],
-        duration=row["duration"],
-        text=row["text"],
-        processed_text=row["processed_text"],
-        audio_path=row["audio_path"],
-        model=row["model"],
-        metadata=metadata,
-    )
 
+def _fts_query(query: str) -> str | None:
+    """
+    Turn free text into an FTS5 query: every word must match, as a prefix
+    ("meet" finds "meeting"). Words are quoted so FTS syntax can't leak in.
+    """
+    words = re.findall(r"\w+", query)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
 
-def search(query: str, limit: int = 20) -> list[Transcription]:
-    """Search transcriptions by text content"""
-    conn = _get_connection()
-    cursor = conn.cursor()
 
-    # Simple LIKE search (FTS could be added later for better performance)
-    cursor.execute(
+def search(
+    query: str,
+    limit: int = 20,
+    highlight: tuple[str, str] = ("[", "]"),
+) -> list[Transcription]:
+    """
+    Search transcriptions by text content, best matches first.
+
+    Results carry a snippet of the matching text with matches wrapped in the
+    highlight markers.
+    """
+    conn = _get_connection()
+    fts_query = _fts_query(query)
+
+    if fts_query and _has_fts(conn, str(get_config().db_path)):
+        cursor = conn.execute(
+            """
+            SELECT t.id, t.timestamp, t.duration, t.text, t.processed_text,
+                   t.audio_path, t.model, t.metadata,
+                   snippet(transcription_fts, -1, ?, ?, '...', 12) AS snippet
+            FROM transcription_fts
+            JOIN transcription t ON t.id = transcription_fts.rowid
+            WHERE transcription_fts MATCH ?
+            ORDER BY bm25(transcription_fts), t.timestamp DESC
+            LIMIT ?
+            """,
+            (highlight[0], highlight[1], fts_query, limit),
+        )
+        return [_row_to_transcription(row) for row in cursor.fetchall()]
+
+    # Fallback: substring scan (no FTS5, or a query with no word characters)
+    cursor = conn.execute(
         """
         SELECT id, timestamp, duration, text, processed_text, audio_path, model, metadata
         FROM transcription
@@ -181,47 +299,386 @@ def search(query: str, limit: int = 20) -> list[Transcription]:
         """,
         (f"%{query}%", f"%{query}%", limit),
     )
+    return [_row_to_transcription(row) for row in cursor.fetchall()]
 
-    results = []
-    for row in cursor.fetchall():
-        metadata = None
-        if row["metadata"]:
-            try:
-                metadata = json.loads(row["metadata"])
-            except json.JSONDecodeError:
-                pass
-
-        results.append(Transcription(
-            id=row["id"],
-            timestamp=row["timestamp"],
-            duration=row["duration"],
-            text=row["text"],
-            processed_text=row["processed_text"],
-            audio_path=row["audio_path"],
-            model=row["model"],
-            metadata=metadata,
-        ))
-
-    conn.close()
-    return results
+
+def update_metadata(record_id: int, updates: dict):
+    """Merge updates into a transcription's metadata"""
+    conn = _get_connection()
+
+    with conn:
+        row = conn.execute("SELECT metadata FROM transcription WHERE id = ?", (record_id,)).fetchone()
+        if row is None:
+            return
+        try:
+            metadata = json.loads(row["metadata"]) if row["metadata"] else {}
+        except json.JSONDecodeError:
+            metadata = {}
+        metadata.update(updates)
+        conn.execute(
+            "UPDATE transcription SET metadata = ? WHERE id = ?",
+            (json.dumps(metadata), record_id),
+        )
+
+
+def add_timings(record_id: int, timings: dict[str, float]):
+    """Merge stage timings (see tracing.py) into those in a transcription's metadata"""
+    conn = _get_connection()
+
+    with conn:
+        row = conn.execute("SELECT metadata FROM transcription WHERE id = ?", (record_id,)).fetchone()
+        if row is None:
+            return
+        try:
+            metadata = json.loads(row["metadata"]) if row["metadata"] else {}
+        except json.JSONDecodeError:
+            metadata = {}
+        metadata["timings"] = {**metadata.get("timings", {}), **timings}
+        conn.execute(
+            "UPDATE transcription SET metadata = ? WHERE id = ?",
+            (json.dumps(metadata), record_id),
+        )
 
 
 def update_processed_text(record_id: int, processed_text: str):
     """Update the processed text for a transcription"""
     conn = _get_connection()
-    cursor = conn.cursor()
 
-    cursor.execute(
+    with conn:
+        conn.execute(
+            """
+            UPDATE transcription
+            SET processed_text = ?
+            WHERE id = ?
+            """,
+            (processed_text, record_id),
+        )
+
+
+def cache_get(key: str) -> tuple[str, str | None] | None:
+    """
+    Look up a cached transcript, marking it recently used. Returns (text,
+    segments as JSON), where segments is None for entries cached without them.
+    """
+    conn = _get_connection()
+
+    row = conn.execute("SELECT text, segments FROM transcription_cache WHERE key = ?", (key,)).fetchone()
+    if not row:
+        return None
+
+    with conn:
+        conn.execute("UPDATE transcription_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+    return row["text"], row["segments"]
+
+
+def cache_put(key: str, text: str, max_entries: int, segments: str | None = None):
+    """Cache a transcript, evicting the least recently used beyond max_entries"""
+    conn = _get_connection()
+    now = time.time()
+
+    with conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO transcription_cache (key, text, segments, created, last_used)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (key, text, segments, now, now),
+        )
+        conn.execute(
+            """
+            DELETE FROM transcription_cache
+            WHERE key IN (
+                SELECT key FROM transcription_cache
+                ORDER BY last_used DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (max_entries,),
+        )
+
+
+def save_segments(record_id: int, segments: list[Segment]):
+    """Store the timed segments of a transcription, replacing any already stored"""
+    conn = _get_connection()
+
+    with conn:
+        conn.execute("DELETE FROM segment WHERE transcription_id = ?", (record_id,))
+        _insert_segments(conn, record_id, segments)
+
+
+def _insert_segments(conn: sqlite3.Connection, record_id: int, segments: list[Segment]):
+    conn.executemany(
         """
-        UPDATE transcription
-        SET processed_text = ?
-        WHERE id = ?
+        INSERT INTO segment (transcription_id, seq, start_ms, end_ms, confidence, text, words)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
         """,
-        (processed_text, record_id),
+        [
+            (
+                record_id,
+                seq,
+                round(s.start * 1000),
+                round(s.end * 1000),
+                s.confidence,
+                s.text,
+                _pack_words(s.words),
+            )
+            for seq, s in enumerate(segments)
+        ],
+    )
+
+
+def _pack_words(words: list[Word]) -> str | None:
+    """Words as a compact JSON array of [start_ms, end_ms, text, confidence]"""
+    if not words:
+        return None
+    return json.dumps(
+        [[round(w.start * 1000), round(w.end * 1000), w.text, w.confidence] for w in words],
+        separators=(",", ":"),
+    )
+
+
+def _row_to_segment(row: sqlite3.Row) -> Segment:
+    words = [
+        Word(start / 1000, end / 1000, text, confidence)
+        for start, end, text, confidence in json.loads(row["words"] or "[]")
+    ]
+    return Segment(
+        start=row["start_ms"] / 1000,
+        end=row["end_ms"] / 1000,
+        text=row["text"],
+        confidence=row["confidence"],
+        words=words,
     )
 
-    conn.commit()
-    conn.close()
+
+def get_segments(record_id: int) -> list[Segment]:
+    """All timed segments of a transcription, in order"""
+    conn = _get_connection()
+    rows = conn.execute(
+        """
+        SELECT start_ms, end_ms, confidence, text, words FROM segment
+        WHERE transcription_id = ?
+        ORDER BY seq
+        """,
+        (record_id,),
+    ).fetchall()
+    return [_row_to_segment(row) for row in rows]
+
+
+def segments_at(record_id: int, seconds: float, window: float = 30.0) -> list[Segment]:
+    """Segments of a transcription overlapping seconds +/- window"""
+    conn = _get_connection()
+    rows = conn.execute(
+        """
+        SELECT start_ms, end_ms, confidence, text, words FROM segment
+        WHERE transcription_id = ? AND end_ms >= ? AND start_ms <= ?
+        ORDER BY seq
+        """,
+        (record_id, round((seconds - window) * 1000), round((seconds + window) * 1000)),
+    ).fetchall()
+    return [_row_to_segment(row) for row in rows]
+
+
+def checkpoint_load(key: str, audio_path: str, windows: int) -> dict[int, str]:
+    """
+    Start or resume a chunked transcription job. Returns the segments (as
+    JSON) of windows already finished, by window index.
+    """
+    conn = _get_connection()
+    now = time.time()
+
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO longform_job (key, audio_path, windows, created, updated)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET audio_path = excluded.audio_path, updated = excluded.updated
+            """,
+            (key, audio_path, windows, now, now),
+        )
+    rows = conn.execute(
+        "SELECT idx, segments FROM longform_window WHERE job_key = ?", (key,)
+    ).fetchall()
+    return {row["idx"]: row["segments"] for row in rows}
+
+
+def checkpoint_save(key: str, idx: int, segments: str):
+    """Record a finished window of a chunked transcription job"""
+    conn = _get_connection()
+
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO longform_window (job_key, idx, segments) VALUES (?, ?, ?)",
+            (key, idx, segments),
+        )
+        conn.execute("UPDATE longform_job SET updated = ? WHERE key = ?", (time.time(), key))
+
+
+def checkpoint_clear(key: str):
+    """Remove a finished job's checkpoints"""
+    conn = _get_connection()
+
+    with conn:
+        conn.execute("DELETE FROM longform_window WHERE job_key = ?", (key,))
+        conn.execute("DELETE FROM longform_job WHERE key = ?", (key,))
+
+
+def get_unfinished_jobs() -> list[tuple[str, int, int]]:
+    """Interrupted chunked transcriptions as (audio path, windows done, windows total)"""
+    conn = _get_connection()
+    rows = conn.execute(
+        """
+        SELECT j.audio_path, j.windows, COUNT(w.idx) AS done
+        FROM longform_job j LEFT JOIN longform_window w ON w.job_key = j.key
+        GROUP BY j.key
+        ORDER BY j.updated DESC
+        """
+    ).fetchall()
+    return [(row["audio_path"], row["done"], row["windows"]) for row in rows]
+
+
+def _row_to_job(row: sqlite3.Row) -> Job:
+    return Job(
+        id=row["id"],
+        kind=row["kind"],
+        status=row["status"],
+        audio_path=row["audio_path"],
+        record_id=row["record_id"],
+        template=row["template"],
+        metadata=json.loads(row["metadata"]) if row["metadata"] else None,
+        error=row["error"],
+        worker_pid=row["worker_pid"],
+        worker_start=row["worker_start"],
+        created=row["created"],
+        started=row["started"],
+    )
+
+
+def job_add(
+    kind: str,
+    audio_path: str | None = None,
+    record_id: int | None = None,
+    template: str | None = None,
+    metadata: dict | None = None,
+    delivered: bool = False,
+) -> int:
+    """Queue a job. Returns its id."""
+    conn = _get_connection()
+
+    with conn:
+        cursor = conn.execute(
+            """
+            INSERT INTO job (kind, audio_path, record_id, template, metadata, delivered, created)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                kind,
+                audio_path,
+                record_id,
+                template,
+                json.dumps(metadata) if metadata else None,
+                int(delivered),
+                time.time(),
+            ),
+        )
+        return cursor.lastrowid
+
+
+def job_claim(worker_pid: int, worker_start: float | None = None) -> Job | None:
+    """Take the oldest queued job, marking it as running by worker_pid (started at worker_start)"""
+    conn = _get_connection()
+
+    with conn:
+        # Take the write lock before reading, so two workers can't claim the same job
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT * FROM job WHERE status = 'queued' ORDER BY id LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        conn.execute(
+            "UPDATE job SET status = 'running', worker_pid = ?, worker_start = ?, started = ? WHERE id = ?",
+            (worker_pid, worker_start, now, row["id"]),
+        )
+    job = _row_to_job(row)
+    job.status, job.worker_pid, job.worker_start, job.started = "running", worker_pid, worker_start, now
+    return job
+
+
+def job_finish(job_id: int, record_id: int | None = None, error: str | None = None):
+    """Mark a job done (or failed, if error is given)"""
+    conn = _get_connection()
+
+    with conn:
+        conn.execute(
+            """
+            UPDATE job SET status = ?, record_id = COALESCE(?, record_id), error = ?, finished = ?
+            WHERE id = ?
+            """,
+            ("failed" if error else "done", record_id, error, time.time(), job_id),
+        )
+
+
+def job_requeue(job_id: int):
+    """Put a running job back in the queue (its worker died)"""
+    conn = _get_connection()
+
+    with conn:
+        conn.execute(
+            "UPDATE job SET status = 'queued', worker_pid = NULL, worker_start = NULL, started = NULL "
+            "WHERE id = ? AND status = 'running'",
+            (job_id,),
+        )
+
+
+def get_jobs(statuses: tuple[str, ...] = ("queued", "running"), limit: int = 100) -> list[Job]:
+    """Jobs with the given statuses, oldest first"""
+    conn = _get_connection()
+    placeholders = ", ".join("?" * len(statuses))
+    rows = conn.execute(
+        f"SELECT * FROM job WHERE status IN ({placeholders}) ORDER BY id LIMIT ?",
+        (*statuses, limit),
+    ).fetchall()
+    return [_row_to_job(row) for row in rows]
+
+
+def get_undelivered_jobs() -> list[Job]:
+    """Jobs whose results haven't been delivered yet, oldest first"""
+    conn = _get_connection()
+    rows = conn.execute("SELECT * FROM job WHERE delivered = 0 ORDER BY id").fetchall()
+    return [_row_to_job(row) for row in rows]
+
+
+def job_mark_delivered(job_id: int):
+    conn = _get_connection()
+
+    with conn:
+        conn.execute("UPDATE job SET delivered = 1 WHERE id = ?", (job_id,))
+
+
+def ai_cache_get(template: str, model: str, text_hash: str) -> str | None:
+    """Look up a cached AI response"""
+    conn = _get_connection()
+    row = conn.execute(
+        "SELECT response FROM ai_cache WHERE template = ? AND model = ? AND text_hash = ?",
+        (template, model, text_hash),
+    ).fetchone()
+    return row["response"] if row else None
+
+
+def ai_cache_put(template: str, model: str, text_hash: str, response: str):
+    """Cache an AI response"""
+    conn = _get_connection()
+
+    with conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO ai_cache (template, model, text_hash, response, created)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (template, model, text_hash, response, time.time()),
+        )
 
 
 def get_latest() -> Transcription | None:
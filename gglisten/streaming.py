@@ -0,0 +1,139 @@
+"""Incremental transcription of fixed-length chunks while recording is in progress"""
+
+import os
+import threading
+import wave
+from pathlib import Path
+from typing import Callable
+
+from . import tracing
+from .longform import stitch_window
+from .segments import Segment
+
+# How often the worker looks for newly completed chunks
+POLL_INTERVAL = 0.2
+
+
+def _read_head(path: Path, size: int) -> bytes:
+    """Up to size bytes of PCM from the start of a WAV file that may still be being written"""
+    from .audioinfo import wav_data_chunk
+
+    try:
+        with open(path, "rb") as f:
+            found = wav_data_chunk(f.read(4096))
+            if not found:
+                return b""
+            f.seek(found[0] + 4)
+            return f.read(size)
+    except OSError:
+        return b""
+
+
+class ChunkTranscriber:
+    """
+    Transcribes audio chunks in the background as ffmpeg's segment muxer writes them.
+
+    Chunks are cut back to back, so a word spoken across a cut would be split
+    between them. Each chunk is therefore transcribed with `overlap` seconds
+    of audio from either neighbour, and only the words whose midpoint falls
+    in the chunk itself are kept, as for long-form windows (see
+    longform.stitch_window). A chunk is ready once the next one holds
+    `overlap` seconds of audio. On finish(), the recorder has already
+    stopped, so every remaining chunk (normally just the tail) is ready.
+    transcribe_fn returns a window's segments, timed from its start.
+
+    The background thread traces into `timings`; finish() is traced by the
+    caller, so wrap it in tracing.use(timings) for the whole session's.
+    """
+
+    def __init__(
+        self,
+        chunk_dir: Path,
+        transcribe_fn: Callable[[Path], list[Segment] | None],
+        overlap: float | None = None,
+    ):
+        from .config import get_config
+
+        self.chunk_dir = chunk_dir
+        self.transcribe_fn = transcribe_fn
+        self.overlap = get_config().stream_overlap if overlap is None else overlap
+        self._segments: list[Segment] = []  # Stitched, timed from the start of the recording
+        self._done = 0  # Chunks transcribed so far
+        self._offset = 0.0  # Start of the next chunk in the recording
+        self._tail = b""  # End of the previous chunk, prepended to the next
+        self.timings: dict[str, float] = {}  # Stages traced by the background thread
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        """Start transcribing chunks in a background thread"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _chunks(self) -> list[Path]:
+        return sorted(self.chunk_dir.glob("chunk_*.wav"))
+
+    def _transcribe_pending(self, include_last: bool):
+        """Transcribe, in order, the chunks whose audio (and overlap) is complete"""
+        chunks = self._chunks()
+        while self._done < len(chunks):
+            chunk = chunks[self._done]
+            following = chunks[self._done + 1] if self._done + 1 < len(chunks) else None
+            if following is None and not include_last:
+                return  # Still being written
+
+            with wave.open(str(chunk), "rb") as wav:
+                params = wav.getparams()
+                pcm = wav.readframes(params.nframes)
+            frame_bytes = params.sampwidth * params.nchannels
+            overlap_bytes = int(self.overlap * params.framerate) * frame_bytes
+            head = _read_head(following, overlap_bytes) if following else b""
+            head = head[:len(head) - len(head) % frame_bytes]
+            if len(head) < overlap_bytes and not include_last:
+                return  # The next chunk doesn't reach past the overlap yet
+
+            self._segments += self._transcribe_window(params, pcm, head, last=following is None)
+            self._offset += len(pcm) / frame_bytes / params.framerate
+            self._tail = pcm[len(pcm) - overlap_bytes:] if overlap_bytes else b""
+            self._done += 1
+
+    def _transcribe_window(self, params, pcm: bytes, head: bytes, last: bool) -> list[Segment]:
+        """Transcribe a chunk with its overlaps; returns the segments belonging to the chunk"""
+        seconds_per_byte = 1 / (params.sampwidth * params.nchannels * params.framerate)
+        start = self._offset - len(self._tail) * seconds_per_byte
+        end = self._offset + len(pcm) * seconds_per_byte
+
+        window = self.chunk_dir / f"window.{os.getpid()}.wav"
+        try:
+            with wave.open(str(window), "wb") as out:
+                out.setparams(params)
+                out.writeframes(self._tail + pcm + head)
+            found = self.transcribe_fn(window) or []
+        finally:
+            window.unlink(missing_ok=True)
+        return stitch_window([s.shifted(start) for s in found], self._offset, end, last)
+
+    def _run(self):
+        with tracing.use(self.timings):
+            while not self._stop.wait(POLL_INTERVAL):
+                try:
+                    self._transcribe_pending(include_last=False)
+                except Exception:
+                    # Give up in the background; finish() retries the remaining
+                    # chunks in the foreground so the error reaches the caller
+                    return
+
+    def cancel(self, wait: bool = True):
+        """
+        Stop the background worker without producing a result. With
+        wait=False, returns without waiting for a chunk being transcribed.
+        """
+        self._stop.set()
+        if self._thread and wait:
+            self._thread.join()
+
+    def finish(self) -> list[Segment]:
+        """Transcribe the remaining chunks and return the segments of the whole recording"""
+        self.cancel()
+        self._transcribe_pending(include_last=True)
+        return list(self._segments)
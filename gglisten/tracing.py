@@ -0,0 +1,106 @@
+"""Per-stage latency tracing
+
+Stages of a dictation (stopping ffmpeg, loading the model, inference, the
+database write, pbcopy, the paste keystroke...) are timed with span() and
+collected into the current trace. cli.toggle saves them into the record's
+metadata under "timings", and `gglisten stats` summarizes them.
+
+The current trace is held in a context variable, so each thread has its own:
+the daemon's request handler, its job worker and a streaming session's
+chunk thread can trace at the same time without mixing up their timings.
+A trace can be shared between threads explicitly with use().
+
+Imports nothing but time and contextvars, so it costs nothing on the toggle path.
+"""
+
+import time
+from contextvars import ContextVar
+
+# Milliseconds per stage in the current trace (repeated stages add up)
+_trace: ContextVar[dict[str, float]] = ContextVar("gglisten_trace")
+
+
+def _timings() -> dict[str, float]:
+    try:
+        return _trace.get()
+    except LookupError:
+        return reset()
+
+
+class span:
+    """Context manager that records the time spent in its block under name"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, (time.perf_counter() - self._start) * 1000)
+        return False
+
+
+def traced(name: str):
+    """Decorator: record each call of the function as a span"""
+    def decorator(fn):
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        # By hand rather than functools.wraps: functools isn't loaded at startup
+        wrapper.__name__ = fn.__name__
+        wrapper.__qualname__ = fn.__qualname__
+        wrapper.__doc__ = fn.__doc__
+        wrapper.__wrapped__ = fn
+        return wrapper
+    return decorator
+
+
+def record(name: str, ms: float):
+    """Add ms to a stage of the current trace"""
+    timings = _timings()
+    timings[name] = round(timings.get(name, 0.0) + ms, 2)
+
+
+def merge(timings: dict[str, float]):
+    """Add timings measured elsewhere (e.g. by the daemon) to the current trace"""
+    for name, ms in timings.items():
+        record(name, ms)
+
+
+def reset() -> dict[str, float]:
+    """Start a new trace in the current thread (or context); returns it"""
+    timings: dict[str, float] = {}
+    _trace.set(timings)
+    return timings
+
+
+def collect() -> dict[str, float]:
+    """Timings recorded since the last reset()"""
+    return dict(_timings())
+
+
+class use:
+    """
+    Context manager that makes timings (a dict returned by reset()) the
+    current trace for its block, e.g. to add work done on another thread
+    """
+
+    def __init__(self, timings: dict[str, float]):
+        self.timings = timings
+
+    def __enter__(self):
+        self._token = _trace.set(self.timings)
+        return self.timings
+
+    def __exit__(self, *exc):
+        _trace.reset(self._token)
+        return False
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile (p in 0-100) of a non-empty list"""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))  # ceil
+    return ordered[int(rank) - 1]
@@ -1,24 +1,49 @@
-"""Transcription backends: whisper.cpp and parakeet-mlx"""
+"""Transcription using the configured backend (see gglisten.backends)"""
 
 import subprocess
 from pathlib import Path
 
+from . import backends, segments, tracing
 from .config import get_config
+from .segments import Segment, join_text
 
-# Lazy-loaded parakeet model (kept in memory for fast subsequent transcriptions)
-_parakeet_model = None
 
+def _cache_key(audio_path: Path, backend: backends.Backend) -> str | None:
+    """Cache key for a transcript: audio content, backend, model and language"""
+    import hashlib
+    import wave
+    from .archive import pcm_hash
 
-def transcribe(audio_path: Path | None = None) -> str | None:
+    try:
+        content = pcm_hash(audio_path)
+    except (OSError, EOFError, wave.Error):
+        return None  # Not a WAV we can hash; don't cache
+    parts = [content, backend.name, backend.model_id, get_config().language]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+def transcribe(audio_path: Path | None = None, use_cache: bool = True) -> str | None:
     """
     Transcribe audio file using the configured backend.
 
     Args:
         audio_path: Path to audio file. If None, uses the default recording path.
+        use_cache: Return a cached transcript of identical audio if there is one.
 
     Returns:
         Transcribed text, or None if transcription failed.
     """
+    segments = transcribe_segments(audio_path, use_cache=use_cache)
+    return join_text(segments) if segments else None
+
+
+def transcribe_segments(audio_path: Path | None = None, use_cache: bool = True) -> list[Segment] | None:
+    """
+    Like transcribe(), but returns the transcript as timed segments (empty if
+    there was no speech), or None if the audio file doesn't exist.
+    """
+    import json
+
     config = get_config()
 
     if audio_path is None:
@@ -27,73 +52,80 @@ def transcribe(audio_path: Path | None = None) -> str | None:
     if not audio_path.exists():
         return None
 
-    if config.transcription_backend == "parakeet":
-        return _transcribe_parakeet(audio_path)
-    else:
-        return _transcribe_whisper(audio_path)
+    backend = backends.get_backend()
 
+    key = None
+    if use_cache and config.cache_transcriptions:
+        from . import storage
 
-def _transcribe_whisper(audio_path: Path) -> str | None:
-    """Transcribe using whisper-cli (whisper.cpp)"""
-    config = get_config()
+        with tracing.span("transcriber.cache"):
+            key = _cache_key(audio_path, backend)
+            cached = storage.cache_get(key) if key else None
+        # Entries cached before segments were stored have no timings; redo those
+        if cached is not None and cached[1] is not None:
+            return segments.from_dicts(json.loads(cached[1]))
 
-    # Verify whisper-cli and model exist
-    if not config.whisper_cli.exists():
-        raise FileNotFoundError(f"whisper-cli not found at {config.whisper_cli}")
-    if not config.whisper_model.exists():
-        raise FileNotFoundError(f"Whisper model not found at {config.whisper_model}")
-
-    # Run whisper-cli
-    result = subprocess.run(
-        [
-            str(config.whisper_cli),
-            "-m", str(config.whisper_model),
-            "-f", str(audio_path),
-            "-l", config.language,
-            "--no-timestamps",
-            "-np",
-        ],
-        capture_output=True,
-        text=True,
-    )
-
-    if result.returncode != 0:
-        error = result.stderr.strip() if result.stderr else "Unknown error"
-        raise RuntimeError(f"Whisper transcription failed: {error}")
-
-    # Clean up the output
-    text = result.stdout.strip()
-    text = " ".join(text.split())
-
-    return text if text else None
-
-
-def _transcribe_parakeet(audio_path: Path) -> str | None:
-    """Transcribe using parakeet-mlx (Apple Silicon optimized)"""
-    global _parakeet_model
+    if not backend.loaded:
+        with tracing.span("transcriber.load"):
+            backend.load()
+    with tracing.span("transcriber.inference"):
+        from . import longform
 
-    try:
-        from parakeet_mlx import from_pretrained
-    except ImportError:
-        raise ImportError(
-            "parakeet-mlx is not installed. Install it with: pip install parakeet-mlx"
-        )
+        if longform.is_long(audio_path):
+            # Windowed, with progress checkpointed under the cache key
+            result = longform.transcribe(audio_path, backend, key or _cache_key(audio_path, backend))
+        else:
+            result = backend.transcribe_segments(audio_path)
+
+    text = join_text(result)
+    if key and text:
+        storage.cache_put(key, text, config.cache_max_entries, json.dumps(segments.to_dicts(result)))
+    return result
+
+
+def transcribe_speech(audio_path: Path, use_cache: bool = True) -> tuple[list[Segment], object]:
+    """
+    Trim silence (see vad.speech_only), transcribe what's left with
+    transcribe_segments() and map the times back onto audio_path.
+    Returns (segments, vad_result); segments is empty if there was no speech.
+    """
+    from . import vad
+
+    with vad.speech_only(audio_path) as (speech_file, vad_result):
+        found = (transcribe_segments(speech_file, use_cache=use_cache) or []) if speech_file else []
+    if vad_result:
+        found = vad_result.restore_times(found)
+    return found, vad_result
 
-    config = get_config()
 
-    # Load model on first use (stays in memory for speed)
-    if _parakeet_model is None:
-        _parakeet_model = from_pretrained(config.parakeet_model)
+def preload():
+    """
+    Load the configured backend's model ahead of the first transcription.
+
+    Used by the daemon so the first request after startup is already warm.
+    """
+    backends.get_backend().load()
 
-    # Transcribe
-    result = _parakeet_model.transcribe(str(audio_path))
 
-    text = result.text.strip() if result.text else None
-    return text if text else None
+def model_id() -> str:
+    """Identifier of the configured backend's model"""
+    return backends.get_backend().model_id
 
 
 def get_audio_duration(audio_path: Path) -> float | None:
-    """Get duration of audio file in seconds using ffprobe"""
+    """
+    Get duration of audio file in seconds. WAV, FLAC and Ogg are read from
+    their headers; other formats fall back to ffprobe.
+    """
+    from . import audioinfo
+
+    try:
+        return audioinfo.read_info(audio_path).duration
+    except ValueError:
+        pass
+    except OSError:
+        return None
+
     config = get_config()
     ffprobe = config.ffmpeg_bin.parent / "ffprobe"
 
@@ -0,0 +1,212 @@
+"""Energy-based voice activity detection
+
+Reads a recording once, finds the frames loud enough to be speech and trims
+everything else before the audio reaches the transcriber: leading and
+trailing silence always, and long internal pauses down to vad_max_pause. An
+all-silent recording is reported as such without loading any model.
+"""
+
+import os
+import tempfile
+import wave
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import tracing
+from .config import get_config
+from .segments import Segment, Word
+
+FRAME_MS = 20
+
+# Fewer voiced frames than this (60 ms) is a click or bump, not speech
+MIN_SPEECH_FRAMES = 3
+
+
+@dataclass
+class VadResult:
+    duration: float  # Seconds of audio analyzed
+    kept: float  # Seconds left after trimming
+    segments: list[tuple[int, int]] = field(default_factory=list)  # Kept (start, end) frame offsets
+    sample_rate: int = 0
+
+    @property
+    def has_speech(self) -> bool:
+        return bool(self.segments)
+
+    @property
+    def trimmed(self) -> float:
+        """Seconds of silence removed"""
+        return self.duration - self.kept
+
+    def original_time(self, seconds: float) -> float:
+        """Map a time in the trimmed audio to the same point in the original"""
+        if not self.segments or not self.sample_rate:
+            return seconds
+        remaining = seconds * self.sample_rate
+        for start, end in self.segments:
+            if remaining <= end - start:
+                return (start + remaining) / self.sample_rate
+            remaining -= end - start
+        return self.segments[-1][1] / self.sample_rate
+
+    def restore_times(self, segments: list[Segment]) -> list[Segment]:
+        """Segments transcribed from the trimmed audio, timed against the original"""
+        t = self.original_time
+        return [
+            Segment(
+                start=t(s.start),
+                end=t(s.end),
+                text=s.text,
+                confidence=s.confidence,
+                words=[Word(t(w.start), t(w.end), w.text, w.confidence) for w in s.words],
+            )
+            for s in segments
+        ]
+
+
+def noise_threshold(level) -> float:
+    """
+    Level (dBFS) above which a frame counts as speech, given every frame's level.
+
+    The recording's noise floor is estimated as a low percentile of its frame
+    levels, so a noisy room or a hissing mic doesn't pass for speech. Frames
+    must be vad_noise_margin_db louder than that, and never quieter than
+    vad_threshold_db. A recording with hardly any pauses has no floor to
+    measure, so the threshold also stays that margin below its loud frames.
+    """
+    import numpy as np
+
+    config = get_config()
+    margin = config.vad_noise_margin_db
+    floor, loud = np.percentile(level, [config.vad_noise_percentile, 100 - config.vad_noise_percentile])
+    return max(config.vad_threshold_db, float(min(floor + margin, loud - margin)))
+
+
+def find_speech(samples, sample_rate: int) -> VadResult:
+    """
+    Find the ranges of samples to keep. samples is an int16 array of shape
+    (frames, channels).
+    """
+    import numpy as np
+
+    config = get_config()
+    total = len(samples)
+    duration = total / sample_rate
+    frame = sample_rate * FRAME_MS // 1000
+    n = total // frame
+    if n == 0:
+        return VadResult(duration=duration, kept=0.0, sample_rate=sample_rate)
+
+    # Per-frame RMS level in dBFS of the mono mix
+    mono = samples[:n * frame].astype(np.float32).mean(axis=1) / 32768
+    rms = np.sqrt(np.mean(mono.reshape(n, frame) ** 2, axis=1))
+    level = 20 * np.log10(np.maximum(rms, 1e-10))
+    voiced = level > noise_threshold(level)
+    if np.count_nonzero(voiced) < MIN_SPEECH_FRAMES:
+        return VadResult(duration=duration, kept=0.0, sample_rate=sample_rate)
+
+    # Keep some padding around speech so word onsets and tails aren't clipped
+    pad = config.vad_padding_ms // FRAME_MS
+    if pad:
+        voiced = np.convolve(voiced, np.ones(2 * pad + 1), mode="same") > 0
+
+    # Runs of voiced frames as [start, end) frame indices
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+    runs = list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+    # Shorten pauses longer than vad_max_pause to that length (keeping the
+    # real room tone on either side); otherwise keep them whole
+    max_gap = int(config.vad_max_pause * 1000) // FRAME_MS
+    merged = [list(runs[0])]
+    for start, end in runs[1:]:
+        prev = merged[-1]
+        gap = start - prev[1]
+        if not config.vad_max_pause or gap <= max_gap:
+            prev[1] = end
+            continue
+        prev[1] += max_gap // 2
+        merged.append([start - (max_gap - max_gap // 2), end])
+
+    segments = [(start * frame, end * frame) for start, end in merged]
+    # Don't drop the partial frame at the end if speech runs up to it
+    if merged[-1][1] == n:
+        segments[-1] = (segments[-1][0], total)
+
+    kept = sum(end - start for start, end in segments) / sample_rate
+    return VadResult(duration=duration, kept=kept, segments=segments, sample_rate=sample_rate)
+
+
+def _read_wav(wav_path: Path):
+    """Read a 16-bit PCM WAV as (samples, params); samples has shape (frames, channels)"""
+    import numpy as np
+
+    with wave.open(str(wav_path), "rb") as wav:
+        params = wav.getparams()
+        if params.sampwidth != 2:
+            raise ValueError(f"Unsupported sample width: {params.sampwidth * 8} bits")
+        data = wav.readframes(params.nframes)
+    samples = np.frombuffer(data, dtype="<i2").reshape(-1, params.nchannels)
+    return samples, params
+
+
+def analyze(wav_path: Path) -> VadResult:
+    """Detect speech in a WAV file without writing anything"""
+    samples, params = _read_wav(wav_path)
+    return find_speech(samples, params.framerate)
+
+
+def _extract_speech(wav_path: Path) -> tuple[Path | None, VadResult | None]:
+    """Write the speech in wav_path to a temporary WAV (see speech_only)"""
+    import numpy as np
+
+    try:
+        samples, params = _read_wav(wav_path)
+    except (OSError, EOFError, ValueError, wave.Error):
+        return wav_path, None
+
+    result = find_speech(samples, params.framerate)
+    if not result.has_speech:
+        return None, result
+    if result.trimmed * params.framerate < 1:
+        return wav_path, result
+
+    config = get_config()
+    config.ensure_dirs()
+    # Unique per call: batch.run trims files (possibly with the same name) on several threads
+    fd, out_name = tempfile.mkstemp(prefix=f"{wav_path.stem}.speech.", suffix=".wav", dir=config.temp_dir)
+    os.close(fd)
+    out_path = Path(out_name)
+    with wave.open(str(out_path), "wb") as out:
+        out.setnchannels(params.nchannels)
+        out.setsampwidth(2)
+        out.setframerate(params.framerate)
+        out.writeframes(np.concatenate([samples[start:end] for start, end in result.segments]).tobytes())
+    return out_path, result
+
+
+@contextmanager
+def speech_only(wav_path: Path):
+    """
+    Yield (path, result) where path is a WAV containing only the speech in
+    wav_path (or wav_path itself if there was nothing to trim) and result is
+    the VadResult. path is None if there is no speech at all.
+
+    If VAD is disabled or the file can't be analyzed, yields (wav_path, None).
+    Trimmed copies are temporary and removed on exit. Long recordings are
+    also passed through untouched: longform.py trims them window by window
+    rather than reading them whole.
+    """
+    from .longform import is_long
+
+    if not get_config().vad or is_long(wav_path):
+        yield wav_path, None
+        return
+
+    with tracing.span("vad"):
+        speech_path, result = _extract_speech(wav_path)
+    try:
+        yield speech_path, result
+    finally:
+        if speech_path is not None and speech_path != wav_path:
+            speech_path.unlink(missing_ok=True)
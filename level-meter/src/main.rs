@@ -6,13 +6,14 @@ use cocoa::base::{id, nil, NO, YES};
 use cocoa::foundation::{NSAutoreleasePool, NSPoint, NSRect, NSSize};
 use core_graphics::context::CGContext;
 use core_graphics::geometry::{CGPoint, CGRect, CGSize};
-use cpal::traits::{DeviceTrait, HostTrait, StreamTrait};
 use objc::declare::ClassDecl;
 use objc::runtime::{Object, Sel};
 use objc::{class, msg_send, sel, sel_impl};
+use std::fs::File;
+use std::io::{Read, Seek, SeekFrom};
 use std::sync::atomic::{AtomicBool, AtomicU64, Ordering};
 use std::thread;
-use std::time::Duration;
+use std::time::{Duration, SystemTime, UNIX_EPOCH};
 
 // Carbon API for TransformProcessType
 #[link(name = "Carbon", kind = "framework")]
@@ -37,6 +38,13 @@ const WINDOW_HEIGHT: f64 = 40.0;
 const PADDING: f64 = 6.0;
 const CORNER_RADIUS: f64 = 8.0;
 
+// Levels published by the recorder (gglisten/levels.py); path may be passed as argv[1]
+const DEFAULT_LEVELS_FILE: &str = "/tmp/gglisten/levels.bin";
+const LEVELS_MAGIC: &[u8; 4] = b"GGLV";
+const LEVELS_HEADER_SIZE: usize = 48;
+// Levels older than this are treated as silence (recorder stalled or gone)
+const LEVELS_STALE_SECS: f64 = 0.5;
+
 // Shared state for audio level (using atomic for thread safety)
 static AUDIO_LEVEL_BITS: AtomicU64 = AtomicU64::new(0);
 static RUNNING: AtomicBool = AtomicBool::new(true);
@@ -89,9 +97,12 @@ fn main() {
         let _: () = msg_send![panel, orderFrontRegardless];
         let _: () = msg_send![panel, makeKeyAndOrderFront: nil];
 
-        // Start audio capture thread
+        // Follow the levels published by the recorder
+        let levels_path = std::env::args()
+            .nth(1)
+            .unwrap_or_else(|| DEFAULT_LEVELS_FILE.to_string());
         thread::spawn(move || {
-            capture_audio();
+            follow_levels(&levels_path);
         });
 
         // Listen for STOP signal via file (more reliable than stdin from Raycast)
@@ -138,8 +149,8 @@ fn main() {
 }
 
 fn dispatch_terminate() {
-    // Give the audio thread time to pause the stream before exiting
-    thread::sleep(Duration::from_millis(200));
+    // Give the levels thread time to notice before exiting
+    thread::sleep(Duration::from_millis(50));
     std::process::exit(0);
 }
 
@@ -308,69 +319,64 @@ unsafe fn create_level_view() -> id {
     view
 }
 
-fn capture_audio() {
-    let host = cpal::default_host();
-
-    let device = match host.default_input_device() {
-        Some(d) => d,
-        None => return,
-    };
-
-    let config = match device.default_input_config() {
-        Ok(c) => c,
-        Err(_) => return,
-    };
-
-    let stream = match config.sample_format() {
-        cpal::SampleFormat::F32 => build_stream::<f32>(&device, &config.into()),
-        cpal::SampleFormat::I16 => build_stream::<i16>(&device, &config.into()),
-        cpal::SampleFormat::U16 => build_stream::<u16>(&device, &config.into()),
-        _ => return,
-    };
-
-    if let Ok(stream) = stream {
-        if stream.play().is_ok() {
-            while RUNNING.load(Ordering::SeqCst) {
-                thread::sleep(Duration::from_millis(100));
-            }
-            // Explicitly pause before drop to release microphone
-            let _ = stream.pause();
+fn follow_levels(path: &str) {
+    let mut file: Option<File> = None;
+
+    while RUNNING.load(Ordering::SeqCst) {
+        // The recorder may create the file just after we start
+        if file.is_none() {
+            file = File::open(path).ok();
         }
+
+        let rms = match file.as_mut().map(read_rms) {
+            Some(Some(rms)) => rms,
+            Some(None) => {
+                file = None; // Replaced or truncated; reopen
+                0.0
+            }
+            None => 0.0,
+        };
+
+        // Convert to 0-1 range with some amplification
+        let level = (rms * 5.0).min(1.0);
+
+        // Smooth the level
+        let current = get_audio_level();
+        set_audio_level(current * 0.3 + level * 0.7);
+
+        thread::sleep(Duration::from_millis(30));
     }
 }
 
-fn build_stream<T: cpal::Sample + cpal::SizedSample>(
-    device: &cpal::Device,
-    config: &cpal::StreamConfig,
-) -> Result<cpal::Stream, cpal::BuildStreamError>
-where
-    f32: cpal::FromSample<T>,
-{
-    device.build_input_stream(
-        config,
-        move |data: &[T], _: &cpal::InputCallbackInfo| {
-            if !RUNNING.load(Ordering::SeqCst) {
-                return;
-            }
+/// Latest RMS from the levels file; 0 when stale or inactive, None if unreadable
+fn read_rms(file: &mut File) -> Option<f32> {
+    let mut header = [0u8; LEVELS_HEADER_SIZE];
+    for _ in 0..10 {
+        file.seek(SeekFrom::Start(0)).ok()?;
+        file.read_exact(&mut header).ok()?;
+        if &header[0..4] != LEVELS_MAGIC {
+            return None;
+        }
+
+        // Odd sequence number: the writer is mid-update
+        let seq = u64::from_le_bytes(header[8..16].try_into().unwrap());
+        if seq % 2 == 1 {
+            continue;
+        }
 
-            // Calculate RMS level
-            let sum: f32 = data
-                .iter()
-                .map(|s| {
-                    let sample: f32 = cpal::Sample::from_sample(*s);
-                    sample * sample
-                })
-                .sum();
-            let rms = (sum / data.len() as f32).sqrt();
-
-            // Convert to 0-1 range with some amplification
-            let level = (rms * 5.0).min(1.0);
-
-            // Smooth the level
-            let current = get_audio_level();
-            set_audio_level(current * 0.3 + level * 0.7);
-        },
-        |_err| {},
-        None,
-    )
+        let rms = f32::from_le_bytes(header[16..20].try_into().unwrap());
+        let updated_at = f64::from_le_bytes(header[24..32].try_into().unwrap());
+        let active = u32::from_le_bytes(header[36..40].try_into().unwrap()) != 0;
+
+        let now = SystemTime::now()
+            .duration_since(UNIX_EPOCH)
+            .map(|d| d.as_secs_f64())
+            .unwrap_or(0.0);
+        if !active || now - updated_at > LEVELS_STALE_SECS {
+            return Some(0.0);
+        }
+        return Some(rms);
+    }
+    // Writer kept us out; hold the current level
+    Some(get_audio_level() / 5.0)
 }
@@ -0,0 +1,11 @@
+#!/bin/bash
+
+# @raycast.title gGlisten Process
+# @raycast.mode compact
+# @raycast.schemaVersion 1
+# @raycast.icon 📝
+# @raycast.argument1 { "type": "dropdown", "placeholder": "Template", "data": [{"title": "Clean", "value": "clean"}, {"title": "Email", "value": "email"}, {"title": "Notes", "value": "notes"}, {"title": "Slack", "value": "slack"}] }
+
+# Run clipboard text through an AI template.
+
+~/.local/share/gglisten/.venv/bin/gglisten process --template "$1"
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from gglisten import backends
+from gglisten import config as config_module
+
+
+@pytest.fixture(autouse=True)
+def gglisten_home(tmp_path, monkeypatch):
+    """Run each test against its own home, config, temp dir and database"""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("GGLISTEN_TEMP_DIR", str(tmp_path / "tmp"))
+    monkeypatch.setattr(config_module, "_user_config", None)
+    monkeypatch.setattr(config_module, "_config", None)
+    monkeypatch.setattr(backends, "_instances", {})
+    return tmp_path
+
+
+@pytest.fixture
+def user_config(gglisten_home):
+    """Write ~/.config/gglisten/config.json (read by subprocesses too) and reload it"""
+
+    def write(values: dict):
+        path = gglisten_home / "home/.config/gglisten/config.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(values))
+        config_module._user_config = None
+        config_module._config = None
+        return config_module.get_config()
+
+    return write
+
+
+def write_wav(path, samples, rate=16000):
+    """Write int16 mono samples (a numpy array) as a WAV file"""
+    import wave
+
+    with wave.open(str(path), "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+        out.writeframes(samples.astype("<i2").tobytes())
+    return path
+
+
+def tone(seconds, rate=16000, amplitude=8000, freq=440):
+    """A sine tone at about -18 dBFS, loud enough to count as speech for VAD"""
+    import numpy as np
+
+    t = np.arange(int(seconds * rate)) / rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype("<i2")
+
+
+def silence(seconds, rate=16000):
+    import numpy as np
+
+    return np.zeros(int(seconds * rate), dtype="<i2")
@@ -0,0 +1,53 @@
+import struct
+
+import pytest
+
+from gglisten import audioinfo
+
+
+def _chunk(chunk_id: bytes, payload: bytes) -> bytes:
+    return chunk_id + struct.pack("<I", len(payload)) + payload + b"\0" * (len(payload) & 1)
+
+
+def _fmt(channels=1, rate=16000, block_align=2) -> bytes:
+    return _chunk(b"fmt ", struct.pack("<HHIIHH", 1, channels, rate, rate * block_align, block_align, 16))
+
+
+def _wav(tmp_path, *chunks: bytes):
+    body = b"WAVE" + b"".join(chunks)
+    path = tmp_path / "test.wav"
+    path.write_bytes(b"RIFF" + struct.pack("<I", len(body)) + body)
+    return path
+
+
+def test_reads_format_and_length(tmp_path):
+    path = _wav(tmp_path, _fmt(channels=2, rate=8000, block_align=4), _chunk(b"data", bytes(8000 * 4)))
+    info = audioinfo.read_info(path)
+    assert (info.sample_rate, info.channels, info.frames) == (8000, 2, 8000)
+
+
+def test_skips_chunks_before_fmt(tmp_path):
+    # The text "fmt " inside a metadata chunk is not the format chunk, and
+    # metadata may push the format past the first 4 KB
+    junk = _chunk(b"LIST", b"INFOICMT" + b"fmt " * 2000)
+    path = _wav(tmp_path, junk, _fmt(rate=22050), _chunk(b"data", bytes(22050 * 2)))
+    info = audioinfo.read_info(path)
+    assert (info.sample_rate, info.frames) == (22050, 22050)
+
+
+def test_placeholder_data_size(tmp_path):
+    # A recording still being written: count the audio that's on disk
+    path = _wav(tmp_path, _fmt(), b"data" + struct.pack("<I", 0xFFFFFFFF) + bytes(3200))
+    assert audioinfo.read_info(path).frames == 1600
+
+
+def test_rejects_zero_block_align(tmp_path):
+    path = _wav(tmp_path, _fmt(block_align=0), _chunk(b"data", bytes(100)))
+    with pytest.raises(ValueError):
+        audioinfo.read_info(path)
+
+
+def test_rejects_missing_fmt(tmp_path):
+    path = _wav(tmp_path, _chunk(b"data", bytes(100)))
+    with pytest.raises(ValueError):
+        audioinfo.read_info(path)
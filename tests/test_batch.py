@@ -0,0 +1,129 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+from conftest import silence, tone, write_wav
+
+from gglisten import archive, backends, batch, storage
+from gglisten.config import get_config
+
+
+@pytest.fixture
+def fake(user_config):
+    user_config({
+        "transcription_backend": "fake",
+        "fake_load_seconds": 0,
+        "fake_realtime_factor": 0,
+        "longform_threshold": 5,
+        "longform_window": 2,
+        "longform_overlap": 0.5,
+    })
+    backend = backends.get_backend()
+    calls = []
+    original = backend.transcribe_segments
+
+    def counting(path):
+        calls.append(path)
+        return original(path)
+
+    backend.transcribe_segments = counting
+    return calls
+
+
+@pytest.fixture
+def recordings(tmp_path):
+    folder = tmp_path / "recordings"
+    folder.mkdir()
+    write_wav(folder / "speech.wav", np.concatenate([silence(1), tone(3), silence(1)]))
+    write_wav(folder / "silent.wav", silence(2))
+    write_wav(folder / "long.wav", tone(8))
+    return folder
+
+
+def _by_name():
+    return {r.audio_path.rsplit("/", 1)[-1]: r for r in storage.get_recent(10)}
+
+
+def test_segments_saved_with_original_times(fake, recordings):
+    assert batch.run(str(recordings), workers=2) == 0
+    records = _by_name()
+    assert set(records) == {"speech.wav", "long.wav"}  # silent.wav never reaches the model
+
+    speech = storage.get_segments(records["speech.wav"].id)
+    assert speech and speech[0].start >= 0.7  # Leading silence trimmed, times mapped back
+    assert records["speech.wav"].metadata["vad_trimmed_s"] > 1
+    assert " ".join(s.text for s in speech) == records["speech.wav"].text
+
+
+def test_long_files_use_windows(fake, recordings):
+    batch.run(str(recordings / "long.wav"))
+    assert len(fake) == 4  # 8 s in 2 s windows, not the whole file at once
+    segments = storage.get_segments(_by_name()["long.wav"].id)
+    assert segments[-1].end == pytest.approx(8, abs=0.5)
+
+
+def test_rerun_uses_transcript_cache(fake, recordings):
+    batch.run(str(recordings / "speech.wav"))
+    calls = len(fake)
+    assert batch.run(str(recordings / "speech.wav"), force=True) == 0
+    assert len(fake) == calls
+    first, second = storage.get_recent(2)
+    assert first.text == second.text
+
+
+def test_skips_files_already_done(fake, recordings, capsys):
+    batch.run(str(recordings))
+    calls = len(fake)
+    assert batch.run(str(recordings)) == 0
+    assert len(fake) == calls
+    assert "Skipping 2 file(s)" in capsys.readouterr().out
+
+
+def _texts():
+    return {r.audio_path: r.text for r in storage.get_recent(100)}
+
+
+def test_concurrent_run_matches_sequential(fake, tmp_path):
+    # Long files go through longform windows and same-named files through
+    # VAD trimming at the same time; their temporary WAVs must not collide
+    folder = tmp_path / "recordings"
+    folder.mkdir()
+    for i in range(6):
+        write_wav(folder / f"long{i}.wav", tone(12, freq=200 + 50 * i))
+    for i in range(4):
+        (folder / f"day{i}").mkdir()
+        write_wav(folder / f"day{i}" / "note.wav", np.concatenate([silence(1), tone(3, freq=300 + 70 * i), silence(1)]))
+
+    config = get_config()
+    config.db_path = tmp_path / "sequential.db"
+    assert batch.run(str(folder), workers=1) == 0
+    sequential = _texts()
+    assert len(sequential) == 10
+
+    config.db_path = tmp_path / "concurrent.db"
+    assert batch.run(str(folder), workers=4) == 0
+    assert _texts() == sequential
+
+
+@pytest.mark.skipif(not shutil.which("ffmpeg"), reason="ffmpeg is needed to archive and decode FLAC")
+def test_archived_flac_uses_pipeline(user_config, tmp_path):
+    user_config({
+        "transcription_backend": "fake",
+        "fake_load_seconds": 0,
+        "fake_realtime_factor": 0,
+        "ffmpeg_bin": shutil.which("ffmpeg"),
+        "archive_audio": True,
+        "archive_format": "flac",
+    })
+    original = write_wav(tmp_path / "original.wav", np.concatenate([silence(1), tone(3), silence(1)]))
+    archived = archive.store(original)
+    assert archived.suffix == ".flac"
+
+    assert batch.run(str(archived)) == 0
+    assert batch.run(str(original)) == 0
+    records = {Path(r.audio_path).suffix: r for r in storage.get_recent(2)}
+    # Same text as the WAV it came from, silence trimmed
+    assert records[".flac"].text == records[".wav"].text
+    assert records[".flac"].metadata["vad_trimmed_s"] > 1
+    assert storage.get_segments(records[".flac"].id)[0].start >= 0.7
@@ -0,0 +1,140 @@
+import time
+import wave
+
+import numpy as np
+import pytest
+from conftest import write_wav
+
+from gglisten import capture
+
+RATE = 8000
+
+# The looped source file counts 0, 1, ..., LOOP - 1, so every captured frame
+# records its position in the stream and gaps or repeats show up as jumps
+LOOP = 10007
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = write_wav(tmp_path / "ramp.wav", np.arange(LOOP), RATE)
+    return capture.open_source(f"file:{path}", RATE, 1)
+
+
+@pytest.fixture
+def standby(source):
+    started = []
+
+    def start(preroll_ms=250, buffer_seconds=0):
+        standby = capture.StandbyCapture(source, RATE, 1, preroll_ms, buffer_seconds)
+        standby.start_thread()
+        started.append(standby)
+        return standby
+
+    yield start
+    for standby in started:
+        standby.close()
+
+
+def _read(path) -> np.ndarray:
+    with wave.open(str(path), "rb") as wav:
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+
+
+def _assert_contiguous(samples):
+    assert len(samples)
+    assert np.all(np.diff(samples.astype(np.int64)) % LOOP == 1)
+
+
+def test_ring_wraps_around():
+    ring = capture.RingBuffer(10, 1)
+    stream = np.arange(37, dtype="<i2").reshape(-1, 1)
+    for start in range(0, 37, 4):
+        ring.write(stream[start:start + 4])
+    assert (ring.total, ring.oldest) == (37, 27)
+    assert ring.since(30)[:, 0].tolist() == list(range(30, 37))
+    # Positions that have fallen out are clamped to the oldest frame held
+    assert ring.since(0)[:, 0].tolist() == list(range(27, 37))
+    assert len(ring.since(37)) == 0
+
+
+def test_ring_block_larger_than_capacity():
+    ring = capture.RingBuffer(10, 1)
+    ring.write(np.arange(3, dtype="<i2").reshape(-1, 1))
+    ring.write(np.arange(3, 28, dtype="<i2").reshape(-1, 1))
+    assert ring.total == 28
+    assert ring.since(0)[:, 0].tolist() == list(range(18, 28))
+
+
+def test_preroll(standby, tmp_path):
+    standby = standby(preroll_ms=250)
+    time.sleep(0.5)
+    assert standby.start(tmp_path / "out.wav") == {"preroll_ms": 250}
+    time.sleep(0.3)
+    frames = standby.stop()["frames"]
+
+    samples = _read(tmp_path / "out.wav")
+    assert len(samples) == frames
+    assert frames >= RATE * 0.25 + RATE * 0.2
+    _assert_contiguous(samples)
+
+
+def test_preroll_limited_to_captured_audio(standby, tmp_path):
+    # Started before the pre-roll has been captured: take what there is
+    standby = standby(preroll_ms=2000)
+    time.sleep(0.2)
+    preroll_ms = standby.start(tmp_path / "out.wav")["preroll_ms"]
+    standby.stop()
+    assert 100 <= preroll_ms < 1000
+    assert _read(tmp_path / "out.wav")[0] == 0  # From the very start of the stream
+
+
+def test_stop_while_writing(standby, tmp_path):
+    # Back-to-back recordings, stopped while the capture thread is appending
+    standby = standby(preroll_ms=0)
+    for i in range(10):
+        standby.start(tmp_path / f"{i}.wav")
+        time.sleep(0.03 + 0.01 * i)
+        frames = standby.stop()["frames"]
+        samples = _read(tmp_path / f"{i}.wav")
+        assert len(samples) == frames
+        if frames > 1:
+            _assert_contiguous(samples)
+    with pytest.raises(RuntimeError):
+        standby.stop()
+
+
+def test_buffered_recording_written_at_stop(standby, tmp_path):
+    standby = standby(preroll_ms=100, buffer_seconds=1)
+    time.sleep(0.2)
+    standby.start(tmp_path / "out.wav")
+    time.sleep(0.3)
+    assert not (tmp_path / "out.wav").exists()
+    frames = standby.stop()["frames"]
+
+    samples = _read(tmp_path / "out.wav")
+    assert len(samples) == frames >= RATE * 0.35
+    _assert_contiguous(samples)
+
+
+def test_buffered_recording_spills_to_disk(standby, tmp_path):
+    # The ring holds the pre-roll, capture_buffer_seconds and a second of
+    # slack (1.3 s here); a longer recording continues on disk
+    standby = standby(preroll_ms=100, buffer_seconds=0.2)
+    time.sleep(0.2)
+    standby.start(tmp_path / "out.wav")
+    time.sleep(0.6)
+    assert not (tmp_path / "out.wav").exists()
+    time.sleep(1.0)
+    assert (tmp_path / "out.wav").exists()
+    frames = standby.stop()["frames"]
+
+    samples = _read(tmp_path / "out.wav")
+    assert len(samples) == frames >= RATE * 1.6
+    _assert_contiguous(samples)
+
+    # The next recording is held in memory again
+    standby.start(tmp_path / "next.wav")
+    time.sleep(0.1)
+    assert not (tmp_path / "next.wav").exists()
+    standby.stop()
+    _assert_contiguous(_read(tmp_path / "next.wav"))
@@ -0,0 +1,103 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from conftest import tone, write_wav
+
+from gglisten import daemon
+from gglisten.segments import join_text
+
+
+@pytest.fixture
+def running(user_config, tmp_path):
+    """A daemon with the fake backend taking 1 s per second of audio"""
+    config = user_config({
+        "transcription_backend": "fake",
+        "fake_load_seconds": 0,
+        "fake_realtime_factor": 1.0,
+        "vad": False,
+    })
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gglisten.cli", "daemon"],
+        env=dict(os.environ),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 10
+    while not daemon.is_running():
+        assert time.monotonic() < deadline and proc.poll() is None, "Daemon did not start"
+        time.sleep(0.05)
+    yield config
+    daemon.stop()
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        raise
+
+
+def test_answers_while_transcribing(running, tmp_path):
+    audio = write_wav(tmp_path / "long.wav", tone(3))
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(text=daemon.transcribe(audio)))
+    thread.start()
+    time.sleep(0.5)  # Transcription under way
+
+    start = time.monotonic()
+    assert daemon.is_running()
+    assert daemon.wake_worker()
+    assert time.monotonic() - start < 0.5
+    assert thread.is_alive()
+
+    thread.join()
+    assert result["text"]
+
+
+def test_transcriptions_share_the_model_in_turn(running, tmp_path):
+    audio = [write_wav(tmp_path / f"{i}.wav", tone(1, freq=300 + 100 * i)) for i in range(2)]
+    results = [None, None]
+
+    def transcribe(i):
+        results[i] = daemon.transcribe(audio[i])
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=transcribe, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(results) and results[0] != results[1]
+    assert time.monotonic() - start >= 2  # One at a time
+
+
+def test_overlapping_stream_sessions(running, tmp_path):
+    # The next recording's session starts before the last one is finished
+    chunks = {}
+    for session, freq in (("first", 300), ("second", 500)):
+        (tmp_path / session).mkdir()
+        chunks[session] = write_wav(tmp_path / session / "chunk_00000.wav", tone(1, freq=freq))
+        assert daemon.stream_start(tmp_path / session, session)
+
+    assert daemon.transcribe(chunks["first"], use_cache=False) == join_text(daemon.stream_finish("first"))
+    assert daemon.transcribe(chunks["second"], use_cache=False) == join_text(daemon.stream_finish("second"))
+    with pytest.raises(daemon.DaemonUnavailable):
+        daemon.stream_finish("first")
+
+
+def test_stream_start_gives_up_on_busy_daemon(user_config, tmp_path):
+    # Something accepts connections on the daemon socket but never answers
+    config = user_config({})
+    config.ensure_dirs()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(str(config.daemon_socket))
+    sock.listen()
+    try:
+        start = time.monotonic()
+        assert not daemon.stream_start(tmp_path, "session")
+        assert time.monotonic() - start < daemon.STREAM_START_TIMEOUT + 0.5
+    finally:
+        sock.close()
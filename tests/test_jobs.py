@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from conftest import tone, write_wav
+
+from gglisten import clipboard, jobs, procinfo, storage
+
+
+def _claimed(worker_pid, worker_start):
+    job_id = storage.job_add(jobs.TRANSCRIBE, audio_path="/nonexistent.wav")
+    assert storage.job_claim(worker_pid, worker_start).id == job_id
+    return job_id
+
+
+def _status(job_id):
+    statuses = ("queued", "running", "done", "failed")
+    return next(job.status for job in storage.get_jobs(statuses=statuses) if job.id == job_id)
+
+
+def _dead_pid() -> int:
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_running_worker_keeps_its_job():
+    pid = os.getpid()
+    job_id = _claimed(pid, procinfo.start_time(pid))
+    jobs.requeue_orphans()
+    assert _status(job_id) == "running"
+
+
+def test_dead_worker_job_requeued():
+    job_id = _claimed(_dead_pid(), None)
+    jobs.requeue_orphans()
+    assert _status(job_id) == "queued"
+
+
+def test_reused_pid_is_not_the_worker():
+    # The pid is alive, but it belongs to a process started after the worker
+    pid = os.getpid()
+    job_id = _claimed(pid, procinfo.start_time(pid) - 1)
+    jobs.requeue_orphans()
+    assert _status(job_id) == "queued"
+    job = storage.job_claim(pid)
+    assert (job.id, job.worker_start) == (job_id, None)
+
+
+def test_delivery_resumes_after_dead_worker(user_config, monkeypatch, tmp_path):
+    # A standalone worker dies mid-job while the daemon's worker is running;
+    # the results finished after that job must still be pasted, in order
+    user_config({"transcription_backend": "fake", "fake_load_seconds": 0, "fake_realtime_factor": 0})
+    pasted = []
+    monkeypatch.setattr(clipboard, "copy_and_paste", pasted.append)
+
+    stop, wake = threading.Event(), threading.Event()
+    worker = threading.Thread(target=jobs.work, args=(stop, wake))
+    worker.start()
+    try:
+        time.sleep(0.2)  # Idle, past its first look for orphans
+        audio = write_wav(tmp_path / "first.wav", tone(1))
+        orphan = storage.job_add(jobs.TRANSCRIBE, audio_path=str(audio))
+        storage.job_claim(_dead_pid())
+        for text in ("second", "third"):
+            job_id = storage.job_add(jobs.TRANSCRIBE)
+            storage.job_claim(os.getpid())
+            storage.job_finish(job_id, record_id=storage.save(text=text))
+
+        wake.set()
+        deadline = time.monotonic() + 5
+        while len(pasted) < 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        wake.set()
+        worker.join()
+
+    assert _status(orphan) == "done"
+    assert pasted[1:] == ["second", "third"] and pasted[0]
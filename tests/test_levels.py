@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+import threading
+
+from gglisten import levels, procinfo
+
+from conftest import tone, write_wav
+
+
+def _tap(tmp_path, pid, started):
+    """Run the tap in a thread; returns (thread, levels file)"""
+    path = tmp_path / "levels.bin"
+    thread = threading.Thread(
+        target=levels.tap, args=(tmp_path / "rec.wav", path, pid, started), daemon=True,
+    )
+    thread.start()
+    return thread, path
+
+
+def test_publishes_until_capture_exits(tmp_path):
+    write_wav(tmp_path / "rec.wav", tone(0.5, amplitude=16384))
+    capture = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        thread, path = _tap(tmp_path, capture.pid, procinfo.start_time(capture.pid))
+        thread.join(timeout=0.5)
+        assert thread.is_alive()  # Still following the file
+    finally:
+        capture.kill()
+        capture.wait()
+
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    current = levels.read_levels(path)
+    assert not current.active
+    assert len(current.history) == 10  # 0.5 s in 50 ms blocks
+    rms, peak = current.history[-1]
+    assert abs(rms - 0.5 / 2 ** 0.5) < 0.01 and abs(peak - 0.5) < 0.01
+
+
+def test_reused_pid_stops_tap(tmp_path):
+    # The pid is alive, but it isn't the capture process the tap was started for
+    write_wav(tmp_path / "rec.wav", tone(0.1))
+    started = procinfo.start_time(os.getpid())
+    thread, path = _tap(tmp_path, os.getpid(), started - 1)
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert not levels.read_levels(path).active
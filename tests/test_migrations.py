@@ -0,0 +1,94 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from gglisten import migrations
+
+
+def _connect(path):
+    return sqlite3.connect(path, timeout=10.0)
+
+
+def _tables(conn) -> set[str]:
+    return {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def test_upgrades_unversioned_database(tmp_path):
+    # A database from before versioning: the baseline table, user_version 0
+    conn = _connect(tmp_path / "old.db")
+    conn.execute("""
+        CREATE TABLE transcription (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp REAL NOT NULL,
+            duration REAL,
+            text TEXT NOT NULL,
+            processed_text TEXT,
+            audio_path TEXT,
+            model TEXT,
+            metadata TEXT
+        )
+    """)
+    conn.execute("INSERT INTO transcription (timestamp, text) VALUES (1, 'kept across the upgrade')")
+    conn.commit()
+
+    assert migrations.migrate(conn) == migrations.SCHEMA_VERSION
+    assert migrations.get_version(conn) == migrations.SCHEMA_VERSION
+    assert {"transcription_cache", "ai_cache", "segment", "job"} <= _tables(conn)
+    assert conn.execute("SELECT text FROM transcription").fetchall() == [("kept across the upgrade",)]
+    assert migrations.migrate(conn) == 0
+
+
+def test_failed_migration_keeps_version(tmp_path, monkeypatch):
+    def broken(conn):
+        conn.execute("CREATE TABLE half_done (x)")
+        raise RuntimeError("migration failed")
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", [*migrations.MIGRATIONS, broken])
+    monkeypatch.setattr(migrations, "SCHEMA_VERSION", len(migrations.MIGRATIONS))
+
+    conn = _connect(tmp_path / "test.db")
+    with pytest.raises(RuntimeError):
+        migrations.migrate(conn)
+
+    # Everything before the broken migration stuck; nothing of it did
+    assert migrations.get_version(conn) == migrations.SCHEMA_VERSION - 1
+    assert "job" in _tables(conn)
+    assert "half_done" not in _tables(conn)
+    assert not conn.in_transaction
+
+
+def test_concurrent_migrations_apply_once(tmp_path, monkeypatch):
+    def slow(migration):
+        def run(conn):
+            time.sleep(0.01)  # Widen the window between reading and bumping the version
+            migration(conn)
+        return run
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", [slow(m) for m in migrations.MIGRATIONS])
+
+    path = tmp_path / "test.db"
+    start = threading.Barrier(2)
+    applied, errors = [], []
+
+    def upgrade():
+        conn = _connect(path)
+        start.wait()
+        try:
+            applied.append(migrations.migrate(conn))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=upgrade) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sum(applied) == migrations.SCHEMA_VERSION
+    conn = _connect(path)
+    assert migrations.get_version(conn) == migrations.SCHEMA_VERSION
@@ -0,0 +1,52 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+# litellm otherwise fetches its model price list over the network on import
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+from gglisten import cli, jobs, storage  # noqa: E402
+from gglisten.ai import processor  # noqa: E402
+from gglisten.config import get_config  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """An AI client that upper-cases the text it's given"""
+    key_file = get_config().anthropic_key_file
+    key_file.parent.mkdir(parents=True, exist_ok=True)
+    key_file.write_text("test-key")
+
+    def create(**kwargs):
+        return SimpleNamespace(text=kwargs["messages"][-1]["content"].upper())
+
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(processor, "get_client", lambda: fake)
+
+
+def _timings(record_id):
+    return storage.get_by_id(record_id).metadata["timings"]
+
+
+def test_queued_processing_is_traced(client):
+    record_id = storage.save(text="um hello there", metadata={"timings": {"transcribe": 5.0}})
+    jobs.enqueue_processing(record_id, "clean")
+    assert jobs.run_next()
+    assert storage.get_by_id(record_id).processed_text
+    timings = _timings(record_id)
+    assert timings["transcribe"] == 5.0 and "ai.process" in timings
+
+
+def test_process_cmd_is_traced(client):
+    record_id = storage.save(text="um hello there")
+    assert cli.process_cmd(record_id=record_id, paste=False) == 0
+    assert list(_timings(record_id)) == ["ai.process"]
+
+
+def test_wrappers_are_not_counted_twice(client):
+    from gglisten import tracing
+
+    tracing.reset()
+    processor.clean_text("um hello there")
+    assert list(tracing.collect()) == ["ai.process"]
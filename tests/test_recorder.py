@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from conftest import tone, write_wav
+
+from gglisten import cli, clipboard, recorder
+from gglisten.config import get_config
+
+
+def _dead_pid() -> int:
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+@pytest.fixture
+def temp_dir():
+    config = get_config()
+    config.ensure_dirs()
+    return config.temp_dir
+
+
+def test_adopts_recording_of_dead_process(temp_dir):
+    orphan = write_wav(temp_dir / f"recording.{_dead_pid()}.wav", tone(0.5))
+    data = orphan.read_bytes()
+    assert recorder.get_audio_file() == get_config().audio_file
+    assert get_config().audio_file.read_bytes() == data
+    assert not orphan.exists()
+
+
+def test_keeps_later_recording(temp_dir):
+    orphan = write_wav(temp_dir / f"recording.{_dead_pid()}.wav", tone(0.5))
+    os.utime(orphan, (1, 1))
+    latest = write_wav(get_config().audio_file, tone(1)).read_bytes()
+    recorder.cleanup()
+    assert get_config().audio_file.read_bytes() == latest
+    assert not orphan.exists()
+
+
+def test_leaves_live_claims_and_other_files(temp_dir):
+    live = write_wav(temp_dir / f"recording.{os.getppid()}.wav", tone(0.5))
+    speech = write_wav(temp_dir / f"recording.{_dead_pid()}.speech.1.wav", tone(0.5))
+    recorder.cleanup()
+    assert live.exists() and speech.exists()
+    assert not get_config().audio_file.exists()
+
+
+def test_failed_paste_releases_recording(user_config, monkeypatch):
+    # The recording stopped by toggle must end up back in recording.wav
+    # however delivery fails, for `gglisten transcribe` to retry it
+    config = user_config({"transcription_backend": "fake", "fake_load_seconds": 0, "fake_realtime_factor": 0})
+    config.ensure_dirs()
+
+    def stop_recording():
+        write_wav(config.audio_file, tone(1))
+        recorder._claim_audio()
+        return True, 1.0
+
+    def copy_and_paste(text):
+        raise FileNotFoundError("pbcopy")
+
+    monkeypatch.setattr(recorder, "is_recording", lambda: True)
+    monkeypatch.setattr(recorder, "stop_recording", stop_recording)
+    monkeypatch.setattr(clipboard, "copy_and_paste", copy_and_paste)
+    with pytest.raises(FileNotFoundError):
+        cli.toggle()
+
+    assert recorder._claimed_audio is None
+    assert not (config.temp_dir / f"recording.{os.getpid()}.wav").exists()
+    assert recorder.get_audio_file() == config.audio_file
+
+
+def test_cleanup_removes_only_its_stream(temp_dir, monkeypatch):
+    # Another recording's session may still be streaming into its own directory
+    config = get_config()
+    ours, theirs = config.chunk_dir / "1", config.chunk_dir / "2"
+    ours.mkdir(parents=True)
+    theirs.mkdir()
+    monkeypatch.setattr(recorder, "_claimed_stream", "1")
+    recorder.cleanup()
+    assert not ours.exists() and theirs.exists()
+    assert recorder.get_stream() is None
+
+
+def test_failed_standby_stop_releases_state(temp_dir):
+    # The capture process is gone and left no audio: toggle reports the
+    # failure, and the next toggle starts a recording rather than refusing
+    pid = os.getpid()
+    recorder._write_state(recorder.StateInfo(
+        state=recorder.RecorderState.RECORDING,
+        pid=pid,
+        pid_start=recorder.procinfo.start_time(pid),
+        standby=True,
+    ))
+    assert cli.toggle() == 1
+    assert recorder._read_state().state == recorder.RecorderState.IDLE
+    assert not recorder.is_recording()
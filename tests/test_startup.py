@@ -0,0 +1,43 @@
+import statistics
+
+import pytest
+
+from gglisten import bench
+
+RUNS = 3
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    return bench.baseline_imports()
+
+
+@pytest.fixture(scope="module", params=bench.SANDBOX_RECORDERS)
+def toggles(request, baseline):
+    """Import rows of real `gglisten toggle` runs: {"start": [...], "stop": [...]}"""
+    samples = {"start": [], "stop": []}
+    with bench.toggle_sandbox(request.param) as env:
+        for _ in range(RUNS):
+            for path in samples:
+                samples[path].append(bench.toggle_imports(env, baseline))
+    return samples
+
+
+def _modules(samples) -> set[str]:
+    return {name.strip() for _, rows in samples for _, _, name in rows}
+
+
+def test_toggles_alternate(toggles):
+    # Only the stop path queues the recording
+    assert "gglisten.recorder" in _modules(toggles["start"])
+    assert "gglisten.storage" not in _modules(toggles["start"])
+    assert "gglisten.storage" in _modules(toggles["stop"])
+
+
+def test_start_skips_forbidden_imports(toggles):
+    assert _modules(toggles["start"]).isdisjoint(bench.START_FORBIDDEN)
+
+
+def test_start_within_budget(toggles):
+    cost = statistics.median(cost for cost, _ in toggles["start"])
+    assert cost <= bench.START_BUDGET_MS
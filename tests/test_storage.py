@@ -0,0 +1,80 @@
+import sqlite3
+
+from gglisten import migrations, storage
+from gglisten.config import get_config
+
+
+class _NoFts5:
+    """A connection to SQLite as built without FTS5"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def execute(self, sql, *args):
+        if "USING fts5" in sql:
+            raise sqlite3.OperationalError("no such module: fts5")
+        return self._conn.execute(sql, *args)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def _db():
+    path = get_config().db_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return sqlite3.connect(path)
+
+
+def _ids(query):
+    return [t.id for t in storage.search(query)]
+
+
+def test_upgrade_backfills_index():
+    # Rows written before the FTS index existed are found once it is added
+    conn = _db()
+    migrations._initial_schema(conn)
+    conn.execute("PRAGMA user_version = 1")
+    conn.execute("INSERT INTO transcription (timestamp, text) VALUES (1, 'the quarterly meeting')")
+    conn.execute("INSERT INTO transcription (timestamp, text, processed_text) VALUES (2, 'raw', 'café order')")
+    conn.commit()
+    conn.close()
+
+    assert _ids("meet") == [1]
+    assert _ids("cafe") == [2]
+    assert storage.search("quarterly")[0].snippet == "the [quarterly] meeting"
+
+
+def test_update_and_delete_keep_index_in_sync():
+    record_id = storage.save(text="call the plumber", duration=1.0)
+    storage.update_processed_text(record_id, "Call the electrician.")
+    assert _ids("electrician") == [record_id]
+    assert _ids("plumber") == [record_id]  # Raw text is still indexed
+
+    conn = storage._get_connection()
+    conn.execute("UPDATE transcription SET text = 'call the roofer' WHERE id = ?", (record_id,))
+    conn.commit()
+    assert _ids("plumber") == []
+    assert _ids("roofer") == [record_id]
+
+    conn.execute("DELETE FROM transcription WHERE id = ?", (record_id,))
+    conn.commit()
+    assert _ids("electrician") == []
+    assert conn.execute("SELECT count(*) FROM transcription_fts WHERE transcription_fts MATCH 'roofer'").fetchone()[0] == 0
+
+
+def test_like_fallback_without_fts5():
+    conn = _db()
+    migrations.migrate(_NoFts5(conn))
+    assert migrations.get_version(conn) == migrations.SCHEMA_VERSION
+    conn.close()
+
+    first = storage.save(text="buy more coffee", duration=1.0)
+    second = storage.save(text="coffee-stained notes", duration=1.0)
+    assert _ids("coffee") == [second, first]  # Newest first
+    assert _ids("e-st") == [second]  # Substrings, punctuation and all
+    assert storage.search("coffee")[0].snippet is None
+
+
+def test_query_without_words_falls_back_to_like():
+    record_id = storage.save(text="it costs $$ now", duration=1.0)
+    assert _ids("$$") == [record_id]
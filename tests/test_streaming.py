@@ -0,0 +1,99 @@
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from gglisten.segments import Segment, Word
+from gglisten.streaming import ChunkTranscriber
+
+RATE = 16000
+# Each sample holds its position in the recording in 10 ms steps, so a
+# transcriber can tell which stretch of the recording a window covers
+STEP = RATE // 100
+
+# Half-second words every 0.7 s; several straddle the 2.5 s chunk cuts
+WORDS = [(i * 0.7 + 0.1, i * 0.7 + 0.6, f"w{i}") for i in range(10)]
+
+
+def _write_chunks(chunk_dir, seconds=(2.5, 2.5, 2.3)):
+    chunk_dir.mkdir()
+    position = 0
+    for i, length in enumerate(seconds):
+        frames = int(length * RATE)
+        samples = (np.arange(position, position + frames) // STEP).astype("<i2")
+        with wave.open(str(chunk_dir / f"chunk_{i:05d}.wav"), "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(RATE)
+            out.writeframes(samples.tobytes())
+        position += frames
+
+
+def _transcribe(path):
+    """The words heard in a window, cut off at its edges, timed from its start"""
+    with wave.open(str(path), "rb") as wav:
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+    start = int(samples[0]) * STEP / RATE
+    end = start + len(samples) / RATE
+    words = [
+        Word(max(s, start) - start, min(e, end) - start, text)
+        for s, e, text in WORDS
+        if s < end and e > start
+    ]
+    if not words:
+        return []
+    return [Segment(words[0].start, words[-1].end, " ".join(w.text for w in words), words=words)]
+
+
+def _stitched_words(segments):
+    return [(round(w.start, 3), round(w.end, 3), w.text) for s in segments for w in s.words]
+
+
+def test_words_across_cuts_kept_once_and_whole(tmp_path):
+    _write_chunks(tmp_path / "chunks")
+    result = ChunkTranscriber(tmp_path / "chunks", _transcribe, overlap=1.0).finish()
+    assert _stitched_words(result) == [(round(s, 3), round(e, 3), t) for s, e, t in WORDS]
+
+
+def test_without_overlap_cut_words_are_split(tmp_path):
+    _write_chunks(tmp_path / "chunks")
+    result = ChunkTranscriber(tmp_path / "chunks", _transcribe, overlap=0.0).finish()
+    assert len(_stitched_words(result)) > len(WORDS)
+
+
+def test_waits_for_overlap_in_next_chunk(tmp_path):
+    _write_chunks(tmp_path / "chunks", seconds=(2.5, 0.5))
+    transcriber = ChunkTranscriber(tmp_path / "chunks", _transcribe, overlap=1.0)
+    transcriber._transcribe_pending(include_last=False)
+    assert transcriber._done == 0  # Next chunk is shorter than the overlap so far
+    # w4 is cut off by the end of the recording
+    assert [w[2] for w in _stitched_words(transcriber.finish())] == ["w0", "w1", "w2", "w3", "w4"]
+
+
+@pytest.mark.parametrize("overlap", [0.0, 1.0])
+def test_single_chunk(tmp_path, overlap):
+    _write_chunks(tmp_path / "chunks", seconds=(1.5,))
+    result = ChunkTranscriber(tmp_path / "chunks", _transcribe, overlap=overlap).finish()
+    assert [w[2] for w in _stitched_words(result)] == ["w0", "w1"]
+
+
+def test_background_chunks_traced_into_session(tmp_path):
+    from gglisten import tracing
+
+    _write_chunks(tmp_path / "chunks")
+
+    def traced(path):
+        with tracing.span("chunk"):
+            return _transcribe(path)
+
+    tracing.reset()
+    stream = ChunkTranscriber(tmp_path / "chunks", traced, overlap=1.0)
+    stream.start()
+    deadline = time.monotonic() + 5
+    while "chunk" not in stream.timings and time.monotonic() < deadline:
+        time.sleep(0.05)
+    with tracing.use(stream.timings):
+        stream.finish()
+        assert "chunk" in tracing.collect()
+    assert tracing.collect() == {}
@@ -0,0 +1,42 @@
+import threading
+
+from gglisten import tracing
+
+
+def test_threads_trace_separately():
+    # e.g. the daemon's request handler and its job worker
+    ready = threading.Barrier(2)
+    results = {}
+
+    def trace(name):
+        tracing.reset()
+        ready.wait()
+        for _ in range(100):
+            tracing.record(name, 1.0)
+        ready.wait()
+        results[name] = tracing.collect()
+
+    threads = [threading.Thread(target=trace, args=(name,)) for name in ("handler", "worker")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {"handler": {"handler": 100.0}, "worker": {"worker": 100.0}}
+
+
+def test_use_shares_a_trace_across_threads():
+    tracing.reset()
+    tracing.record("outer", 1.0)
+    session = {}
+
+    def background():
+        with tracing.use(session):
+            tracing.record("chunk", 2.0)
+
+    thread = threading.Thread(target=background)
+    thread.start()
+    thread.join()
+    with tracing.use(session):
+        tracing.record("tail", 3.0)
+        assert tracing.collect() == {"chunk": 2.0, "tail": 3.0}
+    assert tracing.collect() == {"outer": 1.0}
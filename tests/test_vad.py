@@ -0,0 +1,46 @@
+import numpy as np
+from conftest import silence, tone
+
+from gglisten import vad
+
+
+def _noise(seconds, db, rate=16000):
+    """White noise at about db dBFS RMS"""
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(int(seconds * rate)) * 32768 * 10 ** (db / 20)).astype("<i2")
+
+
+def _speech(samples):
+    return vad.find_speech(samples.reshape(-1, 1), 16000)
+
+
+def test_trims_silence_around_speech(user_config):
+    user_config({"vad_padding_ms": 0})
+    result = _speech(np.concatenate([silence(1), tone(1), silence(1)]))
+    assert result.segments == [(16000, 32000)]
+
+
+def test_noise_above_fixed_threshold_is_not_speech(user_config):
+    # A hissing room at -35 dBFS is louder than vad_threshold_db (-45)
+    user_config({"vad_padding_ms": 0})
+    noise = _noise(3, -35)
+    noise[16000:32000] += tone(1)
+    result = _speech(noise)
+    assert len(result.segments) == 1
+    start, end = result.segments[0]
+    assert abs(start - 16000) <= 320 and abs(end - 32000) <= 320
+
+
+def test_fixed_threshold_is_the_minimum(user_config):
+    # In a silent room the floor is far below vad_threshold_db, which still applies
+    user_config({"vad_padding_ms": 0})
+    quiet = _noise(1, -50)
+    result = _speech(np.concatenate([silence(1), quiet, silence(1), tone(1)]))
+    assert result.segments == [(48000, 64000)]
+
+
+def test_speech_without_pauses_is_kept(user_config):
+    # Nothing quiet to measure a floor from: all of it is still speech
+    user_config({"vad_padding_ms": 0})
+    result = _speech(tone(2, amplitude=8000) + tone(2, amplitude=2000, freq=3))
+    assert result.kept == 2.0
@@ -0,0 +1,125 @@
+import os
+import signal
+import socket
+import sys
+import textwrap
+
+import pytest
+
+from gglisten import procinfo
+from gglisten.backends import whisper_server
+from gglisten.config import get_config
+
+# Speaks just enough of whisper-server's HTTP API: /health, and /inference
+# answering with verbose_json that names the language it was started with
+STUB = textwrap.dedent('''
+    import argparse, json
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-m")
+    parser.add_argument("-l")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    args = parser.parse_args()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self._reply({"status": "ok"})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            self._reply({"text": "hello there", "segments": [
+                {"start": 0.0, "end": 1.0, "text": f" hello there ({args.l})", "avg_logprob": -0.1}
+            ]})
+
+        def _reply(self, body):
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *a):
+            pass
+
+    HTTPServer((args.host, args.port), Handler).serve_forever()
+''')
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def server(user_config, gglisten_home):
+    stub = gglisten_home / "whisper-server"
+    stub.write_text(f"#!{sys.executable}\n{STUB}")
+    stub.chmod(0o755)
+    model = gglisten_home / "model.bin"
+    model.write_bytes(b"")
+    user_config({
+        "whisper_server": str(stub),
+        "whisper_model": str(model),
+        "whisper_server_port": _free_port(),
+    })
+    yield
+    whisper_server.stop()
+
+
+def _pid() -> int:
+    return whisper_server._read_pid_info()["pid"]
+
+
+def test_start_records_identity(server):
+    whisper_server.ensure_running()
+    info = whisper_server._read_pid_info()
+    assert whisper_server.is_healthy()
+    assert info["pid_start"] == procinfo.start_time(info["pid"])
+
+
+def test_reuses_running_server(server):
+    whisper_server.ensure_running()
+    pid = _pid()
+    whisper_server.ensure_running()
+    assert _pid() == pid
+
+
+def test_restarts_after_crash(server, gglisten_home):
+    whisper_server.ensure_running()
+    pid = _pid()
+    os.kill(pid, signal.SIGKILL)
+    procinfo.wait_for_exit(pid, 5)
+
+    audio = gglisten_home / "a.wav"
+    audio.write_bytes(b"RIFF")
+    segments = whisper_server.WhisperServerBackend().transcribe_segments(audio)
+    assert segments[0].text == "hello there (en)"
+    assert _pid() != pid
+
+
+def test_restarts_on_parameter_change(server):
+    whisper_server.ensure_running()
+    pid = _pid()
+    get_config().language = "de"
+    whisper_server.ensure_running()
+    assert _pid() != pid
+    assert procinfo.wait_for_exit(pid, 0)
+    assert whisper_server._read_pid_info()["language"] == "de"
+
+
+def test_stop_waits_for_port(server):
+    whisper_server.ensure_running()
+    pid = _pid()
+    whisper_server.stop()
+    assert not whisper_server._port_in_use()
+    assert whisper_server._read_pid_info() is None
+    assert procinfo.wait_for_exit(pid, 0)
+
+
+def test_reused_pid_is_not_ours(server):
+    whisper_server.ensure_running()
+    info = whisper_server._read_pid_info()
+    assert not whisper_server._process_alive({**info, "pid_start": info["pid_start"] - 1})